@@ -0,0 +1,823 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from playwright.async_api import Playwright, async_playwright, Page, BrowserContext
+
+import danawa_crawler
+import danawa_metrics
+from danawa_retry import LIST, PRODUCT, RetryItem, RetryQueue
+from danawa_crawler import (
+    CONTEXT_OPTIONS,
+    DETAIL_AREA_SELECTOR,
+    DETAIL_TAB_CANDIDATES,
+    EXTRACT_SPECS_JS,
+    HAS_MOVE_PAGE_JS,
+    KV_ROW_SELECTOR,
+    LIST_GROUP_NEXT_SELECTOR,
+    MOVE_PAGE_JS,
+    PAGER_CANDIDATES,
+    PRODUCT_LINK_SELECTORS,
+    SPEC_READY_SELECTOR,
+    accept_product_link,
+    add_container_row_pair,
+    add_page_row_pair,
+    add_plain_pair,
+    candidate_locator,
+    count_container_fallback,
+    detail_row,
+    is_cacheable,
+    list_page_button,
+    next_page_url,
+    observe_goto_error,
+    observe_page_status,
+    pairs_row,
+    record_detail_tab,
+    record_product_links,
+    record_spec_container,
+    spec_container_candidates,
+    spec_extract_options,
+    store_page,
+)
+from danawa_selectors import SelectorMemo, ordered, remember
+
+# 선택자 순서, 스펙 행 규칙, 요청 간격 계산 같은 I/O 없는 로직은 danawa_crawler 에 한 벌만 두고
+# 이 모듈에는 Playwright 비동기 API 를 await 하는 래퍼만 둠
+
+
+class PolitenessLimiter(danawa_crawler.PolitenessLimiter):
+    # 모든 워커가 공유하는 요청 간격 제한 (동시성이 늘어도 다나와로 가는 요청 속도는 일정)
+    # controller(RateController) 가 있으면 간격/일시 정지와 동시에 처리할 상품 수를 컨트롤러가 정함
+    def __init__(self, base_delay_ms: int, controller=None) -> None:
+        super().__init__(base_delay_ms, controller)
+        self._active = 0
+        self._slots = asyncio.Condition()
+
+    async def wait(self) -> None:
+        # 시각 예약은 await 없이 끝나므로 워커끼리 잠금 없이도 순서대로 간격이 벌어짐
+        delay_s = self.reserve_s()
+        if delay_s > 0:
+            with danawa_metrics.stage("delay"):
+                await asyncio.sleep(delay_s)
+
+    @asynccontextmanager
+    async def slot(self):
+        # 컨트롤러의 현재 동시성만큼만 상세 페이지를 열도록 나머지 워커는 대기
+        if self.controller is None:
+            yield
+            return
+        async with self._slots:
+            with danawa_metrics.stage("delay"):
+                await self._slots.wait_for(lambda: self._active < self.controller.concurrency)
+            self._active += 1
+        try:
+            yield
+        finally:
+            async with self._slots:
+                self._active -= 1
+                self._slots.notify_all()
+
+
+async def wait_for_network_idle(page: Page, timeout_ms: int = 3000) -> None:
+    with danawa_metrics.stage("network_idle"):
+        await page.wait_for_load_state("domcontentloaded")
+        try:
+            await page.wait_for_load_state("networkidle", timeout=timeout_ms)
+        except Exception:
+            pass
+
+
+async def wait_for_spec_ready(page: Page, timeout_ms: int = 3000) -> bool:
+    with danawa_metrics.stage("ready_wait"):
+        try:
+            await page.wait_for_selector(SPEC_READY_SELECTOR, state="attached", timeout=timeout_ms)
+            return True
+        except Exception:
+            return False
+
+
+async def settle_after_click(page: Page, wait_mode: str = "fixed") -> None:
+    if wait_mode == "ready":
+        await wait_for_spec_ready(page)
+    else:
+        await wait_for_network_idle(page)
+
+
+async def open_new_context(playwright: Playwright, headless: bool) -> BrowserContext:
+    browser = await playwright.chromium.launch(headless=headless)
+    context = await browser.new_context(**CONTEXT_OPTIONS)
+    return context
+
+
+async def human_delay(base_delay_ms: int = 500) -> None:
+    jitter = random.randint(0, base_delay_ms)
+    with danawa_metrics.stage("delay"):
+        await asyncio.sleep((base_delay_ms + jitter) / 1000.0)
+
+
+async def slow_scroll(page: Page, steps: int = 6, step_px: int = 800, base_delay_ms: int = 300) -> None:
+    with danawa_metrics.stage("scroll"):
+        for _ in range(steps):
+            await page.evaluate("step => window.scrollBy(0, step)", step_px)
+            await human_delay(base_delay_ms)
+
+
+async def _collect_row_pairs(rows, specs: Dict[str, str]) -> None:
+    for tr in rows:
+        try:
+            ths = await tr.locator("th").all()
+            tds = await tr.locator("td").all()
+            if len(ths) > 0 and len(tds) > 0:
+                add_page_row_pair(specs, (await ths[0].inner_text()).strip(), (await tds[0].inner_text()).strip())
+        except Exception:
+            continue
+
+
+async def extract_specs_from_detail(page: Page, memo: Optional[SelectorMemo] = None) -> Dict[str, str]:
+    specs: Dict[str, str] = {}
+
+    container = None
+    matched = None
+    for selector in spec_container_candidates(memo):
+        if await page.locator(selector).count() > 0:
+            container = page.locator(selector).first
+            matched = selector
+            break
+    record_spec_container(memo, matched)
+    if container is None:
+        container = page.locator("body")
+
+    for dl in await container.locator("dl").all():
+        dts = await dl.locator("dt").all()
+        dds = await dl.locator("dd").all()
+        for i in range(min(len(dts), len(dds))):
+            try:
+                add_plain_pair(specs, (await dts[i].inner_text()).strip(), (await dds[i].inner_text()).strip())
+            except Exception:
+                continue
+
+    for tr in await container.locator("tr").all():
+        try:
+            th = tr.locator("th").first
+            td = tr.locator("td").first
+            if await th.count() > 0 and await td.count() > 0:
+                add_container_row_pair(specs, (await th.inner_text()).strip(), (await td.inner_text()).strip())
+        except Exception:
+            continue
+
+    for row in await container.locator(KV_ROW_SELECTOR).all():
+        try:
+            key_elem = row.locator(".key, .spec_key").first
+            value_elem = row.locator(".value, .spec_value").first
+            if await key_elem.count() > 0 and await value_elem.count() > 0:
+                add_plain_pair(specs, (await key_elem.inner_text()).strip(), (await value_elem.inner_text()).strip())
+        except Exception:
+            continue
+
+    for group in await page.locator("table").all() + await page.locator(DETAIL_AREA_SELECTOR).all():
+        await _collect_row_pairs(await group.locator("tr").all(), specs)
+
+    return specs
+
+
+async def extract_specs_in_page(page: Page) -> Dict[str, str]:
+    result = await page.evaluate(EXTRACT_SPECS_JS, spec_extract_options())
+    count_container_fallback(result["container"])
+    return {key: value for key, value in result["pairs"]}
+
+
+async def extract_specs(page: Page, engine: str = "js", memo: Optional[SelectorMemo] = None) -> Dict[str, str]:
+    with danawa_metrics.stage("extract"):
+        if engine == "locator":
+            return await extract_specs_from_detail(page, memo)
+        return await extract_specs_in_page(page)
+
+
+async def click_detail_tab_if_present(
+    page: Page, memo: Optional[SelectorMemo] = None, wait_mode: str = "fixed"
+) -> None:
+    with danawa_metrics.stage("tab"):
+        await _click_detail_tab(page, memo, wait_mode)
+
+
+async def _click_detail_tab(page: Page, memo: Optional[SelectorMemo], wait_mode: str) -> None:
+    for candidate in ordered(memo, "detail_tab", DETAIL_TAB_CANDIDATES):
+        control = candidate_locator(page, candidate)
+        if await control.count() > 0:
+            try:
+                await control.first.click(timeout=2000)
+                await settle_after_click(page, wait_mode)
+                record_detail_tab(memo, candidate)
+                return
+            except Exception:
+                pass
+    record_detail_tab(memo, None)
+
+
+async def collect_product_links_from_category(
+    page: Page, max_per_page: Optional[int], memo: Optional[SelectorMemo] = None
+) -> List[str]:
+    links, matched = await _collect_links(page, PRODUCT_LINK_SELECTORS, max_per_page)
+    record_product_links(memo, matched)
+    return links
+
+
+async def _collect_links(
+    page: Page, selectors: List[str], max_per_page: Optional[int]
+) -> Tuple[List[str], Optional[str]]:
+    links: List[str] = []
+    seen: Set[str] = set()
+    matched: Optional[str] = None
+    for selector in selectors:
+        if await page.locator(selector).count() == 0:
+            continue
+        for a in await page.locator(selector).all():
+            try:
+                href = await a.get_attribute("href")
+                text = ((await a.inner_text()) or "").strip()
+            except Exception:
+                continue
+            if not accept_product_link(href, text, seen):
+                continue
+            links.append(href)
+            if matched is None:
+                matched = selector
+            if max_per_page and len(links) >= max_per_page:
+                return links, matched
+    return links, matched
+
+
+async def move_to_list_page(page: Page, page_num: int) -> bool:
+    try:
+        if await page.evaluate(HAS_MOVE_PAGE_JS):
+            await page.evaluate(MOVE_PAGE_JS, page_num)
+            await wait_for_network_idle(page)
+            return True
+    except Exception:
+        pass
+
+    for _ in range(page_num // 10 + 1):
+        button = list_page_button(page, page_num)
+        if await button.count() > 0:
+            try:
+                await button.first.click()
+                await wait_for_network_idle(page)
+                return True
+            except Exception:
+                return False
+        group_next = page.locator(LIST_GROUP_NEXT_SELECTOR)
+        if await group_next.count() == 0:
+            break
+        try:
+            await group_next.first.click()
+            await wait_for_network_idle(page)
+        except Exception:
+            break
+    return False
+
+
+async def paginate_category(
+    page: Page, current_url: str, page_num: int, memo: Optional[SelectorMemo] = None
+) -> bool:
+    if await move_to_list_page(page, page_num):
+        return True
+    danawa_metrics.count("fallback.pager")
+
+    try:
+        next_url = next_page_url(current_url, page_num)
+        if next_url != current_url:
+            await page.goto(next_url)
+            await wait_for_network_idle(page)
+            return True
+    except Exception:
+        pass
+
+    for candidate in ordered(memo, "pager", PAGER_CANDIDATES):
+        control = candidate_locator(page, candidate)
+        if await control.count() > 0:
+            try:
+                await control.first.click()
+                await wait_for_network_idle(page)
+                remember(memo, "pager", candidate)
+                return True
+            except Exception:
+                pass
+
+    remember(memo, "pager", None)
+    return False
+
+
+async def load_product_page(
+    detail_page: Page,
+    link: str,
+    base_delay_ms: int,
+    memo: Optional[SelectorMemo] = None,
+    wait_mode: str = "fixed",
+    waits=None,
+    rate=None,
+) -> Tuple[str, int]:
+    goto_started = time.perf_counter()
+    with danawa_metrics.stage("goto"):
+        try:
+            response = await detail_page.goto(link, wait_until="domcontentloaded", timeout=15000)
+        except Exception as e:
+            observe_goto_error(rate, e)
+            raise
+    status = observe_page_status(rate, response, goto_started)
+    started = time.perf_counter()
+    ready = None
+    if wait_mode == "ready":
+        ready = await wait_for_spec_ready(detail_page, 2000)
+        if not ready:
+            await detail_page.evaluate("() => window.scrollTo(0, document.body.scrollHeight)")
+            ready = await wait_for_spec_ready(detail_page)
+    else:
+        await wait_for_network_idle(detail_page)
+        await slow_scroll(detail_page, steps=4, step_px=900, base_delay_ms=base_delay_ms)
+    await click_detail_tab_if_present(detail_page, memo, wait_mode)
+    if waits is not None:
+        waits.record(link, (time.perf_counter() - started) * 1000, ready)
+    title = ""
+    try:
+        title = (await detail_page.title()) or ""
+    except Exception as e:
+        print(f"    경고: 제목 추출 실패 - {e}")
+    if danawa_metrics.enabled():
+        try:
+            danawa_metrics.add_bytes(int(await detail_page.evaluate(danawa_metrics.PAGE_BYTES_JS)))
+        except Exception:
+            pass
+    return title, status
+
+
+class DetailCrawler:
+    # 한 번의 크롤링에서 모든 상세 페이지 워커가 공유하는 설정과 자원
+    def __init__(
+        self,
+        pool,
+        category_url: str,
+        base_delay_ms: int,
+        extract_engine: str = "js",
+        parse_pool: Optional[ProcessPoolExecutor] = None,
+        cache=None,
+        output=None,
+        memo: Optional[SelectorMemo] = None,
+        wait_mode: str = "fixed",
+        waits=None,
+        rate=None,
+        http=None,
+        retry: Optional[RetryQueue] = None,
+    ) -> None:
+        self.pool = pool
+        self.category_url = category_url
+        self.base_delay_ms = base_delay_ms
+        self.extract_engine = extract_engine
+        self.parse_pool = parse_pool
+        self.cache = cache
+        self.output = output
+        self.memo = memo
+        self.wait_mode = wait_mode
+        self.waits = waits
+        self.rate = rate
+        self.http = http
+        # 재시도 없이 실패만 세는 큐가 기본값
+        self.retry = retry if retry is not None else RetryQueue(category_url, max_retries=0)
+        self.limiter = PolitenessLimiter(base_delay_ms, rate)
+
+    async def parse_html(self, title: str, link: str, page_html: str) -> Dict[str, str]:
+        # 프로세스 풀이 있으면 그쪽에서 파싱 (브라우저 작업과 겹쳐서 진행)
+        from danawa_parse import parse_detail_pairs
+
+        with danawa_metrics.stage("parse"):
+            if self.parse_pool is not None:
+                loop = asyncio.get_running_loop()
+                pairs = await loop.run_in_executor(self.parse_pool, parse_detail_pairs, page_html)
+            else:
+                pairs = parse_detail_pairs(page_html)
+        return pairs_row(title, link, pairs)
+
+    async def crawl(self, link: str) -> Dict[str, str]:
+        cached = self.cache.get(link) if self.cache is not None else None
+        if cached is not None:
+            meta, page_html = cached
+            return await self.parse_html(str(meta.get("title", "")), link, page_html)
+
+        if self.http is not None:
+            # 서버 렌더링 HTML 에 스펙이 있으면 브라우저 탭을 쓰지 않음
+            async with self.limiter.slot():
+                await self.limiter.wait()
+                fetched = await self.http.fetch(link)
+            if fetched is not None:
+                title, page_html, status, specs = fetched
+                store_page(self.cache, link, page_html, title, status, self.category_url)
+                return detail_row(title, link, specs)
+
+        async with self.limiter.slot():
+            await self.limiter.wait()
+            async with self.pool.page() as detail_page:
+                title, status = await load_product_page(
+                    detail_page, link, self.base_delay_ms, self.memo, self.wait_mode, self.waits, self.rate
+                )
+                page_html = None
+                cacheable = is_cacheable(self.cache, status)
+                if self.parse_pool is not None or cacheable:
+                    with danawa_metrics.stage("content"):
+                        page_html = await detail_page.content()
+                if self.parse_pool is None:
+                    specs = await extract_specs(detail_page, self.extract_engine, self.memo)
+        if cacheable:
+            store_page(self.cache, link, page_html, title, status, self.category_url)
+        if self.parse_pool is None:
+            return detail_row(title, link, specs)
+
+        # 페이지를 풀에 반납한 뒤 파싱
+        return await self.parse_html(title, link, page_html)
+
+    async def crawl_links(
+        self, links: List[str], concurrency: int, entries: Optional[Dict[str, RetryItem]] = None
+    ) -> int:
+        # 공유 작업 큐에서 N개 워커가 링크를 꺼내 처리, 완료된 행은 바로 출력에 기록
+        # entries: 재시도 중인 링크의 RetryItem (없으면 첫 시도)
+        queue: "asyncio.Queue[str]" = asyncio.Queue()
+        for link in links:
+            queue.put_nowait(link)
+        succeeded = 0
+
+        async def worker() -> None:
+            nonlocal succeeded
+            while True:
+                try:
+                    link = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                if await self.crawl_one(link, (entries or {}).get(link)):
+                    succeeded += 1
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(links)))))
+        return succeeded
+
+    async def crawl_one(self, link: str, entry: Optional[RetryItem] = None) -> bool:
+        # 상품 하나를 처리해서 출력에 기록. 실패하면 빈 행 대신 재시도 큐에 넣고 False
+        print(f"  {link[:80]}... {'재시도' if entry is not None else '크롤링'} 중...")
+        with danawa_metrics.item("product", link):
+            if entry is None:
+                self.retry.record_attempt()
+            else:
+                danawa_metrics.count("retries")
+            try:
+                row = await self.crawl(link)
+            except Exception as e:
+                print(f"    오류: {link} 크롤링 실패 - {e}")
+                danawa_metrics.fail_item(e)
+                self.retry.defer(PRODUCT, link, e, entry)
+                return False
+        if entry is not None:
+            self.retry.recovered(entry)
+        self.output.add(row)
+        print(f"    완료! (총 {self.output.rows_written}개 수집) {link[:80]}")
+        return True
+
+
+class ItemBudget:
+    # --max-total-items 를 정확히 지키기 위한 슬롯 예약: 저장된 행 + 처리 중인 상품 <= limit
+    # 처리 중인 상품이 실패하면 슬롯이 풀려 다음 링크가 대신 들어감
+    def __init__(self, output, limit: Optional[int]) -> None:
+        self.output = output
+        self.limit = limit
+        self.in_flight = 0
+        self._changed = asyncio.Condition()
+
+    def exhausted(self) -> bool:
+        return bool(self.limit) and self.output.rows_written >= self.limit
+
+    async def reserve(self) -> bool:
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: self.exhausted() or not self.limit or self.output.rows_written + self.in_flight < self.limit
+            )
+            if self.exhausted():
+                return False
+            self.in_flight += 1
+            return True
+
+    async def release(self) -> None:
+        async with self._changed:
+            self.in_flight -= 1
+            self._changed.notify_all()
+
+    async def wait_for_need(self, queued: Callable[[], int]) -> bool:
+        # 목록 생산자용: 대기 중/처리 중인 링크로 한도를 채울 수 있으면 다음 목록 페이지를 미리 받지 않음
+        if not self.limit:
+            return True
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: self.exhausted() or self.output.rows_written + self.in_flight + queued() < self.limit
+            )
+            return not self.exhausted()
+
+    async def notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+
+async def crawl_pipelined(
+    crawler: DetailCrawler,
+    pager,
+    output,
+    category_url: str,
+    start_page: int,
+    max_pages: int,
+    max_total_items: Optional[int],
+    concurrency: int,
+    queue_size: int,
+    base_delay_ms: int,
+) -> None:
+    # 목록 생산자 하나가 페이지를 넘기며 크기 제한 큐에 링크를 넣고, 상세 소비자 N개가 동시에 꺼내 처리
+    # 큐가 가득 차면 생산자가 멈추므로(백프레셔) 목록이 상세 크롤링보다 queue_size 이상 앞서가지 않음
+    queue: "asyncio.Queue[Optional[Tuple[int, str]]]" = asyncio.Queue(maxsize=max(1, queue_size))
+    budget = ItemBudget(output, max_total_items)
+    # 페이지별 남은 링크 수. 체크포인트 페이지는 아직 끝나지 않은 가장 앞 페이지 (재개 시 거기서부터)
+    remaining: Dict[int, int] = {}
+    page_links: Dict[int, List[str]] = {}
+    produced_page = start_page
+    checkpoint_page = start_page
+
+    def update_checkpoint() -> None:
+        # 체크포인트 페이지가 바뀔 때만 저장. 그 뒤 페이지에서 이미 끝난 상품은 완료 목록에 남김
+        nonlocal checkpoint_page
+        page_index = min(remaining) if remaining else produced_page
+        if page_index == checkpoint_page:
+            return
+        checkpoint_page = page_index
+        for earlier in [p for p in page_links if p < page_index]:
+            del page_links[earlier]
+        output.set_page(page_index, [link for links in page_links.values() for link in links])
+
+    async def produce_pages() -> None:
+        nonlocal produced_page
+        for page_index in range(start_page, max_pages):
+            if not await budget.wait_for_need(queue.qsize):
+                return
+            print(f"페이지 {page_index + 1}/{max_pages} 목록 수집 중... (대기 {queue.qsize()}개)")
+            crawler.retry.record_attempt()
+            try:
+                with danawa_metrics.item("list", f"{category_url}#{page_index + 1}"):
+                    product_links = await pager.links_for_page(page_index + 1)
+            except Exception as e:
+                print(f"페이지 {page_index + 1} 처리 중 오류 발생: {e}")
+                crawler.retry.defer(LIST, page_index, e)
+                continue
+            print(f"  - {len(product_links)}개 링크 발견")
+            if not product_links:
+                print(f"  - 페이지 {page_index + 1}에 제품이 없습니다. 종료합니다.")
+                return
+
+            pending = [link for link in product_links if not output.is_done(link)]
+            produced_page = page_index
+            page_links[page_index] = pending
+            if pending:
+                remaining[page_index] = len(pending)
+            update_checkpoint()
+            for link in pending:
+                with danawa_metrics.stage("queue_wait"):
+                    await queue.put((page_index, link))
+            if page_index < max_pages - 1:
+                await human_delay(base_delay_ms)
+
+    async def produce() -> None:
+        # 정상 종료(마지막 페이지/빈 페이지/한도 도달)에서만 소비자 종료 신호를 보냄
+        await produce_pages()
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def consume() -> None:
+        while True:
+            entry = await queue.get()
+            await budget.notify()
+            if entry is None:
+                return
+            page_index, link = entry
+            try:
+                # 여러 페이지에 같은 상품이 나오면 한 번만, 한도에 도달했으면 남은 링크는 버림
+                if output.is_done(link) or not await budget.reserve():
+                    continue
+                try:
+                    await crawler.crawl_one(link)
+                finally:
+                    await budget.release()
+            finally:
+                remaining[page_index] -= 1
+                if remaining[page_index] == 0:
+                    del remaining[page_index]
+                update_checkpoint()
+
+    # 한쪽이 예외로 끝나면 나머지가 큐에서 영원히 기다리지 않도록 모두 취소하고 예외를 올림
+    tasks = [asyncio.ensure_future(produce())] + [asyncio.ensure_future(consume()) for _ in range(concurrency)]
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    for task in done:
+        task.result()
+    if max_total_items and output.rows_written >= max_total_items:
+        print(f"최대 아이템 수({max_total_items})에 도달했습니다.")
+
+
+async def drain_retries(
+    crawler: DetailCrawler, pager, output, max_total_items: Optional[int], concurrency: int
+) -> None:
+    # 정상 흐름이 끝난 뒤 남은 재시도를 백오프 시각에 맞춰 처리
+    # 한도에는 상품만 세고, 이번에 못 넣은 상품은 큐에 되돌려서 실패한 자리를 채우거나 종료 시 실패 파일에 기록
+    retry = crawler.retry
+    while len(retry):
+        remaining = (max_total_items - output.rows_written) if max_total_items else None
+        if remaining is not None and remaining <= 0:
+            return
+        wait_s = retry.next_delay_s() or 0.0
+        if wait_s > 0:
+            print(f"재시도 대기 {wait_s:.1f}초 ({len(retry)}개 남음)")
+            await asyncio.sleep(wait_s)
+        links: List[str] = []
+        entries: Dict[str, RetryItem] = {}
+        leftover: List[RetryItem] = []
+
+        def take(entry: RetryItem) -> None:
+            if output.is_done(entry.target) or entry.target in entries or entry.target in links:
+                return
+            if remaining is not None and len(links) >= remaining:
+                leftover.append(entry)
+                return
+            links.append(entry.target)
+            if entry.attempts:
+                entries[entry.target] = entry
+
+        # 재시도 상품을 먼저 채우고 목록 페이지에서 나온 링크는 그 뒤에
+        for entry in sorted(retry.due(), key=lambda entry: entry.kind == LIST):
+            if entry.kind == PRODUCT:
+                take(entry)
+                continue
+            print(f"페이지 {entry.target + 1} 목록 재시도 ({entry.attempts}회 실패)")
+            try:
+                with danawa_metrics.item("list", f"{crawler.category_url}#{entry.target + 1}"):
+                    danawa_metrics.count("retries")
+                    product_links = await pager.links_for_page(entry.target + 1)
+            except Exception as e:
+                print(f"  오류: 페이지 {entry.target + 1} 목록 재시도 실패 - {e}")
+                retry.defer(LIST, entry.target, e, entry)
+                continue
+            retry.recovered(entry)
+            print(f"  - {len(product_links)}개 링크 발견")
+            for link in product_links:
+                take(RetryItem(PRODUCT, link, crawler.category_url))
+        for entry in leftover:
+            retry.requeue(entry)
+        if links:
+            await crawler.crawl_links(links, concurrency, entries)
+
+
+async def crawl_category_async(
+    category_url: str,
+    output,
+    max_pages: int,
+    max_items_per_page: Optional[int],
+    headless: bool,
+    max_total_items: Optional[int] = None,
+    base_delay_ms: int = 500,
+    concurrency: int = 4,
+    extract_engine: str = "js",
+    parse_pool: Optional[ProcessPoolExecutor] = None,
+    router=None,
+    cache=None,
+    start_page: int = 0,
+    list_mode: str = "xhr",
+    memo: Optional[SelectorMemo] = None,
+    wait_mode: str = "fixed",
+    waits=None,
+    browser=None,
+    recycle_after: int = 200,
+    max_heap_mb: float = 0,
+    rate=None,
+    fetch_mode: str = "browser",
+    http2: bool = False,
+    http_min_specs: int = 3,
+    pipeline: bool = False,
+    queue_size: int = 0,
+    retry: Optional[RetryQueue] = None,
+) -> None:
+    from danawa_pagination import AsyncListPager
+    from danawa_pool import AsyncPagePool
+
+    async with AsyncExitStack() as stack:
+        if browser is None:
+            p = await stack.enter_async_context(async_playwright())
+            browser = await p.chromium.launch(headless=headless)
+            stack.push_async_callback(browser.close)
+        pool = AsyncPagePool(browser, recycle_after, max_heap_mb, router)
+        stack.push_async_callback(pool.close)
+        http = None
+        if fetch_mode == "hybrid":
+            from danawa_http import AsyncHttpFetcher
+
+            http = AsyncHttpFetcher(http2, http_min_specs, max_connections=max(1, concurrency), rate=rate)
+            stack.push_async_callback(http.close)
+        # 목록 페이지는 카테고리가 끝날 때까지 풀에서 빌려 둠
+        page = await pool.acquire()
+        page.set_default_timeout(10000)
+        if router is not None:
+            router.assign(page, "category")
+
+        await page.goto(category_url)
+        await wait_for_network_idle(page)
+        await slow_scroll(page)
+        await human_delay(base_delay_ms)
+
+        crawler = DetailCrawler(
+            pool,
+            category_url,
+            base_delay_ms,
+            extract_engine,
+            parse_pool,
+            cache,
+            output,
+            memo,
+            wait_mode,
+            waits,
+            rate,
+            http,
+            retry,
+        )
+        # 목록 XHR 을 캡처하면 이후 페이지는 concurrency 개씩 미리 받아 둠
+        pager = AsyncListPager(
+            page,
+            category_url,
+            max_items_per_page,
+            mode=list_mode,
+            prefetch=concurrency,
+            memo=memo,
+            max_pages=max_pages,
+        )
+
+        if pipeline:
+            await crawl_pipelined(
+                crawler,
+                pager,
+                output,
+                category_url,
+                start_page,
+                max_pages,
+                max_total_items,
+                concurrency,
+                queue_size or concurrency * 2,
+                base_delay_ms,
+            )
+        else:
+            for page_index in range(start_page, max_pages):
+                try:
+                    output.set_page(page_index)
+                    print(f"페이지 {page_index + 1}/{max_pages} 크롤링 중... (동시 {concurrency})")
+                    crawler.retry.record_attempt()
+                    with danawa_metrics.item("list", f"{category_url}#{page_index + 1}"):
+                        product_links = await pager.links_for_page(page_index + 1)
+                    print(f"  - {len(product_links)}개 링크 발견")
+
+                    if not product_links:
+                        print(f"  - 페이지 {page_index + 1}에 제품이 없습니다. 종료합니다.")
+                        break
+
+                    # 실패 분을 메우기 위해 남은 링크는 다음 배치로 넘김
+                    pending = [link for link in product_links if not output.is_done(link)]
+                    while pending:
+                        remaining = (max_total_items - output.rows_written) if max_total_items else len(pending)
+                        if remaining <= 0:
+                            break
+                        batch, pending = pending[:remaining], pending[remaining:]
+                        await crawler.crawl_links(batch, concurrency)
+
+                    if max_total_items and output.rows_written >= max_total_items:
+                        print(f"최대 아이템 수({max_total_items})에 도달했습니다.")
+                        break
+
+                    if page_index < max_pages - 1:
+                        await human_delay(base_delay_ms)
+                except Exception as e:
+                    print(f"페이지 {page_index + 1} 처리 중 오류 발생: {e}")
+                    crawler.retry.defer(LIST, page_index, e)
+
+        await drain_retries(crawler, pager, output, max_total_items, concurrency)
+        print(f"완료! {output.rows_written}개 행 저장: {output.writer.path}")
+        if router is not None:
+            print("요청 라우팅 통계:")
+            print(router.stats.summary())
+        if cache is not None:
+            print(cache.summary())
+        if memo is not None:
+            print("선택자 메모 통계:")
+            print(memo.summary())
+        if waits is not None:
+            print(waits.summary())
+        print(pool.summary())
+        if http is not None:
+            print(http.stats.summary())
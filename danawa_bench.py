@@ -0,0 +1,466 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from danawa_clean import build_detail_info
+from danawa_crawler import crawl_category
+from danawa_parse import parse_specs_from_html
+
+# 상세 스펙 레이아웃 (extract_specs_from_detail 가 처리하는 세 가지)
+LAYOUTS = ("dl", "table", "kv")
+
+# 이유식 카테고리 실제 페이지에서 보이는 키/값 형태 (정리 규칙이 걸리는 잡음 포함)
+_SPEC_POOL: List[Tuple[str, List[str]]] = [
+    ("제조회사", ["매일유업(주) 제조사 웹사이트 바로가기", "남양유업 (제조사 웹사이트)", "베베쿡"]),
+    ("브랜드", ["맘마밀", "아이꼬야", "베베쿡 처음먹는"]),
+    ("원산지", ["국내산", "국산(쌀), 호주산(소고기)", "상세설명 / 판매 사이트 문의"]),
+    ("중량", ["100g", "1,200g (100g x 12개)", "140g(2개입"]),
+    ("용량", ["180ml", "200ml x 24개", "125ml"]),
+    ("단계", ["1단계", "2단계 (6개월~)", "3단계"]),
+    ("레토르트이유식", ["○"]),
+    ("파우치", ["○"]),
+    ("상온", ["○"]),
+    ("6개월~", ["○"]),
+    ("HACCP인증", ["○"]),
+    ("적합성평가인증", ["인증번호 확인", "R-R-abc-1234 인증번호 확인"]),
+    ("안전확인인증", ["상세설명", "SU071234-15001 인증번호 확인"]),
+    ("등록년월", ["2023년 03월", "2024년 11월"]),
+    ("유통기한", ["제조일로부터 12개월", "상세설명 / 판매 사이트 문의"]),
+]
+
+_CATEGORY_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{category} - 다나와</title></head>
+<body>
+<div id="productListArea">{items}</div>
+<div class="number_wrap">{buttons}</div>
+<a class="edge_nav nav_next" href="javascript:movePage({next_group})">다음</a>
+<script>
+function movePage(n) {{
+  return fetch("/danawa/list/ajax", {{
+    method: "POST",
+    headers: {{"Content-Type": "application/x-www-form-urlencoded"}},
+    body: "categoryCode={category}&page=" + n + "&limit={per_page}"
+  }}).then(function (r) {{ return r.text(); }}).then(function (html) {{
+    document.getElementById("productListArea").innerHTML = html;
+  }});
+}}
+</script>
+</body></html>"""
+
+_PRODUCT_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<div class="prod_tab"><a href="#detail" class="tab_link">상세정보</a><a href="#review">상품리뷰</a></div>
+<div id="holder">{specs}</div>
+{deferred}
+</body></html>"""
+
+# render_delay_ms > 0 이면 스펙 영역을 스크립트로 늦게 붙여서 실제 사이트처럼 대기 조건을 검증
+# (서버 HTML 에는 스펙 마크업이 없으므로 --fetch-mode hybrid 는 브라우저로 넘어감)
+_DEFERRED_JS = """<script>setTimeout(function () {{
+  document.getElementById("holder").insertAdjacentHTML("beforeend", {specs});
+}}, {delay});</script>"""
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def render_specs(layout: str, specs: List[Tuple[str, str]]) -> str:
+    if layout == "dl":
+        rows = "".join(f"<dt>{_escape(k)}</dt><dd>{_escape(v)}</dd>" for k, v in specs)
+        return f'<div class="spec_area"><dl>{rows}</dl></div>'
+    if layout == "table":
+        rows = "".join(f"<tr><th>{_escape(k)}</th><td>{_escape(v)}</td></tr>" for k, v in specs)
+        return f'<table class="spec_table"><tbody>{rows}</tbody></table>'
+    rows = "".join(
+        f'<div><span class="key">{_escape(k)}</span><span class="value">{_escape(v)}</span></div>' for k, v in specs
+    )
+    return f'<div class="prod_spec_cont">{rows}</div>'
+
+
+class FixtureSite:
+    # 다나와와 같은 구조의 합성 카테고리/상품 페이지. 같은 seed 면 항상 같은 HTML
+    # recorded_pages 를 주면 상품 페이지는 그 HTML 을 순서대로 돌려가며 사용
+    def __init__(
+        self,
+        pages: int = 3,
+        per_page: int = 20,
+        seed: int = 1,
+        category: str = "16249091",
+        render_delay_ms: int = 0,
+        recorded_pages: Optional[List[str]] = None,
+    ) -> None:
+        self.pages = pages
+        self.per_page = per_page
+        self.seed = seed
+        self.category = category
+        self.render_delay_ms = render_delay_ms
+        self.recorded_pages = recorded_pages or []
+
+    def pcode(self, page_num: int, index: int) -> int:
+        return 10000000 + page_num * 1000 + index
+
+    def specs_for(self, pcode: int) -> List[Tuple[str, str]]:
+        rng = random.Random(self.seed * 1000003 + pcode)
+        picked = rng.sample(_SPEC_POOL, rng.randint(8, len(_SPEC_POOL)))
+        return [(key, rng.choice(values)) for key, values in picked]
+
+    def layout_for(self, pcode: int) -> str:
+        return LAYOUTS[pcode % len(LAYOUTS)]
+
+    def list_items(self, page_num: int, base_url: str = "") -> str:
+        # 실제 다나와처럼 절대 URL 링크 (DOM 경로는 href 를 그대로 goto 함)
+        if page_num < 1 or page_num > self.pages:
+            return '<ul class="product_list"></ul>'
+        items = []
+        for index in range(self.per_page):
+            pcode = self.pcode(page_num, index)
+            items.append(
+                f'<li class="prod_item"><div class="prod_info">'
+                f'<a class="prod_link" href="{base_url}/danawa/info/?pcode={pcode}&cate={self.category}">상품 {pcode}</a>'
+                f'<a href="{base_url}/danawa/info/?pcode={pcode}#bookmark_cm_opinion">가격비교</a>'
+                f"</div></li>"
+            )
+        return f'<ul class="product_list">{"".join(items)}</ul>'
+
+    def category_page(self, base_url: str = "") -> str:
+        buttons = "".join(
+            f'<a class="num" href="javascript:movePage({n})">{n}</a>' for n in range(1, min(self.pages, 10) + 1)
+        )
+        return _CATEGORY_HTML.format(
+            category=self.category,
+            items=self.list_items(1, base_url),
+            buttons=buttons,
+            next_group=11,
+            per_page=self.per_page,
+        )
+
+    def product_page(self, pcode: int) -> str:
+        if self.recorded_pages:
+            return self.recorded_pages[pcode % len(self.recorded_pages)]
+        specs = render_specs(self.layout_for(pcode), self.specs_for(pcode))
+        if self.render_delay_ms > 0:
+            deferred = _DEFERRED_JS.format(specs=json.dumps(specs).replace("</", "<\\/"), delay=self.render_delay_ms)
+            return _PRODUCT_HTML.format(title=f"상품 {pcode}", specs="", deferred=deferred)
+        return _PRODUCT_HTML.format(title=f"상품 {pcode}", specs=specs, deferred="")
+
+    def product_pages(self) -> List[str]:
+        return [
+            self.product_page(self.pcode(page_num, index))
+            for page_num in range(1, self.pages + 1)
+            for index in range(self.per_page)
+        ]
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _base_url(self) -> str:
+        return f"http://{self.headers.get('Host', '127.0.0.1')}"
+
+    def _send(self, body: str, status: int = 200) -> None:
+        latency_ms = self.server.latency_ms
+        if latency_ms:
+            time.sleep(latency_ms / 1000.0)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        site: FixtureSite = self.server.site
+        parts = urlsplit(self.path)
+        query = dict(parse_qsl(parts.query))
+        if parts.path == "/danawa/list/":
+            self._send(site.category_page(self._base_url()))
+        elif parts.path == "/danawa/info/" and query.get("pcode", "").isdigit():
+            self._send(site.product_page(int(query["pcode"])))
+        else:
+            self._send("not found", 404)
+
+    def do_POST(self) -> None:
+        site: FixtureSite = self.server.site
+        length = int(self.headers.get("Content-Length") or 0)
+        form = dict(parse_qsl(self.rfile.read(length).decode("utf-8")))
+        if urlsplit(self.path).path == "/danawa/list/ajax" and form.get("page", "").isdigit():
+            self._send(site.list_items(int(form["page"]), self._base_url()))
+        else:
+            self._send("not found", 404)
+
+
+class FixtureServer:
+    # 127.0.0.1 의 빈 포트에서 FixtureSite 를 서비스. URL 에 "danawa" 가 들어가야 is_product_link 를 통과함
+    def __init__(self, site: FixtureSite, latency_ms: int = 0, port: int = 0) -> None:
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _FixtureHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.site = site
+        self.httpd.latency_ms = latency_ms
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def category_url(self) -> str:
+        return f"{self.base_url}/danawa/list/?cate={self.httpd.site.category}"
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _latency_result(samples_ms: List[float], items: int, seconds: float) -> Dict[str, float]:
+    return {
+        "items": items,
+        "seconds": round(seconds, 4),
+        "items_per_sec": round(items / seconds, 2) if seconds > 0 else 0.0,
+        "p50_ms": round(_percentile(samples_ms, 0.5), 3),
+        "p95_ms": round(_percentile(samples_ms, 0.95), 3),
+        "p99_ms": round(_percentile(samples_ms, 0.99), 3),
+    }
+
+
+def time_each(func: Callable, inputs: List, repeat: int, warmup: int = 1) -> Dict[str, float]:
+    # 입력마다 호출 시간을 재고, repeat 번 반복 중 처리량이 중앙값인 회차를 결과로 사용
+    for value in inputs[:warmup]:
+        func(value)
+    runs = []
+    for _ in range(repeat):
+        samples = []
+        started = time.perf_counter()
+        for value in inputs:
+            t0 = time.perf_counter()
+            func(value)
+            samples.append((time.perf_counter() - t0) * 1000)
+        runs.append(_latency_result(samples, len(inputs), time.perf_counter() - started))
+    return _median_run(runs)
+
+
+def _median_run(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    runs = sorted(runs, key=lambda run: run["items_per_sec"])
+    result = dict(runs[len(runs) // 2])
+    result["runs"] = len(runs)
+    result["spread_pct"] = round(
+        (runs[-1]["items_per_sec"] - runs[0]["items_per_sec"]) / result["items_per_sec"] * 100, 1
+    ) if result["items_per_sec"] else 0.0
+    return result
+
+
+def bench_stages(pages: List[str], repeat: int, browser_stages: bool = False) -> Dict[str, Dict[str, float]]:
+    # 네트워크 없이 추출/정리 단계만 측정
+    results = {"parse_lxml": time_each(parse_specs_from_html, pages, repeat)}
+    specs = [parse_specs_from_html(page_html) for page_html in pages]
+    results["clean"] = time_each(build_detail_info, specs, repeat)
+    if browser_stages:
+        results.update(_bench_browser_extract(pages, repeat))
+    return results
+
+
+def _bench_browser_extract(pages: List[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    # 브라우저 추출 엔진: set_content 로 HTML 을 올린 뒤 extract_specs 시간만 잼
+    from playwright.sync_api import sync_playwright
+
+    from danawa_crawler import CONTEXT_OPTIONS, extract_specs
+
+    results = {}
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=True)
+        try:
+            page = browser.new_context(**CONTEXT_OPTIONS).new_page()
+            for engine in ("js", "locator"):
+                runs = []
+                for _ in range(repeat):
+                    samples = []
+                    for page_html in pages:
+                        page.set_content(page_html)
+                        t0 = time.perf_counter()
+                        extract_specs(page, engine)
+                        samples.append((time.perf_counter() - t0) * 1000)
+                    runs.append(_latency_result(samples, len(samples), sum(samples) / 1000))
+                results[f"extract_{engine}"] = _median_run(runs)
+        finally:
+            browser.close()
+    return results
+
+
+def bench_end_to_end(
+    site: FixtureSite, latency_ms: int, repeat: int, crawl_options: Dict[str, object], verbose: bool = False
+) -> Dict[str, float]:
+    # 로컬 서버를 상대로 crawl_category 전체 실행. 상품별 시간은 --metrics-jsonl 기록에서 읽음
+    runs = []
+    with FixtureServer(site, latency_ms) as server, tempfile.TemporaryDirectory() as workdir:
+        for run in range(repeat):
+            output_csv = os.path.join(workdir, f"bench_{run}.csv")
+            metrics_jsonl = os.path.join(workdir, f"bench_{run}.jsonl")
+            log = io.StringIO()
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(sys.stdout if verbose else log):
+                crawl_category(
+                    server.category_url,
+                    output_csv,
+                    max_pages=site.pages + 1,
+                    max_items_per_page=site.per_page,
+                    headless=True,
+                    metrics_jsonl=metrics_jsonl,
+                    **crawl_options,
+                )
+            seconds = time.perf_counter() - started
+            samples = []
+            with open(metrics_jsonl, encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record["kind"] == "product" and record["ok"]:
+                        samples.append(record["total_ms"])
+            runs.append(_latency_result(samples, len(samples), seconds))
+    result = _median_run(runs)
+    result["items_per_min"] = round(result["items_per_sec"] * 60, 1)
+    return result
+
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float
+) -> List[str]:
+    # 처리량이 tolerance 이상 줄거나 p95 가 tolerance 이상 늘면 회귀
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if before.get("items_per_sec") and current["items_per_sec"] < before["items_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: 처리량 {before['items_per_sec']} -> {current['items_per_sec']}/s")
+        if before.get("p95_ms") and current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {current['p95_ms']}ms")
+    return regressions
+
+
+def load_recorded_pages(cache_dir: str, limit: Optional[int] = None) -> List[str]:
+    # --cache-dir 로 저장해 둔 실제 상품 HTML (정렬 순서 고정)
+    from danawa_cache import HtmlCache, read_cached_html
+
+    entries = sorted(HtmlCache(cache_dir).entries(), key=lambda entry: str(entry[0].get("url", "")))
+    return [read_cached_html(html_path) for _, html_path in entries[:limit]]
+
+
+def format_results(results: Dict[str, Dict[str, float]]) -> str:
+    lines = [f"{'벤치마크':<16}{'항목':>7}{'처리량/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'편차%':>8}"]
+    for name, result in results.items():
+        lines.append(
+            f"{name:<16}{result['items']:>7}{result['items_per_sec']:>12.1f}{result['p50_ms']:>10.2f}"
+            f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['spread_pct']:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmarks against a local Danawa-like fixture site")
+    parser.add_argument("--suite", choices=["stages", "e2e", "all"], default="all")
+    parser.add_argument("--pages", type=int, default=3, help="Category pages in the fixture site")
+    parser.add_argument("--per-page", type=int, default=20, help="Products per category page")
+    parser.add_argument("--seed", type=int, default=1, help="Fixture content seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (median run is reported)")
+    parser.add_argument("--latency-ms", type=int, default=20, help="Artificial server latency per request")
+    parser.add_argument("--render-delay-ms", type=int, default=0, help="Attach the spec block after this delay (JS)")
+    parser.add_argument("--cache-dir", help="Use recorded product pages from an HtmlCache directory")
+    parser.add_argument("--browser-stages", action="store_true", help="Also time the js/locator extract engines")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--delay-ms", type=int, default=0, help="Crawler base delay during the e2e benchmark")
+    parser.add_argument("--extract-engine", choices=["js", "locator"], default="js")
+    parser.add_argument("--parse-mode", choices=["browser", "offline"], default="browser")
+    parser.add_argument("--fetch-mode", choices=["browser", "hybrid"], default="browser")
+    parser.add_argument("--pipeline", action="store_true", help="Overlap list pagination with detail crawling")
+    parser.add_argument("--wait-mode", choices=["fixed", "ready"], default="fixed")
+    parser.add_argument("--list-mode", choices=["xhr", "dom"], default="xhr")
+    parser.add_argument("--json-out", help="Write results as JSON (usable as a later --baseline)")
+    parser.add_argument("--baseline", help="Compare with a previous --json-out file and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression (default 0.15)")
+    parser.add_argument("--serve", action="store_true", help="Only serve the fixture site until interrupted")
+    parser.add_argument("--port", type=int, default=0, help="Port for --serve (default: any free port)")
+    parser.add_argument("--verbose", action="store_true", help="Show crawler output during the e2e benchmark")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    recorded = load_recorded_pages(args.cache_dir) if args.cache_dir else None
+    site = FixtureSite(args.pages, args.per_page, args.seed, render_delay_ms=args.render_delay_ms, recorded_pages=recorded)
+
+    if args.serve:
+        with FixtureServer(site, args.latency_ms, args.port) as server:
+            print(f"픽스처 사이트: {server.category_url} (Ctrl+C 로 종료)")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+        return
+
+    print(
+        f"Python {platform.python_version()} / {platform.machine()} / CPU {os.cpu_count()}개, "
+        f"seed {args.seed}, 상품 {args.pages * args.per_page}개, 반복 {args.repeat}회"
+    )
+    results: Dict[str, Dict[str, float]] = {}
+    if args.suite in ("stages", "all"):
+        results.update(bench_stages(site.product_pages(), args.repeat, args.browser_stages))
+    if args.suite in ("e2e", "all"):
+        crawl_options = {
+            "base_delay_ms": args.delay_ms,
+            "concurrency": args.concurrency,
+            "extract_engine": args.extract_engine,
+            "parse_mode": args.parse_mode,
+            "fetch_mode": args.fetch_mode,
+            "pipeline": args.pipeline,
+            "wait_mode": args.wait_mode,
+            "list_mode": args.list_mode,
+        }
+        results["crawl_e2e"] = bench_end_to_end(site, args.latency_ms, args.repeat, crawl_options, args.verbose)
+
+    print(format_results(results))
+    if "crawl_e2e" in results:
+        print(f"crawl_e2e: 분당 {results['crawl_e2e']['items_per_min']}개")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("성능 회귀:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"기준 대비 회귀 없음 (허용 {args.tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
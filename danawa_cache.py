@@ -0,0 +1,176 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from danawa_crawler import canonical_product_key
+
+
+class HtmlCache:
+    # 상품 키(pcode 또는 정규화 URL)의 해시를 파일명으로 쓰는 렌더링 HTML 캐시
+    # <root>/<해시 앞 2자리>/<해시>.html.gz 와 메타데이터 <해시>.json 으로 저장하며,
+    # html 파일의 mtime 을 마지막 접근 시각으로 사용해 용량 초과 시 LRU 로 정리
+    # 항목별 크기/접근 시각/수집 시각은 시작할 때 한 번만 읽고 이후에는 메모리에서 갱신
+    # (용량을 넘을 때마다 디렉터리 전체를 다시 읽지 않음)
+    def __init__(
+        self,
+        root: str,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        low_water_ratio: float = 0.9,
+    ) -> None:
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        # 정리할 때는 max_bytes 의 이 비율까지 줄여서 바로 다음 저장에서 다시 정리하지 않도록 함
+        self.low_water_ratio = low_water_ratio
+        self.hits = 0
+        self.misses = 0
+        # digest -> [크기, 마지막 접근 시각, 수집 시각]
+        self._entries: Dict[str, List[float]] = {}
+        self._total_bytes = 0
+        os.makedirs(root, exist_ok=True)
+        for digest, html_path, meta_path in self._scan():
+            meta = self._read_meta(meta_path)
+            try:
+                stat = os.stat(html_path)
+            except OSError:
+                continue
+            fetched_at = float(meta.get("fetched_at", 0)) if meta is not None else 0.0
+            self._track(digest, stat.st_size, stat.st_mtime, fetched_at)
+
+    def _paths(self, digest: str) -> Tuple[str, str]:
+        base = os.path.join(self.root, digest[:2], digest)
+        return base + ".html.gz", base + ".json"
+
+    def _scan(self) -> Iterator[Tuple[str, str, str]]:
+        for shard in sorted(os.listdir(self.root)):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.endswith(".json"):
+                    digest = name[: -len(".json")]
+                    html_path, meta_path = self._paths(digest)
+                    if os.path.exists(html_path):
+                        yield digest, html_path, meta_path
+
+    def _track(self, digest: str, size: int, accessed_at: float, fetched_at: float) -> None:
+        previous = self._entries.get(digest)
+        self._total_bytes += size - (int(previous[0]) if previous else 0)
+        self._entries[digest] = [size, accessed_at, fetched_at]
+
+    def _forget(self, digest: str) -> None:
+        entry = self._entries.pop(digest, None)
+        if entry is not None:
+            self._total_bytes -= int(entry[0])
+        for path in self._paths(digest):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def digest_for(url: str) -> str:
+        return hashlib.sha256(canonical_product_key(url).encode("utf-8")).hexdigest()
+
+    def _read_meta(self, meta_path: str) -> Optional[Dict[str, object]]:
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        if not self.ttl_seconds:
+            return True
+        return time.time() - fetched_at <= self.ttl_seconds
+
+    def get(self, url: str) -> Optional[Tuple[Dict[str, object], str]]:
+        digest = self.digest_for(url)
+        html_path, meta_path = self._paths(digest)
+        meta = self._read_meta(meta_path)
+        if meta is None or not self._is_fresh(float(meta.get("fetched_at", 0))) or not _is_ok_status(meta):
+            self.misses += 1
+            return None
+        try:
+            page_html = read_cached_html(html_path)
+            os.utime(html_path)  # LRU 접근 시각 갱신 (다음 실행 시작 때 읽음)
+        except OSError:
+            self.misses += 1
+            return None
+        entry = self._entries.get(digest)
+        if entry is not None:
+            entry[1] = time.time()
+        self.hits += 1
+        return meta, page_html
+
+    def put(self, url: str, page_html: str, **meta: object) -> None:
+        digest = self.digest_for(url)
+        html_path, meta_path = self._paths(digest)
+        os.makedirs(os.path.dirname(html_path), exist_ok=True)
+        now = time.time()
+        record = {"url": url, "key": canonical_product_key(url), "fetched_at": now, **meta}
+        # 중간에 죽어도 깨진 항목이 남지 않도록 임시 파일에 쓴 뒤 교체
+        with gzip.open(html_path + ".tmp", "wt", encoding="utf-8") as f:
+            f.write(page_html)
+        os.replace(html_path + ".tmp", html_path)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(meta_path + ".tmp", meta_path)
+        self._track(digest, os.path.getsize(html_path), now, now)
+        if self.max_bytes and self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        # 만료 항목을 먼저 지우고, 그래도 용량을 넘으면 가장 오래 접근하지 않은 항목부터
+        # max_bytes * low_water_ratio 아래로 내려갈 때까지 삭제 (메모리의 접근 시각 기준, 디스크 스캔 없음)
+        for digest, entry in list(self._entries.items()):
+            if not self._is_fresh(entry[2]):
+                self._forget(digest)
+        if not self.max_bytes or self._total_bytes <= self.max_bytes:
+            return
+        low_water = self.max_bytes * self.low_water_ratio
+        for digest in sorted(self._entries, key=lambda digest: self._entries[digest][1]):
+            if self._total_bytes <= low_water:
+                break
+            self._forget(digest)
+
+    def entries(self, category_url: Optional[str] = None) -> List[Tuple[Dict[str, object], str]]:
+        # 리플레이용: TTL 과 관계없이 저장된 항목의 (메타데이터, html 경로)를 수집 시각 순으로 반환 (오류 페이지 제외)
+        found = []
+        for digest, html_path, meta_path in self._scan():
+            meta = self._read_meta(meta_path)
+            if meta is None or not _is_ok_status(meta):
+                continue
+            if category_url and meta.get("category_url") != category_url:
+                continue
+            found.append((meta, html_path))
+        found.sort(key=lambda item: float(item[0].get("fetched_at", 0)))
+        return found
+
+    def summary(self) -> str:
+        return (
+            f"캐시: 적중 {self.hits}건, 미스 {self.misses}건, "
+            f"{len(self._entries)}개 항목 {self._total_bytes / (1024 * 1024):.1f} MB"
+        )
+
+
+def _is_ok_status(meta: Dict[str, object]) -> bool:
+    # 차단/오류 페이지가 예전에 저장됐더라도 적중으로 쓰지 않음 (상태 코드가 없는 항목은 정상으로 봄)
+    status = meta.get("status")
+    return status is None or 200 <= int(status) < 300
+
+
+def read_cached_html(html_path: str) -> str:
+    with gzip.open(html_path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def parse_cached_entry(html_path: str) -> List[Tuple[str, str]]:
+    # 프로세스 풀 작업 단위: 워커가 직접 파일을 읽어 부모 프로세스 메모리에 HTML 을 쌓지 않음
+    from danawa_parse import parse_detail_pairs
+
+    return parse_detail_pairs(read_cached_html(html_path))
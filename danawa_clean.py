@@ -0,0 +1,240 @@
+import argparse
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 스펙 값 정리 규칙. steps 는 순서대로 적용되며 각 단계 뒤에 앞뒤 공백을 제거함
+# - ["cut", 텍스트]: 텍스트부터 끝까지 제거 (버튼 텍스트 등)
+# - ["regex", 패턴]: 패턴에 맞는 부분 제거
+# - ["remove", 텍스트]: 텍스트만 제거
+# 마지막에 연속 공백을 하나로 합침
+DEFAULT_CLEANING_RULES: Dict[str, object] = {
+    "steps": [
+        ["cut", "인증번호 확인"],
+        # 괄호와 그 안의 모든 내용 제거 (닫힌 괄호, 그다음 닫히지 않은 괄호는 끝까지)
+        ["regex", r"\s*\([^)]*\)"],
+        ["regex", r"\s*\([^)]*$"],
+        ["remove", "제조사 웹사이트"],
+        ["remove", "웹사이트"],
+        ["cut", "바로가기"],
+    ],
+    "meaningless_values": ["상세설명 / 판매 사이트 문의", "상세설명", "판매 사이트 문의", "인증번호 확인"],
+    "meaningless_substrings": ["상세설명 / 판매 사이트 문의"],
+    # 체크 표시(○)인 값은 키 이름이 실제 값이 되고, 키 이름을 카테고리명으로 매핑 (없으면 키 이름 그대로)
+    "check_marks": ["○", "O", "o", "●"],
+    "check_categories": {
+        "레토르트이유식": "품목",
+        "파우치": "포장용기",
+        "6개월~": "최소연령",
+        "상온": "보관방식",
+    },
+    # 키에 이 단어가 있으면 값과 관계없이 인증 목록으로, 체크 표시인 키 중 이 단어가 있는 것도 인증 목록으로
+    "certification_keyword": "인증",
+    "certification_check_keys": ["HACCP"],
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class CleaningRules:
+    # 규칙을 한 번만 컴파일해 두고 상품/값마다 재사용
+    def __init__(self, rules: Dict[str, object]) -> None:
+        self.steps = []
+        for step in rules.get("steps", []):
+            op, text = step[0], step[1]
+            if op == "regex":
+                self.steps.append((op, re.compile(text)))
+            elif op in ("cut", "remove"):
+                self.steps.append((op, text))
+            else:
+                raise ValueError(f"알 수 없는 정리 단계: {op}")
+        self.meaningless_values = frozenset(rules.get("meaningless_values", []))
+        self.meaningless_substrings = tuple(rules.get("meaningless_substrings", []))
+        self.check_marks = frozenset(rules.get("check_marks", []))
+        self.check_categories: Dict[str, str] = dict(rules.get("check_categories", {}))
+        self.certification_keyword = str(rules.get("certification_keyword", ""))
+        self.certification_check_keys = tuple(rules.get("certification_check_keys", []))
+
+    def clean_value(self, value: str) -> str:
+        value = value.strip()
+        for step in self.steps:
+            if step[0] == "regex":
+                value = step[1].sub("", value)
+                continue
+            if step[1] in value:
+                # 들어 있지 않으면 split/replace 로 문자열을 새로 만들지 않음
+                value = value.split(step[1])[0] if step[0] == "cut" else value.replace(step[1], "")
+            value = value.strip()
+        return _WHITESPACE.sub(" ", value).strip()
+
+    def is_meaningless(self, value: str) -> bool:
+        return value in self.meaningless_values or any(text in value for text in self.meaningless_substrings)
+
+    def is_certification(self, key: str, checked: bool) -> bool:
+        if checked:
+            return any(text in key for text in self.certification_check_keys)
+        return bool(self.certification_keyword) and self.certification_keyword in key
+
+    def detail_pairs(self, specs: Dict[str, str]) -> List[Tuple[str, str]]:
+        # 정리된 (키, 값) 목록 (인증 항목은 마지막에 ("인증", "a,b") 로 모음)
+        spec_parts: List[Tuple[str, str]] = []
+        certification_items: List[str] = []
+        for key, value in specs.items():
+            if not value:
+                continue
+            clean_value = self.clean_value(value)
+            if not clean_value:
+                continue
+            checked = clean_value in self.check_marks
+            if self.is_certification(key, checked):
+                if key not in certification_items:
+                    certification_items.append(key)
+            elif checked:
+                spec_parts.append((self.check_categories.get(key, key), key))
+            elif not self.is_meaningless(clean_value):
+                spec_parts.append((key, clean_value))
+        if certification_items:
+            spec_parts.append(("인증", ",".join(certification_items)))
+        return spec_parts
+
+    def build_detail_info(self, specs: Dict[str, str]) -> str:
+        return join_detail(self.detail_pairs(specs))
+
+    def clean_series(self, values: "pd.Series") -> "pd.Series":
+        # 값 열 전체를 한 번에 정리. 스펙 값은 반복이 많으므로 고유값만 정리하고 코드로 펼침
+        # (object 열에 대한 pandas .str 연산보다 빠르고 clean_value 와 결과가 같음)
+        codes, uniques = pd.factorize(values.fillna("").astype(str))
+        cleaned = np.array([self.clean_value(value) for value in uniques] or [""], dtype=object)
+        return pd.Series(cleaned[codes], index=values.index, name=values.name)
+
+    def build_detail_info_frame(
+        self, frame: "pd.DataFrame", group_col: str = "URL", key_col: str = "키", value_col: str = "값"
+    ) -> "pd.Series":
+        # 긴 형식(상품, 키, 값 한 행씩)의 원본 스펙을 상품별 상세정보 문자열로 (상품 순서 유지)
+        # 값 정리/분류는 고유값 단위로 한 번씩만 하고 결과를 행으로 펼침
+        key_codes, keys = pd.factorize(frame[key_col].fillna("").astype(str))
+        value_codes, values = pd.factorize(self.clean_series(frame[value_col]))
+        key_names = np.array(keys, dtype=object)
+        checked = np.array([value in self.check_marks for value in values], dtype=bool)[value_codes]
+        meaningless = np.array([self.is_meaningless(value) for value in values], dtype=bool)[value_codes]
+        present = np.array([value != "" for value in values], dtype=bool)[value_codes]
+        check_cert = np.array([self.is_certification(key, True) for key in keys], dtype=bool)[key_codes]
+        plain_cert = np.array([self.is_certification(key, False) for key in keys], dtype=bool)[key_codes]
+
+        certification = present & np.where(checked, check_cert, plain_cert)
+        keep = present & ~certification & (checked | ~meaningless)
+        checked_parts = np.array([f"{self.check_categories.get(key, key)}:{key}" for key in keys], dtype=object)
+        part = np.where(checked, checked_parts[key_codes], key_names[key_codes] + ":" + np.array(values, dtype=object)[value_codes])
+
+        groups = frame[group_col].to_numpy()
+        parts = pd.Series(part[keep]).groupby(groups[keep], sort=False).agg("/".join)
+        certs = pd.Series(key_names[key_codes][certification]).groupby(groups[certification], sort=False).agg(
+            lambda names: "인증:" + ",".join(dict.fromkeys(names))
+        )
+        order = pd.Index(pd.unique(groups))
+        parts = parts.reindex(order, fill_value="")
+        certs = certs.reindex(order, fill_value="")
+        joiner = pd.Series("/", index=order).where((parts != "") & (certs != ""), "")
+        return parts + joiner + certs
+
+
+def join_detail(pairs: List[Tuple[str, str]]) -> str:
+    # CSV 의 상세정보 열: "키:값/키:값/인증:a,b"
+    return "/".join(f"{key}:{value}" for key, value in pairs)
+
+
+def load_cleaning_rules(config_path: Optional[str] = None) -> CleaningRules:
+    # 설정 파일은 DEFAULT_CLEANING_RULES 와 같은 형태이며 지정한 필드만 덮어씀
+    raw = dict(DEFAULT_CLEANING_RULES)
+    if config_path:
+        with open(config_path, encoding="utf-8") as f:
+            raw.update(json.load(f))
+    return CleaningRules(raw)
+
+
+_rules = load_cleaning_rules()
+
+
+def use_rules(config_path: Optional[str]) -> None:
+    # 기본 규칙 교체 (파싱 프로세스 풀에는 initializer 로 같은 경로를 넘김)
+    global _rules
+    _rules = load_cleaning_rules(config_path)
+
+
+def active_rules() -> CleaningRules:
+    return _rules
+
+
+def detail_pairs(specs: Dict[str, str]) -> List[Tuple[str, str]]:
+    return _rules.detail_pairs(specs)
+
+
+def build_detail_info(specs: Dict[str, str]) -> str:
+    return _rules.build_detail_info(specs)
+
+
+def clean_series(values: "pd.Series") -> "pd.Series":
+    return _rules.clean_series(values)
+
+
+RAW_FIELDNAMES = ["상품명", "URL", "키", "값"]
+
+
+def export_raw_specs(cache_dir: str, output_path: str, category_url: Optional[str] = None) -> int:
+    # HTML 캐시의 상품 페이지에서 정리 전 원본 스펙을 (상품명, URL, 키, 값) 한 행씩 CSV 로 내보냄 (--input 용)
+    # 크롤러의 --long-format 출력은 이미 정리(체크 표시 변환, 인증 묶기)된 값이라 다시 정리하는 입력으로 쓸 수 없음
+    from danawa_cache import HtmlCache, read_cached_html
+    from danawa_parse import parse_specs_from_html
+
+    rows: List[Dict[str, str]] = []
+    entries = HtmlCache(cache_dir).entries(category_url)
+    for meta, html_path in entries:
+        title, url = str(meta.get("title", "")), str(meta.get("url", ""))
+        for key, value in parse_specs_from_html(read_cached_html(html_path)).items():
+            rows.append({"상품명": title, "URL": url, "키": key, "값": value})
+    pd.DataFrame(rows, columns=RAW_FIELDNAMES).to_csv(output_path, index=False, encoding="utf-8-sig")
+    return len(entries)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-clean raw specs (long format: URL, key, value) in one batch")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="CSV with one raw (uncleaned) spec per row, e.g. from --export-raw")
+    source.add_argument(
+        "--export-raw",
+        metavar="CACHE_DIR",
+        help="Write raw specs (상품명, URL, 키, 값) from an HTML cache to --output instead of cleaning",
+    )
+    parser.add_argument("--output", required=True, help="Output CSV (상품명, URL, 상세정보 or raw specs)")
+    parser.add_argument("--category-url", help="With --export-raw: only products cached for this category")
+    parser.add_argument("--rules", help="JSON file overriding DEFAULT_CLEANING_RULES fields")
+    parser.add_argument("--group-col", default="URL", help="Product column (default: URL)")
+    parser.add_argument("--key-col", default="키", help="Spec name column (default: 키)")
+    parser.add_argument("--value-col", default="값", help="Raw spec value column (default: 값)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.export_raw:
+        products = export_raw_specs(args.export_raw, args.output, args.category_url)
+        print(f"완료! {products}개 상품의 원본 스펙 저장: {args.output}")
+        return
+    rules = load_cleaning_rules(args.rules)
+    frame = pd.read_csv(args.input, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    details = rules.build_detail_info_frame(frame, args.group_col, args.key_col, args.value_col)
+    result = details.rename("상세정보").rename_axis("URL").reset_index()
+    if "상품명" in frame.columns:
+        titles = frame.drop_duplicates(args.group_col).set_index(args.group_col)["상품명"]
+        result.insert(0, "상품명", result["URL"].map(titles).fillna(""))
+    else:
+        result.insert(0, "상품명", "")
+    result.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"완료! {len(frame)}개 스펙 값 → {len(result)}개 상품 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,230 +1,509 @@
 import argparse
-import csv
+import os
 import random
 import re
 import time
-from typing import Dict, List, Set, Optional
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import Dict, List, Set, Optional, Tuple
 
-import pandas as pd
-from playwright.sync_api import Playwright, sync_playwright, Browser, Page, BrowserContext
+from playwright.sync_api import Playwright, Browser, Page, BrowserContext
+
+import danawa_clean
+import danawa_metrics
+from danawa_clean import join_detail
+from danawa_rate import check_page_status, is_timeout
+from danawa_selectors import SelectorMemo, ordered, remember
+
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36"
+)
+
+# open_new_context / 비동기 경로가 같은 브라우저 지문을 쓰도록 공유
+CONTEXT_OPTIONS = {
+    "user_agent": USER_AGENT,
+    "viewport": {"width": 1366, "height": 800},
+    "locale": "ko-KR",
+    "timezone_id": "Asia/Seoul",
+    "device_scale_factor": 1.0,
+    "has_touch": False,
+}
+
+# 상세정보 컨테이너 후보 (앞에서부터 우선)
+SPEC_CONTAINER_SELECTORS = [
+    "section#productOptionArea",
+    "div#productOptionArea",
+    "div.spec_area",
+    "div.spec_list",
+    "div#danawa_detail_content",
+    "table.spec_table",
+    "div.product_spec",
+    "div.prod_spec_cont",
+    "div.spec_info",
+    "div.product_detail",
+]
+
+# 후보가 하나도 없을 때 더 넓게 찾는 선택자
+SPEC_FALLBACK_SELECTORS = [
+    "div[class*='spec']",
+    "div[class*='detail']",
+    "table[class*='spec']",
+    "section[class*='spec']",
+]
+
+KV_ROW_SELECTOR = "div:has(> .key), li:has(> .key), div:has(> .spec_key)"
+DETAIL_AREA_SELECTOR = "div.prod_detail_area, div.product_info_detail, div.spec_detail"
+
+# --wait-mode ready: 이 중 하나가 DOM 에 붙으면 스펙을 읽을 수 있는 상태로 판단
+SPEC_READY_SELECTOR = ", ".join(SPEC_CONTAINER_SELECTORS + [DETAIL_AREA_SELECTOR])
+
+DETAIL_TAB_LABELS = ["상세정보", "상세 사양", "상세스펙", "상세 스펙", "스펙", "사양"]
+
+# Prefer product title anchors inside list cards; avoid option/price links
+PRODUCT_LINK_SELECTORS = [
+    "li.prod_item div.prod_info a.prod_link",
+    "li.prod_item .prod_name a",
+    "div.prod_info a.prod_link",
+    "a[href*='/product/']",
+    "a[href*='product/view.html']",
+]
+
+NEXT_PAGE_LABELS = ["다음", ">", "다음페이지", "Next"]
+
+# 다나와 목록 페이징: 번호 버튼은 10개 단위 그룹, 그룹 이동은 nav_next
+LIST_PAGE_BUTTON_SELECTOR = "div.number_wrap a.num"
+LIST_GROUP_NEXT_SELECTOR = "a.edge_nav.nav_next"
+# 다나와 목록은 URL 의 page= 를 무시하고 movePage(N) 으로만 페이지가 바뀜
+HAS_MOVE_PAGE_JS = "() => typeof movePage === 'function'"
+MOVE_PAGE_JS = "n => movePage(n)"
+
+PAGER_SELECTORS = [
+    "a.btn_next",
+    "a.next",
+    "button.next",
+    "a[class*='next']",
+    "button[class*='next']",
+    ".pager a:has-text('다음')",
+    ".pagination a:has-text('다음')",
+]
+
+# 선택자 메모에서 쓰는 후보 문자열 "<종류>:<값>" (button/link 는 role 이름, text 는 텍스트, css 는 선택자)
+DETAIL_TAB_CANDIDATES = [f"{role}:{label}" for label in DETAIL_TAB_LABELS for role in ("button", "link")] + [
+    f"text:{label}" for label in DETAIL_TAB_LABELS
+]
+PAGER_CANDIDATES = [f"link:{label}" for label in NEXT_PAGE_LABELS] + [f"css:{selector}" for selector in PAGER_SELECTORS]
+
+
+# extract_specs_from_detail 와 같은 우선순위 규칙을 페이지 안에서 한 번에 실행
+# (컨테이너 후보 → dl → tr → key/value div → 전역 table → 상세 영역)
+# JS 객체는 숫자형 키 순서를 바꾸므로 [key, value] 쌍 배열로 반환
+EXTRACT_SPECS_JS = r"""
+(opts) => {
+    const specs = new Map();
+    const text = (el) => ((el && el.innerText) || "").trim();
+    const stripLinkText = (value) => {
+        value = value.split("인증번호 확인")[0].trim();
+        value = value.split("바로가기")[0].trim();
+        return value.replace(/\s*\([^)]*바로가기[^)]*\)/g, "");
+    };
+    const queryAll = (root, selector) => {
+        try {
+            return Array.from(root.querySelectorAll(selector));
+        } catch (e) {
+            return [];
+        }
+    };
+
+    let container = null;
+    let matched = null;
+    for (const selector of opts.containers.concat(opts.fallbacks)) {
+        const found = queryAll(document, selector);
+        if (found.length > 0) {
+            container = found[0];
+            matched = selector;
+            break;
+        }
+    }
+    if (container === null) {
+        container = document.body;
+    }
+
+    // dl/dt/dd 패턴
+    for (const dl of queryAll(container, "dl")) {
+        const dts = queryAll(dl, "dt");
+        const dds = queryAll(dl, "dd");
+        for (let i = 0; i < Math.min(dts.length, dds.length); i++) {
+            const key = text(dts[i]);
+            const value = text(dds[i]);
+            if (key && !specs.has(key)) {
+                specs.set(key, value);
+            }
+        }
+    }
+
+    // tr/th/td 패턴
+    for (const tr of queryAll(container, "tr")) {
+        const th = tr.querySelector("th");
+        const td = tr.querySelector("td");
+        if (th && td) {
+            const key = text(th);
+            const value = text(td).split("인증번호 확인")[0].trim();
+            if (key && value && !specs.has(key)) {
+                specs.set(key, value);
+            }
+        }
+    }
+
+    // div.key / div.value 패턴
+    for (const row of queryAll(container, opts.kvRows)) {
+        const keyElem = row.querySelector(".key, .spec_key");
+        const valueElem = row.querySelector(".value, .spec_value");
+        if (keyElem && valueElem) {
+            const key = text(keyElem);
+            if (key && !specs.has(key)) {
+                specs.set(key, text(valueElem));
+            }
+        }
+    }
+
+    // 전역 table 과 상세 영역의 tr
+    const rowGroups = queryAll(document, "table").concat(queryAll(document, opts.detailAreas));
+    for (const group of rowGroups) {
+        for (const tr of queryAll(group, "tr")) {
+            const th = tr.querySelector("th");
+            const td = tr.querySelector("td");
+            if (th && td) {
+                const key = text(th);
+                const value = stripLinkText(text(td));
+                if (key && value && !specs.has(key)) {
+                    specs.set(key, value);
+                }
+            }
+        }
+    }
+
+    return {pairs: Array.from(specs.entries()), container: matched};
+}
+"""
+
+
+def spec_extract_options() -> Dict[str, object]:
+    return {
+        "containers": SPEC_CONTAINER_SELECTORS,
+        "fallbacks": SPEC_FALLBACK_SELECTORS,
+        "kvRows": KV_ROW_SELECTOR,
+        "detailAreas": DETAIL_AREA_SELECTOR,
+    }
 
 
 def wait_for_network_idle(page: Page, timeout_ms: int = 3000) -> None:
-    start = time.time()
-    page.wait_for_load_state("domcontentloaded")
-    try:
-        page.wait_for_load_state("networkidle", timeout=timeout_ms)
-    except Exception:
-        pass
-    finally:
-        _ = start
+    with danawa_metrics.stage("network_idle"):
+        page.wait_for_load_state("domcontentloaded")
+        try:
+            page.wait_for_load_state("networkidle", timeout=timeout_ms)
+        except Exception:
+            pass
+
+
+def wait_for_spec_ready(page: Page, timeout_ms: int = 3000) -> bool:
+    with danawa_metrics.stage("ready_wait"):
+        try:
+            page.wait_for_selector(SPEC_READY_SELECTOR, state="attached", timeout=timeout_ms)
+            return True
+        except Exception:
+            return False
+
+
+def settle_after_click(page: Page, wait_mode: str = "fixed") -> None:
+    if wait_mode == "ready":
+        wait_for_spec_ready(page)
+    else:
+        wait_for_network_idle(page)
+
+
+class PolitenessLimiter:
+    # 요청 시작 간격 제한 (human_delay 와 같은 base + 0~base 지터)
+    # 페이지 안에서 잠들지 않고, 직전 요청 이후 이미 지난 시간만큼은 기다리지 않음
+    # controller(RateController) 가 있으면 간격과 차단 후 일시 정지를 컨트롤러가 정함
+    def __init__(self, base_delay_ms: int, controller=None) -> None:
+        self.base_delay_ms = base_delay_ms
+        self.controller = controller
+        self._next_at = 0.0
+
+    def _interval_s(self) -> float:
+        if self.controller is not None:
+            return self.controller.interval_s()
+        jitter = random.randint(0, self.base_delay_ms)
+        return (self.base_delay_ms + jitter) / 1000.0
+
+    def reserve_s(self) -> float:
+        # 이번 요청의 시작 시각을 정하고 다음 요청 시각을 예약한 뒤, 지금부터 기다릴 시간(초)을 반환
+        # (잠들지 않으므로 비동기 제한기도 그대로 사용, 이벤트 루프 안에서는 호출 사이에 끼어들 수 없음)
+        now = time.monotonic()
+        start_at = max(self._next_at, now)
+        if self.controller is not None:
+            start_at = max(start_at, now + self.controller.pause_remaining_s())
+        self._next_at = start_at + self._interval_s()
+        return start_at - now
+
+    def wait(self) -> None:
+        delay_s = self.reserve_s()
+        if delay_s > 0:
+            with danawa_metrics.stage("delay"):
+                time.sleep(delay_s)
 
 
 def open_new_context(playwright: Playwright, headless: bool) -> BrowserContext:
     chromium = playwright.chromium
     browser = chromium.launch(headless=headless)
-    user_agent = (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/124.0.0.0 Safari/537.36"
-    )
-    context = browser.new_context(
-        user_agent=user_agent,
-        viewport={"width": 1366, "height": 800},
-        locale="ko-KR",
-        timezone_id="Asia/Seoul",
-        device_scale_factor=1.0,
-        has_touch=False,
-    )
+    context = browser.new_context(**CONTEXT_OPTIONS)
     return context
 
 
 def human_delay(base_delay_ms: int = 500) -> None:
     jitter = random.randint(0, base_delay_ms)
-    time.sleep((base_delay_ms + jitter) / 1000.0)
+    with danawa_metrics.stage("delay"):
+        time.sleep((base_delay_ms + jitter) / 1000.0)
 
 
 def slow_scroll(page: Page, steps: int = 6, step_px: int = 800, base_delay_ms: int = 300) -> None:
-    for _ in range(steps):
-        # Pass value into the page context properly
-        page.evaluate("step => window.scrollBy(0, step)", step_px)
-        human_delay(base_delay_ms)
+    with danawa_metrics.stage("scroll"):
+        for _ in range(steps):
+            # Pass value into the page context properly
+            page.evaluate("step => window.scrollBy(0, step)", step_px)
+            human_delay(base_delay_ms)
 
 
-def extract_specs_from_detail(page: Page) -> Dict[str, str]:
-    specs: Dict[str, str] = {}
+_LINK_TEXT_IN_PARENS = re.compile(r'\s*\([^)]*바로가기[^)]*\)')
+
+
+def strip_link_text(value: str) -> str:
+    # "인증번호 확인" 같은 버튼 텍스트 제거
+    value = value.split("인증번호 확인")[0].strip()
+    value = value.split("바로가기")[0].strip()
+    # 괄호 안의 링크 텍스트 제거
+    value = _LINK_TEXT_IN_PARENS.sub('', value)
+    return value
+
+
+def candidate_locator(page, candidate: str):
+    # DETAIL_TAB_CANDIDATES / PAGER_CANDIDATES 항목 → locator (동기/비동기 Page 공용)
+    kind, value = candidate.split(":", 1)
+    if kind in ("button", "link"):
+        return page.get_by_role(kind, name=value)
+    if kind == "text":
+        return page.locator(f"text={value}")
+    return page.locator(value)
+
 
-    # 더 많은 선택자 후보 추가
-    candidates = [
-        "section#productOptionArea",
-        "div#productOptionArea",
-        "div.spec_area",
-        "div.spec_list",
-        "div#danawa_detail_content",
-        "table.spec_table",
-        "div.product_spec",
-        "div.prod_spec_cont",
-        "div.spec_info",
-        "div.product_detail",
-    ]
+# locator 엔진(동기/비동기)이 공유하는 스펙 수집 규칙. 요소에서 읽은 inner_text().strip() 값을 넘김
+def add_plain_pair(specs: Dict[str, str], key: str, value: str) -> None:
+    # dl/dt/dd, div.key/div.value: 값이 비어 있어도 저장
+    if key and key not in specs:
+        specs[key] = value
+
+
+def add_container_row_pair(specs: Dict[str, str], key: str, value: str) -> None:
+    # 컨테이너 안의 tr/th/td: 인증번호 확인 버튼 등 UI 요소를 떼고 값이 있을 때만
+    # (빈 key 는 이전 key 의 하위 항목일 수 있지만 일반적으로는 스킵)
+    if key:
+        value = value.split("인증번호 확인")[0].strip()
+        if value and key not in specs:
+            specs[key] = value
+
+
+def add_page_row_pair(specs: Dict[str, str], key: str, value: str) -> None:
+    # 컨테이너 밖의 전역 table / 상세 영역 tr: 링크 텍스트까지 제거
+    value = strip_link_text(value)
+    if key and key not in specs and value:
+        specs[key] = value
+
+
+def spec_container_candidates(memo: Optional[SelectorMemo]) -> List[str]:
+    # 컨테이너 후보 다음에 더 넓은 fallback 선택자 (메모가 있으면 지난번에 맞은 선택자부터)
+    return ordered(memo, "spec_container", SPEC_CONTAINER_SELECTORS + SPEC_FALLBACK_SELECTORS)
+
+
+def record_spec_container(memo: Optional[SelectorMemo], selector: Optional[str]) -> None:
+    # 찾은 컨테이너(None 이면 body 로 대체)를 메모와 fallback 카운터에 기록
+    remember(memo, "spec_container", selector)
+    count_container_fallback(selector)
+
+
+def record_detail_tab(memo: Optional[SelectorMemo], candidate: Optional[str]) -> None:
+    remember(memo, "detail_tab", candidate)
+    if candidate is not None and candidate.startswith("text:"):
+        danawa_metrics.count("fallback.detail_tab_text")
+
+
+def record_product_links(memo: Optional[SelectorMemo], matched: Optional[str]) -> None:
+    remember(memo, "product_links", matched)
+    if matched is not None and matched != PRODUCT_LINK_SELECTORS[0]:
+        danawa_metrics.count("fallback.product_links")
+
+
+def accept_product_link(href: Optional[str], text: str, seen: Set[str]) -> bool:
+    # 상품 링크이고 아직 나오지 않은 상품이면 seen 에 넣고 True
+    # (같은 상품이 다른 URL(쿼리 순서/추가 파라미터)로 여러 번 나와도 pcode 로 한 번만)
+    if not is_product_link(href, text):
+        return False
+    key = canonical_product_key(href)
+    if key in seen:
+        return False
+    seen.add(key)
+    return True
+
+
+def extract_specs_from_detail(page: Page, memo: Optional[SelectorMemo] = None) -> Dict[str, str]:
+    specs: Dict[str, str] = {}
 
     container = None
-    for selector in candidates:
+    matched = None
+    for selector in spec_container_candidates(memo):
         if page.locator(selector).count() > 0:
             container = page.locator(selector).first
+            matched = selector
             break
-    
-    if container is None:
-        # 상세정보 영역을 더 넓게 찾기
-        detail_selectors = [
-            "div[class*='spec']",
-            "div[class*='detail']",
-            "table[class*='spec']",
-            "section[class*='spec']",
-        ]
-        for selector in detail_selectors:
-            if page.locator(selector).count() > 0:
-                container = page.locator(selector).first
-                break
-    
+    record_spec_container(memo, matched)
     if container is None:
         container = page.locator("body")
 
     # dl/dt/dd 패턴 처리
-    dl_groups = container.locator("dl").all()
-    for dl in dl_groups:
+    for dl in container.locator("dl").all():
         dts = dl.locator("dt").all()
         dds = dl.locator("dd").all()
         for i in range(min(len(dts), len(dds))):
             try:
-                key = dts[i].inner_text().strip()
-                value = dds[i].inner_text().strip()
-                if key and key not in specs:
-                    specs[key] = value
+                add_plain_pair(specs, dts[i].inner_text().strip(), dds[i].inner_text().strip())
             except Exception:
                 continue
 
     # 표 형태 (tr/th/td) 처리
-    table_rows = container.locator("tr").all()
-    for tr in table_rows:
+    for tr in container.locator("tr").all():
         try:
             th = tr.locator("th").first
             td = tr.locator("td").first
             if th.count() > 0 and td.count() > 0:
-                key = th.inner_text().strip()
-                value = td.inner_text().strip()
-                # "인증" 같은 빈 헤더는 스킵하되, 실제 값이 있으면 저장
-                # 빈 key는 이전 key의 하위 항목일 수 있으므로 처리
-                if key:
-                    # 인증번호 확인 버튼 등 UI 요소 제거
-                    value = value.split("인증번호 확인")[0].strip()
-                    if value and key not in specs:
-                        specs[key] = value
-                elif not key and value:
-                    # 빈 key인 경우 이전 컬럼과 연결될 수 있음
-                    # 하지만 일반적으로는 스킵
-                    pass
+                add_container_row_pair(specs, th.inner_text().strip(), td.inner_text().strip())
         except Exception:
             continue
 
     # div.key / div.value 패턴
-    kv_rows = container.locator("div:has(> .key), li:has(> .key), div:has(> .spec_key)").all()
-    for row in kv_rows:
+    for row in container.locator(KV_ROW_SELECTOR).all():
         try:
             key_elem = row.locator(".key, .spec_key").first
             value_elem = row.locator(".value, .spec_value").first
             if key_elem.count() > 0 and value_elem.count() > 0:
-                key = key_elem.inner_text().strip()
-                value = value_elem.inner_text().strip()
-                if key and key not in specs:
-                    specs[key] = value
+                add_plain_pair(specs, key_elem.inner_text().strip(), value_elem.inner_text().strip())
         except Exception:
             continue
 
-    # 더 넓은 범위에서 표 형태 찾기 (container 외부의 표도 검색)
-    all_tables = page.locator("table").all()
-    for table in all_tables:
-        rows = table.locator("tr").all()
-        for tr in rows:
-            try:
-                ths = tr.locator("th").all()
-                tds = tr.locator("td").all()
-                if len(ths) > 0 and len(tds) > 0:
-                    key = ths[0].inner_text().strip()
-                    value = tds[0].inner_text().strip()
-                    # "인증번호 확인" 같은 버튼 텍스트 제거
-                    value = value.split("인증번호 확인")[0].strip()
-                    value = value.split("바로가기")[0].strip()
-                    # 괄호 안의 링크 텍스트 제거
-                    value = re.sub(r'\s*\([^)]*바로가기[^)]*\)', '', value)
-                    if key and key not in specs and value:
-                        specs[key] = value
-            except Exception:
-                continue
-
-    # 추가로 상세정보가 있을 수 있는 영역 검색
-    detail_areas = page.locator("div.prod_detail_area, div.product_info_detail, div.spec_detail").all()
-    for area in detail_areas:
-        rows = area.locator("tr").all()
-        for tr in rows:
-            try:
-                ths = tr.locator("th").all()
-                tds = tr.locator("td").all()
-                if len(ths) > 0 and len(tds) > 0:
-                    key = ths[0].inner_text().strip()
-                    value = tds[0].inner_text().strip()
-                    value = value.split("인증번호 확인")[0].strip()
-                    value = value.split("바로가기")[0].strip()
-                    value = re.sub(r'\s*\([^)]*바로가기[^)]*\)', '', value)
-                    if key and key not in specs and value:
-                        specs[key] = value
-            except Exception:
-                continue
+    # 더 넓은 범위에서 표 형태 찾기 (container 외부의 표도 검색), 그다음 상세정보가 있을 수 있는 영역
+    for group in page.locator("table").all() + page.locator(DETAIL_AREA_SELECTOR).all():
+        _collect_row_pairs(group.locator("tr").all(), specs)
 
     return specs
 
 
-def click_detail_tab_if_present(page: Page) -> None:
-    labels = ["상세정보", "상세 사양", "상세스펙", "상세 스펙", "스펙", "사양"]
-    for label in labels:
-        button = page.get_by_role("button", name=label)
-        if button.count() > 0:
-            try:
-                button.first.click(timeout=2000)
-                wait_for_network_idle(page)
-                return
-            except Exception:
-                pass
-        link = page.get_by_role("link", name=label)
-        if link.count() > 0:
-            try:
-                link.first.click(timeout=2000)
-                wait_for_network_idle(page)
-                return
-            except Exception:
-                pass
+def _collect_row_pairs(rows, specs: Dict[str, str]) -> None:
+    for tr in rows:
+        try:
+            ths = tr.locator("th").all()
+            tds = tr.locator("td").all()
+            if len(ths) > 0 and len(tds) > 0:
+                add_page_row_pair(specs, ths[0].inner_text().strip(), tds[0].inner_text().strip())
+        except Exception:
+            continue
+
+
+def extract_specs_in_page(page: Page) -> Dict[str, str]:
+    # 주입한 스크립트 한 번으로 전체 key/value 를 가져옴 (요소마다 IPC 하지 않음)
+    result = page.evaluate(EXTRACT_SPECS_JS, spec_extract_options())
+    count_container_fallback(result["container"])
+    return {key: value for key, value in result["pairs"]}
+
+
+def count_container_fallback(matched: Optional[str]) -> None:
+    if matched is None:
+        danawa_metrics.count("fallback.spec_body")
+    elif matched in SPEC_FALLBACK_SELECTORS:
+        danawa_metrics.count("fallback.spec_container")
+
+
+def extract_specs(page: Page, engine: str = "js", memo: Optional[SelectorMemo] = None) -> Dict[str, str]:
+    with danawa_metrics.stage("extract"):
+        if engine == "locator":
+            return extract_specs_from_detail(page, memo)
+        # js 엔진은 후보 탐색이 페이지 안에서 한 번에 끝나므로 메모를 쓰지 않음
+        return extract_specs_in_page(page)
+
+
+def click_detail_tab_if_present(page: Page, memo: Optional[SelectorMemo] = None, wait_mode: str = "fixed") -> None:
+    with danawa_metrics.stage("tab"):
+        _click_detail_tab(page, memo, wait_mode)
 
-    for label in labels:
-        locator = page.locator(f"text={label}")
-        if locator.count() > 0:
+
+def _click_detail_tab(page: Page, memo: Optional[SelectorMemo], wait_mode: str) -> None:
+    # 라벨마다 button → link 역할, 그다음 텍스트 매칭 순서
+    for candidate in ordered(memo, "detail_tab", DETAIL_TAB_CANDIDATES):
+        control = candidate_locator(page, candidate)
+        if control.count() > 0:
             try:
-                locator.first.click(timeout=2000)
-                wait_for_network_idle(page)
+                control.first.click(timeout=2000)
+                settle_after_click(page, wait_mode)
+                record_detail_tab(memo, candidate)
                 return
             except Exception:
                 pass
+    record_detail_tab(memo, None)
+
+
+def is_product_link(href: Optional[str], text: str) -> bool:
+    if not href:
+        return False
+    if href.startswith("javascript:"):
+        return False
+    # danawa product details live under prod.danawa.com/product/... or similar
+    if "danawa" not in href and not href.startswith("/"):
+        return False
+    # Skip obvious non-title links like 가격비교/옵션 등
+    lowered = text.lower()
+    if any(x in lowered for x in ["가격", "비교", "옵션", "구성"]):
+        return False
+    return True
+
+
+PCODE_PATTERN = re.compile(r"[?&]pcode=(\d+)", re.I)
+
+
+def extract_pcode(url: str) -> Optional[str]:
+    match = PCODE_PATTERN.search(url)
+    return match.group(1) if match else None
 
 
-def collect_product_links_from_category(page: Page, max_per_page: Optional[int]) -> List[str]:
-    # Prefer product title anchors inside list cards; avoid option/price links
-    selectors = [
-        "li.prod_item div.prod_info a.prod_link",
-        "li.prod_item .prod_name a",
-        "div.prod_info a.prod_link",
-        "a[href*='/product/']",
-        "a[href*='product/view.html']",
-    ]
+def canonical_product_key(url: str) -> str:
+    # 같은 상품을 가리키는 URL 은 pcode 로 묶고, pcode 가 없으면 fragment 를 뗀 URL 사용
+    pcode = extract_pcode(url)
+    if pcode:
+        return f"pcode:{pcode}"
+    return url.split("#")[0].strip()
+
+
+def collect_product_links_from_category(
+    page: Page, max_per_page: Optional[int], memo: Optional[SelectorMemo] = None
+) -> List[str]:
+    # 선택자마다 다른 상품이 잡힐 수 있으므로 메모와 관계없이 항상 전체 선택자의 합집합 (메모에는 통계만 기록)
+    links, matched = _collect_links(page, PRODUCT_LINK_SELECTORS, max_per_page)
+    record_product_links(memo, matched)
+    return links
+
+
+def _collect_links(page: Page, selectors: List[str], max_per_page: Optional[int]) -> Tuple[List[str], Optional[str]]:
     links: List[str] = []
     seen: Set[str] = set()
+    matched: Optional[str] = None
     for selector in selectors:
         # ensure list is rendered and visible before grabbing
         if page.locator(selector).count() == 0:
@@ -235,81 +514,278 @@ def collect_product_links_from_category(page: Page, max_per_page: Optional[int])
                 text = (a.inner_text() or "").strip()
             except Exception:
                 continue
-            if not href:
-                continue
-            if href.startswith("javascript:"):
-                continue
-            # danawa product details live under prod.danawa.com/product/... or similar
-            if "danawa" not in href and not href.startswith("/"):
-                continue
-            if href in seen:
+            if not accept_product_link(href, text, seen):
                 continue
-            # Skip obvious non-title links like 가격비교/옵션 등
-            lowered = text.lower()
-            if any(x in lowered for x in ["가격", "비교", "옵션", "구성"]):
-                continue
-            seen.add(href)
             links.append(href)
+            if matched is None:
+                matched = selector
             if max_per_page and len(links) >= max_per_page:
-                return links
-    return links
+                return links, matched
+    return links, matched
 
 
-def paginate_category(page: Page, current_url: str, page_num: int) -> bool:
-    # URL 기반 페이지네이션 시도
+def next_page_url(current_url: str, page_num: int) -> str:
+    if "page=" in current_url:
+        # 기존 page 파라미터를 다음 페이지로 변경
+        return re.sub(r'page=\d+', f'page={page_num}', current_url)
+    # page 파라미터가 없으면 추가
+    separator = "&" if "?" in current_url else "?"
+    return f"{current_url}{separator}page={page_num}"
+
+
+def list_page_button(page, page_num: int):
+    # 현재 페이지 그룹에서 번호가 정확히 page_num 인 버튼
+    return page.locator(LIST_PAGE_BUTTON_SELECTOR).filter(has_text=re.compile(rf"^\s*{page_num}\s*$"))
+
+
+def move_to_list_page(page: Page, page_num: int) -> bool:
     try:
-        if "page=" in current_url:
-            # 기존 page 파라미터를 다음 페이지로 변경
-            next_url = re.sub(r'page=\d+', f'page={page_num}', current_url)
-            if next_url != current_url:
-                page.goto(next_url)
+        if page.evaluate(HAS_MOVE_PAGE_JS):
+            page.evaluate(MOVE_PAGE_JS, page_num)
+            wait_for_network_idle(page)
+            return True
+    except Exception:
+        pass
+
+    # 함수를 직접 부를 수 없으면 번호 버튼 클릭, 현재 그룹에 없으면 그룹 이동 후 다시 찾기
+    for _ in range(page_num // 10 + 1):
+        button = list_page_button(page, page_num)
+        if button.count() > 0:
+            try:
+                button.first.click()
                 wait_for_network_idle(page)
                 return True
-        else:
-            # page 파라미터가 없으면 추가
-            separator = "&" if "?" in current_url else "?"
-            next_url = f"{current_url}{separator}page={page_num}"
+            except Exception:
+                return False
+        group_next = page.locator(LIST_GROUP_NEXT_SELECTOR)
+        if group_next.count() == 0:
+            break
+        try:
+            group_next.first.click()
+            wait_for_network_idle(page)
+        except Exception:
+            break
+    return False
+
+
+def paginate_category(page: Page, current_url: str, page_num: int, memo: Optional[SelectorMemo] = None) -> bool:
+    if move_to_list_page(page, page_num):
+        return True
+    danawa_metrics.count("fallback.pager")
+
+    # URL 기반 페이지네이션 시도
+    try:
+        next_url = next_page_url(current_url, page_num)
+        if next_url != current_url:
             page.goto(next_url)
             wait_for_network_idle(page)
             return True
     except Exception:
         pass
     
-    # 버튼/링크 기반 페이지네이션 시도
-    next_labels = ["다음", ">", "다음페이지", "Next"]
-    for label in next_labels:
-        control = page.get_by_role("link", name=label)
+    # 버튼/링크 기반, 그다음 다양한 선택자로 다음 페이지 버튼 찾기
+    for candidate in ordered(memo, "pager", PAGER_CANDIDATES):
+        control = candidate_locator(page, candidate)
         if control.count() > 0:
             try:
                 control.first.click()
                 wait_for_network_idle(page)
+                remember(memo, "pager", candidate)
                 return True
             except Exception:
                 pass
     
-    # 다양한 선택자로 다음 페이지 버튼 찾기
-    pager_selectors = [
-        "a.btn_next",
-        "a.next",
-        "button.next",
-        "a[class*='next']",
-        "button[class*='next']",
-        ".pager a:has-text('다음')",
-        ".pagination a:has-text('다음')",
-    ]
-    for selector in pager_selectors:
-        pager = page.locator(selector)
-        if pager.count() > 0:
-            try:
-                pager.first.click()
-                wait_for_network_idle(page)
-                return True
-            except Exception:
-                pass
-    
+    remember(memo, "pager", None)
     return False
 
 
+# 행에 함께 넘기는 정리된 (키, 값) 목록. 긴/넓은 형식 출력이 상세정보 문자열을 다시 나누지 않도록 함
+SPEC_PAIRS = "스펙"
+
+
+def pairs_row(title: str, link: str, pairs: List[Tuple[str, str]]) -> Dict[str, object]:
+    return {"상품명": title, "URL": link, "상세정보": join_detail(pairs), SPEC_PAIRS: pairs}
+
+
+def detail_row(title: str, link: str, specs: Dict[str, str]) -> Dict[str, object]:
+    return pairs_row(title, link, danawa_clean.detail_pairs(specs))
+
+
+def observe_goto_error(rate, error: Exception) -> None:
+    if rate is not None:
+        rate.observe_error(is_timeout(error))
+
+
+def observe_page_status(rate, response, goto_started: float) -> int:
+    # 응답 상태를 속도 제어기에 알린 뒤, 차단/서버 오류면 예외로 올림 (재시도 큐가 분류)
+    status = response.status if response is not None else 0
+    if rate is not None:
+        rate.observe(status, (time.perf_counter() - goto_started) * 1000)
+    check_page_status(status)
+    return status
+
+
+def is_cacheable(cache, status: int) -> bool:
+    # 차단/오류 페이지는 캐시에 남기지 않음 (다음 실행에서 적중으로 재사용되지 않도록)
+    return cache is not None and status == 200
+
+
+def store_page(cache, link: str, page_html: str, title: str, status: int, category_url: str) -> None:
+    if is_cacheable(cache, status):
+        cache.put(link, page_html, title=title, status=status, category_url=category_url)
+
+
+def load_product_page(
+    detail_page: Page,
+    link: str,
+    base_delay_ms: int,
+    memo: Optional[SelectorMemo] = None,
+    wait_mode: str = "fixed",
+    waits=None,
+    rate=None,
+) -> Tuple[str, int]:
+    goto_started = time.perf_counter()
+    with danawa_metrics.stage("goto"):
+        try:
+            response = detail_page.goto(link, wait_until="domcontentloaded", timeout=15000)
+        except Exception as e:
+            observe_goto_error(rate, e)
+            raise
+    status = observe_page_status(rate, response, goto_started)
+    started = time.perf_counter()
+    ready = None
+    if wait_mode == "ready":
+        # 스펙 영역이 이미 있으면 바로 진행하고, 없을 때만 한 번 스크롤해서 지연 로딩을 깨움
+        ready = wait_for_spec_ready(detail_page, 2000)
+        if not ready:
+            detail_page.evaluate("() => window.scrollTo(0, document.body.scrollHeight)")
+            ready = wait_for_spec_ready(detail_page)
+    else:
+        wait_for_network_idle(detail_page)
+        slow_scroll(detail_page, steps=4, step_px=900, base_delay_ms=base_delay_ms)
+    click_detail_tab_if_present(detail_page, memo, wait_mode)
+    if waits is not None:
+        waits.record(link, (time.perf_counter() - started) * 1000, ready)
+    title = ""
+    try:
+        title = detail_page.title() or ""
+    except Exception as e:
+        print(f"    경고: 제목 추출 실패 - {e}")
+    if danawa_metrics.enabled():
+        try:
+            danawa_metrics.add_bytes(int(detail_page.evaluate(danawa_metrics.PAGE_BYTES_JS)))
+        except Exception:
+            pass
+    return title, status
+
+
+def crawl_product_detail(
+    pool,
+    link: str,
+    base_delay_ms: int,
+    extract_engine: str = "js",
+    cache=None,
+    category_url: str = "",
+    memo: Optional[SelectorMemo] = None,
+    wait_mode: str = "fixed",
+    waits=None,
+    rate=None,
+) -> Dict[str, str]:
+    # 풀의 페이지를 닫지 않고 그 자리에서 다음 상품으로 이동
+    with pool.page() as detail_page:
+        title, status = load_product_page(detail_page, link, base_delay_ms, memo, wait_mode, waits, rate)
+        if is_cacheable(cache, status):
+            with danawa_metrics.stage("content"):
+                page_html = detail_page.content()
+            store_page(cache, link, page_html, title, status, category_url)
+        specs = extract_specs(detail_page, extract_engine, memo)
+    return detail_row(title, link, specs)
+
+
+def capture_product_html(
+    pool,
+    link: str,
+    base_delay_ms: int,
+    cache=None,
+    category_url: str = "",
+    memo: Optional[SelectorMemo] = None,
+    wait_mode: str = "fixed",
+    waits=None,
+    rate=None,
+) -> Tuple[str, str]:
+    # 오프라인 파싱 모드: 브라우저 단계는 렌더링된 HTML 만 가져오고 페이지를 바로 풀에 반납
+    with pool.page() as detail_page:
+        title, status = load_product_page(detail_page, link, base_delay_ms, memo, wait_mode, waits, rate)
+        with danawa_metrics.stage("content"):
+            page_html = detail_page.content()
+    store_page(cache, link, page_html, title, status, category_url)
+    return title, page_html
+
+
+def queue_parsed_row(
+    title: str,
+    link: str,
+    page_html: str,
+    parse_pool: Optional[ProcessPoolExecutor],
+    pending: List[Tuple[str, str, "Future[List[Tuple[str, str]]]"]],
+    output,
+) -> None:
+    from danawa_parse import parse_detail_pairs
+
+    if parse_pool is not None:
+        pending.append((title, link, parse_pool.submit(parse_detail_pairs, page_html)))
+    else:
+        with danawa_metrics.stage("parse"):
+            pairs = parse_detail_pairs(page_html)
+        output.add(pairs_row(title, link, pairs))
+
+
+def collect_parsed_rows(pending: List[Tuple[str, str, "Future[List[Tuple[str, str]]]"]], output) -> None:
+    # 파싱 프로세스 풀의 결과를 링크 순서대로 행으로 변환
+    for title, link, future in pending:
+        try:
+            output.add(pairs_row(title, link, future.result()))
+        except Exception as e:
+            print(f"    오류: {link} 파싱 실패 - {e}")
+    pending.clear()
+
+
+def output_layout(long_format: bool, wide_format: bool) -> str:
+    # detail: 상세정보 문자열 한 열, long: (키, 값) 한 쌍당 한 행, wide: 스펙 키마다 한 열
+    if wide_format:
+        return "wide"
+    return "long" if long_format else "detail"
+
+
+def replay_from_cache(
+    cache_dir: str,
+    category_url: Optional[str],
+    output_csv: str,
+    parse_workers: Optional[int] = None,
+    clean_rules: Optional[str] = None,
+    layout: str = "detail",
+    output_format: str = "csv",
+    row_group_size: int = 10000,
+) -> None:
+    # 브라우저 없이 캐시된 HTML 만으로 CSV 재생성 (정리 규칙만 바꿨을 때)
+    from danawa_cache import HtmlCache, parse_cached_entry
+    from danawa_output import open_row_writer
+
+    entries = HtmlCache(cache_dir).entries(category_url)
+    print(f"캐시에서 {len(entries)}개 상품 리플레이 중...")
+    writer = open_row_writer(output_csv, layout, output_format, flush_every=500, row_group_size=row_group_size)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=parse_workers or os.cpu_count(), initializer=danawa_clean.use_rules, initargs=(clean_rules,)
+        ) as pool:
+            details = pool.map(parse_cached_entry, [html_path for _, html_path in entries], chunksize=16)
+            for (meta, _), pairs in zip(entries, details):
+                writer.write_row(pairs_row(str(meta.get("title", "")), str(meta.get("url", "")), pairs))
+    finally:
+        writer.close()
+    print(f"완료! {writer.rows_written}개 행 저장: {output_csv}")
+
+
 def crawl_category(
     category_url: str,
     output_csv: str,
@@ -319,203 +795,641 @@ def crawl_category(
     max_total_items: Optional[int] = None,
     base_delay_ms: int = 500,
     long_format: bool = False,
+    concurrency: int = 1,
+    extract_engine: str = "js",
+    parse_mode: str = "browser",
+    parse_workers: Optional[int] = None,
+    block_resources: bool = False,
+    routing_config: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    cache_ttl_hours: float = 0,
+    cache_max_mb: float = 0,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = False,
+    list_mode: str = "xhr",
+    selector_memo: bool = False,
+    selector_memo_path: Optional[str] = None,
+    wait_mode: str = "fixed",
+    wait_log: Optional[str] = None,
+    session=None,
+    recycle_after: int = 200,
+    max_heap_mb: float = 0,
+    metrics_jsonl: Optional[str] = None,
+    metrics_prom: Optional[str] = None,
+    rate_mode: str = "fixed",
+    min_delay_ms: int = 100,
+    max_delay_ms: int = 10000,
+    min_concurrency: int = 1,
+    rate_log: Optional[str] = None,
+    fetch_mode: str = "browser",
+    http2: bool = False,
+    http_min_specs: int = 3,
+    pipeline: bool = False,
+    queue_size: int = 0,
+    incremental: bool = False,
+    index_db: str = "danawa_index.db",
+    skip_fresh_hours: float = 0,
+    clean_rules: Optional[str] = None,
+    wide_format: bool = False,
+    output_format: str = "csv",
+    row_group_size: int = 10000,
+    max_retries: int = 2,
+    retry_base_delay_s: float = 5.0,
+    retry_max_delay_s: float = 120.0,
+    retry_budget: float = 0.2,
+    failures_file: Optional[str] = None,
 ) -> None:
-    with sync_playwright() as p:
-        context = open_new_context(p, headless=headless)
-        page = context.new_page()
-        page.set_default_timeout(10000)
+    # session: 여러 카테고리가 공유하는 BrowserSession / AsyncBrowserSession (없으면 이 호출에서 띄우고 닫음)
+    from danawa_output import open_crawl_output
+    from danawa_pool import AsyncBrowserSession, BrowserSession, PagePool
+    from danawa_retry import LIST, PRODUCT, RetryQueue
+    from danawa_waits import WaitStats
 
-        page.goto(category_url)
-        wait_for_network_idle(page)
-        slow_scroll(page)
-        human_delay(base_delay_ms)
+    cache = None
+    if cache_dir:
+        from danawa_cache import HtmlCache
 
-        all_rows: List[Dict[str, str]] = []
-        all_keys: Set[str] = set()
+        cache = HtmlCache(
+            cache_dir,
+            ttl_seconds=(cache_ttl_hours * 3600 or None),
+            max_bytes=(int(cache_max_mb * 1024 * 1024) or None),
+        )
 
-        for page_index in range(max_pages):
-            try:
-                print(f"페이지 {page_index + 1}/{max_pages} 크롤링 중...")
-                product_links = collect_product_links_from_category(page, max_items_per_page)
-                print(f"  - {len(product_links)}개 링크 발견")
-                
-                if not product_links:
-                    print(f"  - 페이지 {page_index + 1}에 제품이 없습니다. 종료합니다.")
-                    break
-                
-                for idx, link in enumerate(product_links, 1):
-                    if max_total_items and len(all_rows) >= max_total_items:
+    router = None
+    if block_resources or routing_config:
+        from danawa_routing import RequestRouter, load_routing_profiles
+
+        router = RequestRouter(load_routing_profiles(routing_config))
+
+    memo = None
+    if selector_memo or selector_memo_path:
+        memo = SelectorMemo(selector_memo_path, category_url)
+
+    if clean_rules:
+        # 상세정보 정리 규칙 교체 (오프라인 파싱 프로세스에는 initializer 로 전달)
+        danawa_clean.use_rules(clean_rules)
+
+    with ExitStack() as stack:
+        # 행은 완료되는 대로 스트리밍하고, 체크포인트로 재개 위치를 기록
+        output = open_crawl_output(
+            output_csv,
+            category_url,
+            checkpoint_path or f"{output_csv}.checkpoint.json",
+            resume=resume,
+            layout=output_layout(long_format, wide_format),
+            output_format=output_format,
+            row_group_size=row_group_size,
+        )
+        stack.callback(output.close)
+        index = None
+        if incremental:
+            from danawa_index import IncrementalOutput, ProductIndex
+
+            # 색인과 비교해서 새로 나왔거나 바뀐 상품만 CSV 에 기록
+            index = ProductIndex(index_db)
+            output = IncrementalOutput(output, index, skip_fresh_hours * 3600)
+            stack.callback(output.close)
+        if memo is not None:
+            stack.callback(memo.save)
+        waits = WaitStats(wait_mode, wait_log)
+        stack.callback(waits.close)
+        metrics = danawa_metrics.CrawlMetrics(metrics_jsonl, metrics_prom)
+        stack.callback(metrics.close)
+        stack.enter_context(danawa_metrics.activate(metrics))
+        rate = None
+        if rate_mode == "adaptive":
+            from danawa_rate import RateController
+
+            # --concurrency 가 동시성 상한, 절반에서 시작해서 서버 상태를 보며 올림
+            rate = RateController(
+                base_delay_ms,
+                min_delay_ms,
+                max_delay_ms,
+                concurrency=max(min_concurrency, concurrency // 2),
+                min_concurrency=min_concurrency,
+                max_concurrency=max(1, concurrency),
+                log_path=rate_log,
+            )
+            stack.callback(rate.close)
+        # 실패한 상품/목록 페이지는 버리지 않고 백오프 뒤에 다시 시도, 끝내 실패하면 JSONL 로 남김
+        retry = RetryQueue(
+            category_url,
+            max_retries,
+            retry_base_delay_s,
+            retry_max_delay_s,
+            budget_ratio=retry_budget,
+            failures_path=failures_file or f"{output_csv}.failures.jsonl",
+        )
+        stack.callback(retry.close)
+        if output.finished:
+            print("체크포인트 기준으로 이미 완료된 크롤링입니다.")
+            return
+        start_page = output.start_page
+        if resume:
+            print(f"체크포인트에서 재개: 페이지 {start_page + 1}, 기존 {output.rows_written}개 행")
+
+        parse_pool: Optional[ProcessPoolExecutor] = None
+        if parse_mode == "offline":
+            # 파싱은 CPU 코어 수만큼의 프로세스에서, 브라우저는 네트워크 작업만 수행
+            parse_pool = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=parse_workers or os.cpu_count(),
+                    initializer=danawa_clean.use_rules,
+                    initargs=(clean_rules,),
+                )
+            )
+
+        if concurrency > 1 or pipeline:
+            # 상세 페이지를 병렬로 처리하는 비동기 경로 (파이프라인도 이 경로에서만 동작)
+            from danawa_async import crawl_category_async
+
+            if session is None:
+                session = stack.enter_context(AsyncBrowserSession(headless))
+            session.run(
+                crawl_category_async(
+                    category_url=category_url,
+                    output=output,
+                    max_pages=max_pages,
+                    max_items_per_page=max_items_per_page,
+                    headless=headless,
+                    max_total_items=max_total_items,
+                    base_delay_ms=base_delay_ms,
+                    concurrency=concurrency,
+                    extract_engine=extract_engine,
+                    parse_pool=parse_pool,
+                    router=router,
+                    cache=cache,
+                    start_page=start_page,
+                    list_mode=list_mode,
+                    memo=memo,
+                    wait_mode=wait_mode,
+                    waits=waits,
+                    browser=session.browser,
+                    recycle_after=recycle_after,
+                    max_heap_mb=max_heap_mb,
+                    rate=rate,
+                    fetch_mode=fetch_mode,
+                    http2=http2,
+                    http_min_specs=http_min_specs,
+                    pipeline=pipeline,
+                    queue_size=queue_size,
+                    retry=retry,
+                )
+            )
+            output.close(finished=True)
+            retry.close()
+            print(retry.summary())
+            if index is not None:
+                print(index.summary())
+            if rate is not None:
+                print(rate.summary())
+            print(metrics.summary())
+            return
+
+        from danawa_pagination import ListPager
+
+        http = None
+        if fetch_mode == "hybrid":
+            from danawa_http import HttpFetcher
+
+            # 서버 렌더링 HTML 로 충분한 상품은 브라우저 탭 없이 처리
+            http = HttpFetcher(http2, http_min_specs, rate=rate)
+            stack.callback(http.close)
+
+        if session is None:
+            session = stack.enter_context(BrowserSession(headless))
+        with PagePool(session.browser, recycle_after, max_heap_mb, router) as pool:
+            # 목록 페이지는 카테고리가 끝날 때까지 풀에서 빌려 둠
+            page = pool.acquire()
+            page.set_default_timeout(10000)
+            if router is not None:
+                router.assign(page, "category")
+
+            page.goto(category_url)
+            wait_for_network_idle(page)
+            slow_scroll(page)
+            human_delay(base_delay_ms)
+
+            pending: List[Tuple[str, str, "Future[List[Tuple[str, str]]]"]] = []
+            # ready 모드/적응형 속도: 상품 사이 간격은 페이지 안의 고정 대기 대신 요청 시작 시점에서만 조절
+            limiter = PolitenessLimiter(base_delay_ms, rate)
+            paced = wait_mode == "ready" or rate is not None or http is not None
+            # 재개 시에도 앞 페이지를 거치지 않고 start_page 목록을 바로 요청
+            pager = ListPager(page, category_url, max_items_per_page, mode=list_mode, memo=memo)
+
+            def crawl_link(link: str, label: str) -> bool:
+                # 상품 하나: 캐시 → HTTP → 브라우저. 실패는 예외로 올림. 네트워크 요청을 했으면 True
+                cached = cache.get(link) if cache is not None else None
+                if cached is not None:
+                    meta, page_html = cached
+                    queue_parsed_row(str(meta.get("title", "")), link, page_html, parse_pool, pending, output)
+                    print(f"  {label} {link[:80]}... 캐시 사용")
+                    return False
+
+                print(f"  {label} {link[:80]}... 크롤링 중...")
+                if paced:
+                    limiter.wait()
+                fetched = http.fetch(link) if http is not None else None
+                if fetched is not None:
+                    title, page_html, status, specs = fetched
+                    store_page(cache, link, page_html, title, status, category_url)
+                    output.add(detail_row(title, link, specs))
+                    print(f"    HTTP 완료! (총 {output.rows_written}개 수집)")
+                    return True
+                if http is not None:
+                    # 같은 상품을 브라우저로 다시 요청하므로 간격을 한 번 더 지킴
+                    limiter.wait()
+                if parse_pool is not None:
+                    title, page_html = capture_product_html(
+                        pool, link, base_delay_ms, cache, category_url, memo, wait_mode, waits, rate
+                    )
+                    queue_parsed_row(title, link, page_html, parse_pool, pending, output)
+                    print(f"    HTML 수집 완료! (총 {output.rows_written + len(pending)}개 수집)")
+                else:
+                    row = crawl_product_detail(
+                        pool,
+                        link,
+                        base_delay_ms,
+                        extract_engine,
+                        cache,
+                        category_url,
+                        memo,
+                        wait_mode,
+                        waits,
+                        rate,
+                    )
+                    output.add(row)
+                    print(f"    완료! (총 {output.rows_written}개 수집)")
+                return True
+
+            def crawl_one(link: str, label: str, entry=None) -> None:
+                # 상품 하나의 단계별 시간/바이트/성공 여부 기록. 실패하면 빈 행 대신 재시도 큐로
+                requested = True
+                with danawa_metrics.item("product", link):
+                    if entry is None:
+                        retry.record_attempt()
+                    else:
+                        danawa_metrics.count("retries")
+                    try:
+                        requested = crawl_link(link, label)
+                        if entry is not None:
+                            retry.recovered(entry)
+                    except Exception as e:
+                        print(f"    오류: {link} 크롤링 실패 - {e}")
+                        danawa_metrics.fail_item(e)
+                        retry.defer(PRODUCT, link, e, entry)
+                if requested and not paced:
+                    human_delay(base_delay_ms)
+
+            def limit_reached() -> bool:
+                return bool(max_total_items) and output.rows_written + len(pending) >= max_total_items
+
+            def crawl_links(product_links: List[str], interleave: bool) -> bool:
+                # 한도에 도달하면 True. interleave: 상품 사이사이에 백오프가 끝난 재시도를 처리
+                for link in product_links:
+                    if limit_reached():
                         print(f"최대 아이템 수({max_total_items})에 도달했습니다.")
-                        break
-                    
+                        return True
+                    if output.is_done(link):
+                        continue
+                    crawl_one(link, f"[{output.rows_written + len(pending) + 1}]")
+                    if interleave:
+                        run_due_retries()
+                return False
+
+            def run_due_retries() -> None:
+                # 한도에 도달하면 남은 항목은 큐에 두고 종료 시 실패 파일에 기록
+                while not limit_reached():
+                    due = retry.due(limit=1)
+                    if not due:
+                        return
+                    entry = due[0]
+                    if entry.kind == PRODUCT:
+                        if not output.is_done(entry.target):
+                            crawl_one(entry.target, f"[재시도 {entry.attempts}]", entry)
+                        continue
+                    print(f"페이지 {entry.target + 1} 목록 재시도 ({entry.attempts}회 실패)")
                     try:
-                        print(f"  [{len(all_rows) + 1}] {link[:80]}... 크롤링 중...")
-                        detail_page = context.new_page()
-                        detail_page.set_default_timeout(15000)  # 타임아웃 증가
-                        try:
-                            detail_page.goto(link, wait_until="domcontentloaded", timeout=15000)
-                            wait_for_network_idle(detail_page)
-                            slow_scroll(detail_page, steps=4, step_px=900, base_delay_ms=base_delay_ms)
-                            click_detail_tab_if_present(detail_page)
-                            specs = extract_specs_from_detail(detail_page)
-                            title = ""
-                            try:
-                                title = detail_page.title() or ""
-                            except Exception as e:
-                                print(f"    경고: 제목 추출 실패 - {e}")
-                                pass
-                            
-                            # 스펙 정보를 하나의 문자열로 합치기
-                            spec_parts = []
-                            certification_items = []
-                            
-                            for key, value in specs.items():
-                                if not value or not value.strip():
-                                    continue
-                                
-                                # 값 정리
-                                clean_value = value.strip()
-                                # 인증번호 확인 버튼 텍스트 제거
-                                clean_value = clean_value.split("인증번호 확인")[0].strip()
-                                # 괄호와 그 안의 모든 내용 제거 (닫힌/안 닫힌 괄호 모두 처리)
-                                clean_value = re.sub(r'\s*\([^)]*\)', '', clean_value)  # 닫힌 괄호
-                                clean_value = re.sub(r'\s*\([^)]*$', '', clean_value)  # 닫히지 않은 괄호 (끝까지)
-                                clean_value = re.sub(r'\s*\([^)]*', '', clean_value)    # 열린 괄호부터 끝까지
-                                # "제조사 웹사이트" 같은 텍스트 직접 제거
-                                clean_value = clean_value.replace("제조사 웹사이트", "").strip()
-                                clean_value = clean_value.replace("웹사이트", "").strip()
-                                # "바로가기" 관련 텍스트 제거
-                                clean_value = clean_value.split("바로가기")[0].strip()
-                                # 불필요한 공백 정리
-                                clean_value = re.sub(r'\s+', ' ', clean_value).strip()
-                                
-                                if not clean_value:
-                                    continue
-                                
-                                # 의미없는 값 체크
-                                meaningless_values = [
-                                    "상세설명 / 판매 사이트 문의",
-                                    "상세설명",
-                                    "판매 사이트 문의",
-                                    "인증번호 확인"
-                                ]
-                                is_meaningless = clean_value in meaningless_values or any(mv in clean_value for mv in ["상세설명 / 판매 사이트 문의"])
-                                
-                                # 체크 표시(○)인 경우 키 이름을 값으로 사용
-                                check_marks = ["○", "O", "o", "●"]
-                                if clean_value in check_marks:
-                                    # HACCP인증은 인증 목록에 추가
-                                    if "HACCP" in key or key == "HACCP인증":
-                                        if key not in certification_items:
-                                            certification_items.append(key)
-                                    else:
-                                        # 키 이름이 실제 값이 됨
-                                        # 키 이름을 카테고리명으로 매핑
-                                        category_mapping = {
-                                            "레토르트이유식": "품목",
-                                            "파우치": "포장용기",
-                                            "6개월~": "최소연령",
-                                            "상온": "보관방식",
-                                        }
-                                        # 키 이름을 카테고리로 변환 (매핑에 없으면 키 이름 그대로)
-                                        category = category_mapping.get(key, key)
-                                        spec_parts.append(f"{category}:{key}")
-                                # 인증 관련 항목들을 따로 모으기
-                                elif "인증" in key:
-                                    # 인증 키 이름 자체를 인증 목록에 추가 (값이 의미없어도)
-                                    cert_name = key  # "적합성평가인증", "안전확인인증" 등
-                                    if cert_name not in certification_items:
-                                        certification_items.append(cert_name)
-                                else:
-                                    # 일반 스펙 항목 - 의미없는 값은 스킵
-                                    if not is_meaningless:
-                                        spec_parts.append(f"{key}:{clean_value}")
-                            
-                            # 인증 항목이 있으면 합쳐서 추가
-                            if certification_items:
-                                cert_str = ",".join(certification_items)
-                                spec_parts.append(f"인증:{cert_str}")
-                            
-                            detail_info = "/".join(spec_parts)
-                            row = {"상품명": title, "URL": link, "상세정보": detail_info}
-                            all_rows.append(row)
-                            print(f"    완료! (총 {len(all_rows)}개 수집)")
-                        except Exception as e:
-                            print(f"    오류: {link} 크롤링 실패 - {e}")
-                            # 실패한 경우에도 빈 행 추가는 하지 않음
-                        finally:
-                            try:
-                                detail_page.close()
-                            except:
-                                pass
-                        
-                        human_delay(base_delay_ms)
+                        with danawa_metrics.item("list", f"{category_url}#{entry.target + 1}"):
+                            danawa_metrics.count("retries")
+                            product_links = pager.links_for_page(entry.target + 1)
                     except Exception as e:
-                        print(f"  오류: 페이지 생성 실패 - {e}")
+                        print(f"  오류: 페이지 {entry.target + 1} 목록 재시도 실패 - {e}")
+                        retry.defer(LIST, entry.target, e, entry)
                         continue
+                    retry.recovered(entry)
+                    print(f"  - {len(product_links)}개 링크 발견")
+                    crawl_links(product_links, interleave=False)
+
+            for page_index in range(start_page, max_pages):
+                try:
+                    output.set_page(page_index)
+                    print(f"페이지 {page_index + 1}/{max_pages} 크롤링 중...")
+                    retry.record_attempt()
+                    with danawa_metrics.item("list", f"{category_url}#{page_index + 1}"):
+                        product_links = pager.links_for_page(page_index + 1)
+                    print(f"  - {len(product_links)}개 링크 발견")
                 
-                if max_total_items and len(all_rows) >= max_total_items:
-                    print(f"최대 아이템 수({max_total_items})에 도달했습니다.")
-                    break
-                    
-                if page_index < max_pages - 1:
-                    print(f"  다음 페이지로 이동 시도...")
-                    next_page_num = page_index + 2  # 다음 페이지 번호 (1부터 시작)
-                    moved = paginate_category(page, category_url, next_page_num)
-                    if not moved:
-                        print(f"  다음 페이지로 이동할 수 없습니다. 종료합니다.")
+                    if not product_links:
+                        print(f"  - 페이지 {page_index + 1}에 제품이 없습니다. 종료합니다.")
                         break
-                    slow_scroll(page)
-                    human_delay(base_delay_ms)
-            except Exception as e:
-                print(f"페이지 {page_index + 1} 처리 중 오류 발생: {e}")
-                # 계속 진행
-                if page_index < max_pages - 1:
-                    try:
-                        next_page_num = page_index + 2
-                        paginate_category(page, category_url, next_page_num)
-                    except:
-                        pass
+                
+                    if crawl_links(product_links, interleave=True):
+                        break
+                
+                    collect_parsed_rows(pending, output)
+                    if max_total_items and output.rows_written >= max_total_items:
+                        print(f"최대 아이템 수({max_total_items})에 도달했습니다.")
+                        break
+                    
+                    if page_index < max_pages - 1:
+                        human_delay(base_delay_ms)
+                except Exception as e:
+                    print(f"페이지 {page_index + 1} 처리 중 오류 발생: {e}")
+                    # 다음 페이지는 pager 가 번호로 직접 요청하므로 계속 진행하고, 이 페이지는 백오프 뒤에 다시 시도
+                    retry.defer(LIST, page_index, e)
 
-        # 모든 상세 정보를 하나의 컬럼에 저장
-        fieldnames = ["상품명", "URL", "상세정보"]
-        with open(output_csv, "w", encoding="utf-8-sig", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for row in all_rows:
-                writer.writerow({key: row.get(key, "") for key in fieldnames})
+            # 정상 흐름이 끝나면 남은 재시도를 백오프 시각에 맞춰 처리
+            while len(retry) and not limit_reached():
+                wait_s = retry.next_delay_s() or 0.0
+                if wait_s > 0:
+                    print(f"재시도 대기 {wait_s:.1f}초 ({len(retry)}개 남음)")
+                    time.sleep(wait_s)
+                run_due_retries()
+                collect_parsed_rows(pending, output)
 
-        context.browser.close()
+            collect_parsed_rows(pending, output)
+            output.close(finished=True)
+            retry.close()
+            print(f"완료! {output.rows_written}개 행 저장: {output_csv}")
+            print(retry.summary())
+            if router is not None:
+                print("요청 라우팅 통계:")
+                print(router.stats.summary())
+            if cache is not None:
+                print(cache.summary())
+            if memo is not None:
+                print("선택자 메모 통계:")
+                print(memo.summary())
+            print(waits.summary())
+            print(pool.summary())
+            if http is not None:
+                print(http.stats.summary())
+            if index is not None:
+                print(index.summary())
+            if rate is not None:
+                print(rate.summary())
+            print(metrics.summary())
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Danawa category crawler -> CSV")
-    parser.add_argument("--category-url", required=True, help="Danawa category URL (list view)")
+    parser.add_argument(
+        "--category-url",
+        action="append",
+        help="Danawa category URL (list view); repeat to crawl several categories with one browser",
+    )
     parser.add_argument("--output", default="danawa_output.csv", help="Output CSV filepath")
     parser.add_argument("--pages", type=int, default=1, help="Max pages to crawl")
     parser.add_argument("--items-per-page", type=int, default=0, help="Max items per page (0 for all)")
     parser.add_argument("--headless", action="store_true", help="Run browser headless")
     parser.add_argument("--max-total-items", type=int, default=0, help="Stop after N items across pages (0=unlimited)")
     parser.add_argument("--delay-ms", type=int, default=600, help="Base human-like delay in ms")
-    parser.add_argument("--long-format", action="store_true", help="Export as rows: 상품명,URL,key,value")
-    return parser.parse_args()
+    parser.add_argument("--long-format", action="store_true", help="Export as rows: 상품명,URL,키,값")
+    parser.add_argument(
+        "--wide-format", action="store_true", help="Parquet only: one dictionary-encoded column per spec key"
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["csv", "parquet"],
+        help="Output file format (default: parquet if --output ends with .parquet, else csv)",
+    )
+    parser.add_argument(
+        "--row-group-size", type=int, default=10000, help="Parquet: rows per row group (default: 10000)"
+    )
+    parser.add_argument("--concurrency", type=int, default=1, help="Parallel detail pages (async Playwright when > 1)")
+    parser.add_argument(
+        "--extract-engine",
+        choices=["js", "locator"],
+        default="js",
+        help="Spec extraction: single in-page script (js) or per-element locators (locator)",
+    )
+    parser.add_argument(
+        "--parse-mode",
+        choices=["browser", "offline"],
+        default="browser",
+        help="Parse specs in the live page (browser) or from captured HTML in a process pool (offline)",
+    )
+    parser.add_argument("--parse-workers", type=int, default=0, help="Offline parse processes (0=CPU count)")
+    parser.add_argument("--clean-rules", help="JSON file overriding the spec cleaning rules (see danawa_clean.py)")
+    parser.add_argument(
+        "--block-resources",
+        action="store_true",
+        help="Block images/fonts/media and ad/analytics requests not needed for links or specs",
+    )
+    parser.add_argument("--routing-config", help="JSON file overriding the per-page-type routing profiles")
+    parser.add_argument("--cache-dir", help="Directory for the on-disk rendered detail HTML cache")
+    parser.add_argument("--cache-ttl-hours", type=float, default=0, help="Refetch cached pages older than this (0=never)")
+    parser.add_argument("--cache-max-mb", type=float, default=0, help="Evict least recently used entries above this size (0=unlimited)")
+    parser.add_argument("--replay", action="store_true", help="Rebuild the CSV from --cache-dir only, without a browser")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint.json)")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint, appending to --output")
+    parser.add_argument(
+        "--list-mode",
+        choices=["xhr", "dom"],
+        default="xhr",
+        help="Fetch list pages by replaying the captured movePage XHR (xhr) or by moving the DOM pager (dom)",
+    )
+    parser.add_argument(
+        "--selector-memo",
+        action="store_true",
+        help="Try the last matching selector/label first on each page and report hit/miss statistics",
+    )
+    parser.add_argument("--selector-memo-file", help="JSON file persisting the selector memo per category URL")
+    parser.add_argument(
+        "--wait-mode",
+        choices=["fixed", "ready"],
+        default="fixed",
+        help="Per-product waiting: fixed scrolls/sleeps (fixed) or wait until the spec area is present (ready)",
+    )
+    parser.add_argument("--wait-log", help="Append per-product wait times as JSONL to this file")
+    parser.add_argument(
+        "--recycle-after", type=int, default=200, help="Recycle a browser context after N product pages (0=never)"
+    )
+    parser.add_argument(
+        "--max-heap-mb", type=float, default=0, help="Recycle a browser context when a page's JS heap exceeds this (0=off)"
+    )
+    parser.add_argument(
+        "--rate-mode",
+        choices=["fixed", "adaptive"],
+        default="fixed",
+        help="fixed: --delay-ms + jitter after every product; adaptive: AIMD on delay/concurrency from latency, errors and 429/403",
+    )
+    parser.add_argument("--min-delay-ms", type=int, default=100, help="Adaptive mode: lowest inter-request delay")
+    parser.add_argument("--max-delay-ms", type=int, default=10000, help="Adaptive mode: highest inter-request delay")
+    parser.add_argument(
+        "--min-concurrency", type=int, default=1, help="Adaptive mode: lowest concurrency (--concurrency is the ceiling)"
+    )
+    parser.add_argument("--rate-log", help="Adaptive mode: append every rate adjustment as JSONL")
+    parser.add_argument(
+        "--fetch-mode",
+        choices=["browser", "hybrid"],
+        default="browser",
+        help="hybrid: try a plain HTTP request first and use Playwright only when the spec container is missing",
+    )
+    parser.add_argument("--http2", action="store_true", help="Hybrid mode: use HTTP/2 (needs httpx[http2])")
+    parser.add_argument(
+        "--http-min-specs", type=int, default=3, help="Hybrid mode: fall back to the browser below this many specs"
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Keep paginating while product pages are crawled (list producer + detail consumers, async path)",
+    )
+    parser.add_argument(
+        "--queue-size", type=int, default=0, help="Pipeline: max links waiting for a detail worker (default: 2x concurrency)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Compare products with the index (by pcode) and write only new or changed rows",
+    )
+    parser.add_argument(
+        "--index-db", default="danawa_index.db", help="Incremental mode: SQLite index of crawled products"
+    )
+    parser.add_argument(
+        "--skip-fresh-hours",
+        type=float,
+        default=0,
+        help="Incremental mode: skip products checked within this many hours without requesting them (0 = always revalidate)",
+    )
+    parser.add_argument("--max-retries", type=int, default=2, help="Retries per failed product/list page (0=off)")
+    parser.add_argument(
+        "--retry-base-delay-s", type=float, default=5.0, help="First retry backoff; doubles per attempt, with jitter"
+    )
+    parser.add_argument("--retry-max-delay-s", type=float, default=120.0, help="Retry backoff upper bound")
+    parser.add_argument(
+        "--retry-budget",
+        type=float,
+        default=0.2,
+        help="Max retries as a fraction of all attempts (plus 10), so outages don't multiply load",
+    )
+    parser.add_argument(
+        "--failures-file", help="JSONL of items that still failed (default: <output>.failures.jsonl)"
+    )
+    parser.add_argument("--metrics-jsonl", help="Append per-product/per-list-page stage timings as JSONL")
+    parser.add_argument("--metrics-prom", help="Write Prometheus text-format metrics to this file at the end")
+    args = parser.parse_args()
+    if args.output_format is None:
+        args.output_format = "parquet" if args.output.lower().endswith(".parquet") else "csv"
+    if args.output_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("--output-format parquet requires pyarrow (pip install pyarrow)")
+    elif args.wide_format:
+        parser.error("--wide-format requires --output-format parquet")
+    if args.long_format and args.wide_format:
+        parser.error("--long-format and --wide-format are mutually exclusive")
+    if args.replay and not args.cache_dir:
+        parser.error("--replay requires --cache-dir")
+    if not args.replay and not args.category_url:
+        parser.error("--category-url is required")
+    if args.category_url and len(args.category_url) > 1:
+        if args.replay:
+            parser.error("--replay takes a single --category-url")
+        if args.checkpoint:
+            parser.error("--checkpoint cannot be shared by several categories")
+    return args
+
+
+def category_output_path(output_csv: str, category_url: str, index: int) -> str:
+    # 여러 카테고리를 크롤링할 때 카테고리마다 출력 파일을 나눔 (cate= 코드가 있으면 그 값, 없으면 순번)
+    match = re.search(r"[?&]cate=(\w+)", category_url)
+    suffix = match.group(1) if match else str(index + 1)
+    stem, ext = os.path.splitext(output_csv)
+    return f"{stem}_{suffix}{ext or '.csv'}"
 
 
 def main() -> None:
     args = parse_args()
-    crawl_category(
-        category_url=args.category_url,
-        output_csv=args.output,
+    if args.replay:
+        category_url = args.category_url[0] if args.category_url else None
+        replay_from_cache(
+            args.cache_dir,
+            category_url,
+            args.output,
+            parse_workers=(args.parse_workers or None),
+            clean_rules=args.clean_rules,
+            layout=output_layout(args.long_format, args.wide_format),
+            output_format=args.output_format,
+            row_group_size=args.row_group_size,
+        )
+        return
+    options = dict(
         max_pages=args.pages,
         max_items_per_page=(args.items_per_page or None),
         headless=args.headless,
         max_total_items=(args.max_total_items or None),
         base_delay_ms=args.delay_ms,
         long_format=args.long_format,
+        concurrency=max(1, args.concurrency),
+        extract_engine=args.extract_engine,
+        parse_mode=args.parse_mode,
+        parse_workers=(args.parse_workers or None),
+        block_resources=args.block_resources,
+        routing_config=args.routing_config,
+        cache_dir=args.cache_dir,
+        cache_ttl_hours=args.cache_ttl_hours,
+        cache_max_mb=args.cache_max_mb,
+        checkpoint_path=args.checkpoint,
+        resume=args.resume,
+        list_mode=args.list_mode,
+        selector_memo=args.selector_memo,
+        selector_memo_path=args.selector_memo_file,
+        wait_mode=args.wait_mode,
+        wait_log=args.wait_log,
+        recycle_after=args.recycle_after,
+        max_heap_mb=args.max_heap_mb,
+        metrics_jsonl=args.metrics_jsonl,
+        metrics_prom=args.metrics_prom,
+        rate_mode=args.rate_mode,
+        min_delay_ms=args.min_delay_ms,
+        max_delay_ms=args.max_delay_ms,
+        min_concurrency=args.min_concurrency,
+        rate_log=args.rate_log,
+        fetch_mode=args.fetch_mode,
+        http2=args.http2,
+        http_min_specs=args.http_min_specs,
+        pipeline=args.pipeline,
+        queue_size=args.queue_size,
+        incremental=args.incremental,
+        index_db=args.index_db,
+        skip_fresh_hours=args.skip_fresh_hours,
+        clean_rules=args.clean_rules,
+        wide_format=args.wide_format,
+        output_format=args.output_format,
+        row_group_size=args.row_group_size,
+        max_retries=args.max_retries,
+        retry_base_delay_s=args.retry_base_delay_s,
+        retry_max_delay_s=args.retry_max_delay_s,
+        retry_budget=args.retry_budget,
+        failures_file=args.failures_file,
     )
+    if len(args.category_url) == 1:
+        crawl_category(category_url=args.category_url[0], output_csv=args.output, **options)
+        return
 
+    # 여러 카테고리는 브라우저 하나를 공유 (카테고리마다 Chromium 을 새로 띄우지 않음)
+    from danawa_pool import AsyncBrowserSession, BrowserSession
 
-if __name__ == "__main__":
-    main()
+    session_type = AsyncBrowserSession if options["concurrency"] > 1 or options["pipeline"] else BrowserSession
+    with session_type(args.headless) as session:
+        for index, category_url in enumerate(args.category_url):
+            output_csv = category_output_path(args.output, category_url, index)
+            print(f"=== 카테고리 {index + 1}/{len(args.category_url)}: {category_url} -> {output_csv}")
+            crawl_category(category_url=category_url, output_csv=output_csv, session=session, **options)
 
 
+if __name__ == "__main__":
+    main()
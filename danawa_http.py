@@ -0,0 +1,158 @@
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+import danawa_metrics
+from danawa_crawler import CONTEXT_OPTIONS, SPEC_CONTAINER_SELECTORS
+from danawa_parse import parse_server_html
+from danawa_rate import BLOCK_STATUSES, ThrottledError
+
+# (제목, HTML, 상태 코드, 스펙)
+HttpPage = Tuple[str, str, int, Dict[str, str]]
+
+
+def http_headers() -> Dict[str, str]:
+    # 브라우저 컨텍스트(open_new_context)와 같은 User-Agent/언어로 요청
+    locale = str(CONTEXT_OPTIONS["locale"])
+    language = locale.split("-")[0]
+    return {
+        "User-Agent": str(CONTEXT_OPTIONS["user_agent"]),
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": f"{locale},{language};q=0.9,en-US;q=0.8,en;q=0.7",
+    }
+
+
+def _client_options(http2: bool, timeout_s: float, max_connections: int) -> Dict[str, object]:
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("경고: h2 패키지가 없어 HTTP/1.1 로 요청합니다 (pip install httpx[http2])")
+            http2 = False
+    return {
+        "http2": http2,
+        "headers": http_headers(),
+        "timeout": timeout_s,
+        "follow_redirects": True,
+        "limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    }
+
+
+class FetchStats:
+    # HTTP 로 끝난 상품과 브라우저로 넘긴 상품(이유별) 수
+    def __init__(self) -> None:
+        self.http_ok = 0
+        self.fallbacks: Dict[str, int] = {}
+
+    def record_ok(self) -> None:
+        self.http_ok += 1
+        danawa_metrics.count("fetch.http")
+
+    def record_fallback(self, reason: str) -> None:
+        self.fallbacks[reason] = self.fallbacks.get(reason, 0) + 1
+        danawa_metrics.count("fallback.browser")
+
+    def fallback_rate(self) -> float:
+        total = self.http_ok + sum(self.fallbacks.values())
+        return sum(self.fallbacks.values()) / total if total else 0.0
+
+    def summary(self) -> str:
+        total = self.http_ok + sum(self.fallbacks.values())
+        reasons = ", ".join(f"{reason} {n}" for reason, n in sorted(self.fallbacks.items(), key=lambda item: -item[1]))
+        return (
+            f"HTTP 가져오기: {total}건 중 HTTP {self.http_ok}건, 브라우저 전환 {total - self.http_ok}건 "
+            f"({self.fallback_rate() * 100:.1f}%)" + (f" - {reasons}" if reasons else "")
+        )
+
+
+class _FetcherBase:
+    # 서버 렌더링 HTML 에 기본 스펙 컨테이너가 있고 스펙이 min_specs 개 이상이면 HTTP 결과를 그대로 사용,
+    # 아니면 (JS 로 채워지는 페이지) 이유를 남기고 None 을 돌려줘서 Playwright 경로로 넘김
+    def __init__(self, min_specs: int = 3, rate=None, stats: Optional[FetchStats] = None) -> None:
+        self.min_specs = min_specs
+        self.rate = rate
+        self.stats = stats or FetchStats()
+
+    def _on_error(self, error: Exception) -> None:
+        if self.rate is not None:
+            self.rate.observe_error(isinstance(error, httpx.TimeoutException))
+        self.stats.record_fallback("timeout" if isinstance(error, httpx.TimeoutException) else "error")
+
+    def _judge(self, response: httpx.Response, latency_ms: float) -> Optional[HttpPage]:
+        status = response.status_code
+        if self.rate is not None:
+            self.rate.observe(status, latency_ms)
+        if status in BLOCK_STATUSES:
+            # 브라우저로 다시 요청해도 막히므로 넘기지 않고 실패 처리
+            raise ThrottledError(status)
+        if status != 200:
+            self.stats.record_fallback(f"http_{status}")
+            return None
+        page_html = response.text
+        with danawa_metrics.stage("parse"):
+            title, specs, matched = parse_server_html(page_html)
+        danawa_metrics.add_bytes(len(response.content))
+        if matched not in SPEC_CONTAINER_SELECTORS:
+            self.stats.record_fallback("no_container")
+            return None
+        if len(specs) < self.min_specs:
+            self.stats.record_fallback("few_specs")
+            return None
+        self.stats.record_ok()
+        return title, page_html, status, specs
+
+
+class HttpFetcher(_FetcherBase):
+    # 연결을 재사용하는 httpx.Client (keep-alive, 선택적으로 HTTP/2)
+    def __init__(
+        self,
+        http2: bool = False,
+        min_specs: int = 3,
+        timeout_s: float = 10.0,
+        max_connections: int = 10,
+        rate=None,
+        stats: Optional[FetchStats] = None,
+    ) -> None:
+        super().__init__(min_specs, rate, stats)
+        self.client = httpx.Client(**_client_options(http2, timeout_s, max_connections))
+
+    def fetch(self, link: str) -> Optional[HttpPage]:
+        started = time.perf_counter()
+        try:
+            with danawa_metrics.stage("http"):
+                response = self.client.get(link)
+        except httpx.HTTPError as e:
+            self._on_error(e)
+            return None
+        return self._judge(response, (time.perf_counter() - started) * 1000)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class AsyncHttpFetcher(_FetcherBase):
+    def __init__(
+        self,
+        http2: bool = False,
+        min_specs: int = 3,
+        timeout_s: float = 10.0,
+        max_connections: int = 10,
+        rate=None,
+        stats: Optional[FetchStats] = None,
+    ) -> None:
+        super().__init__(min_specs, rate, stats)
+        self.client = httpx.AsyncClient(**_client_options(http2, timeout_s, max_connections))
+
+    async def fetch(self, link: str) -> Optional[HttpPage]:
+        started = time.perf_counter()
+        try:
+            with danawa_metrics.stage("http"):
+                response = await self.client.get(link)
+        except httpx.HTTPError as e:
+            self._on_error(e)
+            return None
+        return self._judge(response, (time.perf_counter() - started) * 1000)
+
+    async def close(self) -> None:
+        await self.client.aclose()
@@ -0,0 +1,132 @@
+import hashlib
+import sqlite3
+import time
+from typing import Dict, Optional
+
+from danawa_crawler import canonical_product_key
+
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT,
+    content_hash TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_checked REAL NOT NULL,
+    last_changed REAL NOT NULL
+);
+"""
+
+
+def content_hash(row: Dict[str, str]) -> str:
+    # 상품명 + 정리된 상세정보 (정리 규칙을 바꾸면 다음 한 번은 모든 상품이 변경으로 나옴)
+    content = f"{row.get('상품명', '')}\n{row.get('상세정보', '')}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ProductIndex:
+    # 이전에 크롤링한 상품의 SQLite 색인. 키는 canonical_product_key (pcode) 이므로
+    # 다른 URL/다른 목록 페이지로 들어온 같은 상품도 한 행으로 관리
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        self.uncommitted = 0
+        self.counts: Dict[str, int] = {NEW: 0, CHANGED: 0, UNCHANGED: 0, "skipped": 0}
+
+    def last_checked(self, url: str) -> Optional[float]:
+        row = self.conn.execute(
+            "SELECT last_checked FROM products WHERE product_key = ?", (canonical_product_key(url),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, url: str, max_age_s: float) -> bool:
+        checked = self.last_checked(url)
+        return checked is not None and time.time() - checked < max_age_s
+
+    def skip(self) -> None:
+        self.counts["skipped"] += 1
+
+    def record(self, row: Dict[str, str]) -> str:
+        # 크롤링한 행을 색인과 비교해서 new/changed/unchanged 를 돌려주고 색인을 갱신
+        key = canonical_product_key(row["URL"])
+        digest = content_hash(row)
+        now = time.time()
+        found = self.conn.execute("SELECT content_hash FROM products WHERE product_key = ?", (key,)).fetchone()
+        if found is None:
+            change = NEW
+            self.conn.execute(
+                "INSERT INTO products (product_key, url, title, content_hash, first_seen, last_checked, last_changed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, row["URL"], row.get("상품명", ""), digest, now, now, now),
+            )
+        elif found[0] != digest:
+            change = CHANGED
+            self.conn.execute(
+                "UPDATE products SET url = ?, title = ?, content_hash = ?, last_checked = ?, last_changed = ? "
+                "WHERE product_key = ?",
+                (row["URL"], row.get("상품명", ""), digest, now, now, key),
+            )
+        else:
+            change = UNCHANGED
+            self.conn.execute("UPDATE products SET last_checked = ? WHERE product_key = ?", (now, key))
+        self.counts[change] += 1
+        self.uncommitted += 1
+        return change
+
+    def commit(self) -> None:
+        self.conn.commit()
+        self.uncommitted = 0
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.commit()
+            self.conn.close()
+            self.conn = None
+
+    def summary(self) -> str:
+        return (
+            f"증분 크롤링: 새 상품 {self.counts[NEW]}개, 변경 {self.counts[CHANGED]}개, "
+            f"변경 없음 {self.counts[UNCHANGED]}개, 최근 확인으로 건너뜀 {self.counts['skipped']}개"
+        )
+
+
+class IncrementalOutput:
+    # CrawlOutput 을 감싸서 색인과 비교해 새로 나왔거나 바뀐 상품 행만 기록
+    # skip_fresh_s 이내에 확인한 상품은 요청 없이 건너뛰고, 나머지는 다시 가져와 해시로 비교 (재검증)
+    def __init__(self, output, index: ProductIndex, skip_fresh_s: float = 0, commit_every: int = 50) -> None:
+        self.output = output
+        self.index = index
+        self.skip_fresh_s = skip_fresh_s
+        self.commit_every = max(1, commit_every)
+
+    def __getattr__(self, name: str):
+        return getattr(self.output, name)
+
+    def is_done(self, url: str) -> bool:
+        if self.output.is_done(url):
+            return True
+        if self.skip_fresh_s and self.index.is_fresh(url, self.skip_fresh_s):
+            self.index.skip()
+            self.output.mark_seen(url)
+            return True
+        return False
+
+    def add(self, row: Dict[str, str]) -> None:
+        if self.index.record(row) == UNCHANGED:
+            self.output.mark_seen(row["URL"])
+            print(f"    변경 없음: {row['URL'][:80]}")
+        else:
+            self.output.add(row)
+        if self.index.uncommitted >= self.commit_every:
+            # CSV 를 먼저 내보낸 뒤 색인을 커밋해서, 중단돼도 색인에만 있고 CSV 에 없는 변경 행이 생기지 않도록 함
+            self.output.writer.flush()
+            self.index.commit()
+
+    def close(self, finished: Optional[bool] = None) -> None:
+        self.output.close(finished)
+        self.index.close()
@@ -0,0 +1,484 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import danawa_metrics
+from danawa_crawler import (
+    PolitenessLimiter,
+    canonical_product_key,
+    crawl_product_detail,
+    slow_scroll,
+    wait_for_network_idle,
+)
+
+CATEGORY_PAGE = "category_page"
+PRODUCT = "product"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    task_key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    category_url TEXT NOT NULL,
+    page_num INTEGER NOT NULL DEFAULT 0,
+    max_pages INTEGER NOT NULL DEFAULT 1,
+    max_items INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL NOT NULL DEFAULT 0,
+    title TEXT,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL DEFAULT 0,
+    UNIQUE (kind, task_key)
+);
+CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (state, kind, lease_expires);
+"""
+
+
+class Task:
+    def __init__(self, row: sqlite3.Row) -> None:
+        self.id = row["id"]
+        self.kind = row["kind"]
+        self.url = row["url"]
+        self.category_url = row["category_url"]
+        self.page_num = row["page_num"]
+        self.max_pages = row["max_pages"]
+        self.max_items = row["max_items"] or None
+        self.attempts = row["attempts"]
+
+
+class JobQueue:
+    # SQLite 작업 큐. 카테고리 목록 페이지와 상품 상세가 각각 하나의 작업이며,
+    # 작업은 리스(lease_owner, lease_expires)를 잡은 워커만 처리하고 완료/실패도 리스 주인만 기록할 수 있음.
+    # 워커가 죽으면 리스가 만료되어 다른 워커가 다시 가져가므로 작업이 사라지지 않고,
+    # (kind, task_key) 유일 제약으로 같은 목록 페이지/상품(pcode)이 두 번 들어가지 않음
+    def __init__(self, db_path: str, lease_seconds: float = 120, max_attempts: int = 3) -> None:
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.conn = self._connect(db_path)
+        self.conn.executescript(SCHEMA)
+
+    @staticmethod
+    def _connect(db_path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def enqueue_category(self, category_url: str, max_pages: int, max_items: Optional[int] = None) -> bool:
+        # 첫 목록 페이지만 넣고, 다음 페이지는 앞 페이지에서 상품이 나왔을 때 이어서 추가
+        return self._insert(CATEGORY_PAGE, f"{category_url}#1", category_url, category_url, 1, max_pages, max_items)
+
+    def _insert(
+        self,
+        kind: str,
+        task_key: str,
+        url: str,
+        category_url: str,
+        page_num: int = 0,
+        max_pages: int = 1,
+        max_items: Optional[int] = None,
+    ) -> bool:
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO tasks (kind, task_key, url, category_url, page_num, max_pages, max_items, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (kind, task_key, url, category_url, page_num, max_pages, max_items or 0, time.time()),
+        )
+        return cursor.rowcount > 0
+
+    def claim(self, owner: str) -> Optional[Task]:
+        # BEGIN IMMEDIATE 로 쓰기 잠금을 먼저 잡아서 두 워커가 같은 작업을 고르지 않게 함.
+        # 상품 작업을 먼저 처리해서 목록 페이지만 잔뜩 펼쳐지지 않도록 함
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 워커가 예외 처리 없이 죽는 작업(OOM, 브라우저 크래시)은 fail() 이 불리지 않으므로
+            # 리스가 만료된 채 시도 횟수를 다 쓴 작업은 여기서 failed 로 정리
+            self.conn.execute(
+                "UPDATE tasks SET state = 'failed', error = COALESCE(error, ?), lease_owner = NULL, lease_expires = 0,"
+                " updated_at = ? WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                ("리스 만료 (워커 비정상 종료)", now, now, self.max_attempts),
+            )
+            row = self.conn.execute(
+                "SELECT * FROM tasks WHERE (state = 'pending'"
+                " OR (state = 'leased' AND lease_expires < ? AND attempts < ?))"
+                " ORDER BY kind = ? DESC, id LIMIT 1",
+                (now, self.max_attempts, PRODUCT),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE tasks SET state = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1,"
+                " updated_at = ? WHERE id = ?",
+                (owner, now + self.lease_seconds, now, row["id"]),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        task = Task(row)
+        task.attempts += 1
+        return task
+
+    def extend(self, owner: str, task_ids: List[int]) -> None:
+        if not task_ids:
+            return
+        marks = ",".join("?" * len(task_ids))
+        self.conn.execute(
+            f"UPDATE tasks SET lease_expires = ? WHERE state = 'leased' AND lease_owner = ? AND id IN ({marks})",
+            (time.time() + self.lease_seconds, owner, *task_ids),
+        )
+
+    def complete(self, task: Task, owner: str, title: str = "", result: str = "") -> bool:
+        # 리스를 잃은 뒤(만료 후 다른 워커가 가져감)의 완료 기록은 무시됨
+        cursor = self.conn.execute(
+            "UPDATE tasks SET state = 'done', title = ?, result = ?, error = NULL, lease_owner = NULL, updated_at = ?"
+            " WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (title, result, time.time(), task.id, owner),
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, task: Task, owner: str, error: str) -> None:
+        # 시도 횟수가 남아 있으면 다시 대기 상태로, 아니면 failed 로 확정
+        state = "failed" if task.attempts >= self.max_attempts else "pending"
+        self.conn.execute(
+            "UPDATE tasks SET state = ?, error = ?, lease_owner = NULL, lease_expires = 0, updated_at = ?"
+            " WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (state, error[:1000], time.time(), task.id, owner),
+        )
+
+    def add_products(self, category_url: str, links: List[str]) -> int:
+        added = 0
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for link in links:
+                added += self._insert(PRODUCT, canonical_product_key(link), link, category_url)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def add_failures(self, entries: List[Dict[str, object]]) -> int:
+        # crawl_category 의 실패 파일(JSONL) 항목을 다시 작업으로. 목록 페이지는 그 페이지 하나만,
+        # 이미 failed 로 끝난 같은 작업이 있으면 시도 횟수를 초기화해서 다시 대기 상태로
+        added = 0
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for entry in entries:
+                category_url = str(entry.get("category_url", ""))
+                if entry.get("kind") == "list":
+                    page_num = int(entry.get("page_num", 1))
+                    kind, key = CATEGORY_PAGE, f"{category_url}#{page_num}"
+                    inserted = self._insert(kind, key, category_url, category_url, page_num, page_num)
+                else:
+                    url = str(entry["url"])
+                    kind, key = PRODUCT, canonical_product_key(url)
+                    inserted = self._insert(kind, key, url, category_url)
+                if not inserted:
+                    inserted = self.conn.execute(
+                        "UPDATE tasks SET state = 'pending', attempts = 0, error = NULL, updated_at = ?"
+                        " WHERE kind = ? AND task_key = ? AND state = 'failed'",
+                        (time.time(), kind, key),
+                    ).rowcount > 0
+                added += inserted
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def add_next_page(self, task: Task) -> bool:
+        page_num = task.page_num + 1
+        if page_num > task.max_pages:
+            return False
+        return self._insert(
+            CATEGORY_PAGE,
+            f"{task.category_url}#{page_num}",
+            task.category_url,
+            task.category_url,
+            page_num,
+            task.max_pages,
+            task.max_items,
+        )
+
+    def has_unfinished(self) -> bool:
+        row = self.conn.execute("SELECT 1 FROM tasks WHERE state IN ('pending', 'leased') LIMIT 1").fetchone()
+        return row is not None
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        result: Dict[str, Dict[str, int]] = {}
+        for row in self.conn.execute("SELECT kind, state, COUNT(*) AS n FROM tasks GROUP BY kind, state"):
+            result.setdefault(row["kind"], {})[row["state"]] = row["n"]
+        return result
+
+    def done_products(self, category_url: Optional[str] = None):
+        query = "SELECT title, url, result FROM tasks WHERE kind = ? AND state = 'done'"
+        params: List[object] = [PRODUCT]
+        if category_url:
+            query += " AND category_url = ?"
+            params.append(category_url)
+        return self.conn.execute(query + " ORDER BY id", params)
+
+
+class Heartbeat:
+    # 처리 중인 작업의 리스를 주기적으로 연장 (긴 상세 페이지 처리 중에 리스가 만료되지 않도록)
+    # SQLite 연결은 스레드 간에 공유할 수 없으므로 별도 연결을 사용
+    def __init__(self, db_path: str, owner: str, lease_seconds: float) -> None:
+        self.queue = JobQueue(db_path, lease_seconds)
+        self.owner = owner
+        self.interval = max(1.0, lease_seconds / 3)
+        self._task_ids: List[int] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def track(self, task_id: int) -> None:
+        with self._lock:
+            self._task_ids.append(task_id)
+
+    def untrack(self, task_id: int) -> None:
+        with self._lock:
+            if task_id in self._task_ids:
+                self._task_ids.remove(task_id)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                task_ids = list(self._task_ids)
+            try:
+                self.queue.extend(self.owner, task_ids)
+            except sqlite3.Error as e:
+                print(f"  경고: 리스 연장 실패 - {e}")
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.queue.close()
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def run_worker(
+    db_path: str,
+    headless: bool = True,
+    base_delay_ms: int = 600,
+    extract_engine: str = "js",
+    wait_mode: str = "fixed",
+    list_mode: str = "xhr",
+    lease_seconds: float = 120,
+    max_attempts: int = 3,
+    poll_seconds: float = 5,
+    block_resources: bool = False,
+    metrics_jsonl: Optional[str] = None,
+) -> None:
+    # 큐가 빌 때까지 작업을 가져와 처리. 다른 워커가 처리 중인 작업이 남아 있으면
+    # (새 작업이 생기거나 리스가 만료될 수 있으므로) 잠시 기다렸다가 다시 확인
+    from danawa_pagination import ListPager
+    from danawa_pool import BrowserSession, PagePool
+
+    owner = worker_id()
+    queue = JobQueue(db_path, lease_seconds, max_attempts)
+    router = None
+    if block_resources:
+        from danawa_routing import RequestRouter, load_routing_profiles
+
+        router = RequestRouter(load_routing_profiles())
+
+    limiter = PolitenessLimiter(base_delay_ms)
+    pager: Optional[ListPager] = None
+    processed = 0
+    # 여러 워커 프로세스가 같은 JSONL 파일에 한 줄씩 이어 씀
+    metrics = danawa_metrics.CrawlMetrics(metrics_jsonl)
+    print(f"[{owner}] 워커 시작")
+    with danawa_metrics.activate(metrics), BrowserSession(headless) as session, PagePool(
+        session.browser, router=router
+    ) as pool, Heartbeat(db_path, owner, lease_seconds) as heartbeat:
+        while True:
+            task = queue.claim(owner)
+            if task is None:
+                if not queue.has_unfinished():
+                    break
+                time.sleep(poll_seconds)
+                continue
+
+            heartbeat.track(task.id)
+            if task.attempts > 1:
+                danawa_metrics.count("retries")
+            try:
+                with danawa_metrics.item("list" if task.kind == CATEGORY_PAGE else "product", task.url):
+                    try:
+                        limiter.wait()
+                        if task.kind == CATEGORY_PAGE:
+                            if pager is None or pager.category_url != task.category_url:
+                                # 같은 카테고리의 다음 페이지는 열어 둔 목록 페이지와 캡처한 XHR 템플릿을 재사용
+                                if pager is not None:
+                                    pool.release(pager.page)
+                                    pager = None
+                                page = pool.acquire()
+                                page.set_default_timeout(10000)
+                                if router is not None:
+                                    router.assign(page, "category")
+                                page.goto(task.category_url)
+                                # crawl_category 와 같이 목록이 렌더링될 때까지 기다린 뒤 DOM/XHR 템플릿을 읽음
+                                wait_for_network_idle(page)
+                                slow_scroll(page)
+                                pager = ListPager(page, task.category_url, task.max_items, mode=list_mode)
+                            links = pager.links_for_page(task.page_num)
+                            added = queue.add_products(task.category_url, links)
+                            if links:
+                                queue.add_next_page(task)
+                            queue.complete(task, owner, result=str(len(links)))
+                            print(f"[{owner}] {task.category_url} 페이지 {task.page_num}: 링크 {len(links)}개 (신규 {added}개)")
+                        else:
+                            row = crawl_product_detail(pool, task.url, base_delay_ms, extract_engine, wait_mode=wait_mode)
+                            if queue.complete(task, owner, row["상품명"], row["상세정보"]):
+                                processed += 1
+                                print(f"[{owner}] 완료 ({processed}) {task.url[:80]}")
+                    except Exception as e:
+                        print(f"[{owner}] 오류: {task.url} - {e}")
+                        danawa_metrics.fail_item(e)
+                        queue.fail(task, owner, str(e))
+                        if task.kind == CATEGORY_PAGE and pager is not None:
+                            # 목록 페이지 상태를 믿을 수 없으므로 다음 목록 작업에서 새로 엶
+                            pool.release(pager.page, healthy=False)
+                            pager = None
+            finally:
+                heartbeat.untrack(task.id)
+    queue.close()
+    metrics.close()
+    print(f"[{owner}] 워커 종료: 상품 {processed}개 처리")
+    print(metrics.summary())
+
+
+def run_workers(processes: int, **worker_options) -> None:
+    # 한 머신에서 여러 프로세스로 실행. SQLite WAL 은 같은 호스트의 프로세스끼리만 공유되므로
+    # 여러 머신에서 네트워크 파일시스템의 같은 DB 파일을 가리키면 안 됨
+    if processes <= 1:
+        run_worker(**worker_options)
+        return
+    workers = [multiprocessing.Process(target=run_worker, kwargs=worker_options) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def export_csv(db_path: str, output_csv: str, category_url: Optional[str] = None) -> int:
+    from danawa_output import StreamingCsvWriter
+
+    queue = JobQueue(db_path)
+    writer = StreamingCsvWriter(output_csv, flush_every=500)
+    try:
+        for row in queue.done_products(category_url):
+            writer.write_row({"상품명": row["title"] or "", "URL": row["url"], "상세정보": row["result"] or ""})
+    finally:
+        writer.close()
+        queue.close()
+    return writer.rows_written
+
+
+def print_status(db_path: str) -> None:
+    queue = JobQueue(db_path)
+    for kind, states in sorted(queue.counts().items()):
+        summary = ", ".join(f"{state} {n}" for state, n in sorted(states.items()))
+        print(f"{kind}: {summary}")
+    queue.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Danawa crawl job queue (SQLite)")
+    parser.add_argument("--db", default="danawa_jobs.db", help="SQLite job database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser("enqueue", help="Add categories to the queue")
+    enqueue.add_argument("--category-url", action="append", default=[], help="Category URL (repeatable)")
+    enqueue.add_argument("--category-file", help="Text file with one category URL per line")
+    enqueue.add_argument("--pages", type=int, default=1, help="Max list pages per category")
+    enqueue.add_argument("--items-per-page", type=int, default=0, help="Max items per page (0 for all)")
+    enqueue.add_argument("--failures-file", help="Re-enqueue items from a crawler failures JSONL file")
+
+    worker = sub.add_parser("worker", help="Process tasks until the queue is drained")
+    worker.add_argument("--processes", type=int, default=1, help="Worker processes on this machine")
+    worker.add_argument("--headless", action="store_true", help="Run browser headless")
+    worker.add_argument("--delay-ms", type=int, default=600, help="Base delay between requests per worker")
+    worker.add_argument("--extract-engine", choices=["js", "locator"], default="js")
+    worker.add_argument("--wait-mode", choices=["fixed", "ready"], default="fixed")
+    worker.add_argument("--list-mode", choices=["xhr", "dom"], default="xhr")
+    worker.add_argument("--lease-seconds", type=float, default=120, help="Task lease length (renewed by heartbeat)")
+    worker.add_argument("--max-attempts", type=int, default=3, help="Mark a task failed after N attempts")
+    worker.add_argument("--poll-seconds", type=float, default=5, help="Wait while other workers hold the last tasks")
+    worker.add_argument("--block-resources", action="store_true")
+    worker.add_argument("--metrics-jsonl", help="Append per-task stage timings as JSONL (shared by all workers)")
+
+    export = sub.add_parser("export", help="Write finished products to CSV")
+    export.add_argument("--output", default="danawa_output.csv", help="Output CSV filepath")
+    export.add_argument("--category-url", help="Only export this category")
+
+    sub.add_parser("status", help="Show task counts by kind and state")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == "enqueue":
+        urls = list(args.category_url)
+        if args.category_file:
+            with open(args.category_file, encoding="utf-8") as f:
+                urls.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+        queue = JobQueue(args.db)
+        added = sum(queue.enqueue_category(url, args.pages, args.items_per_page or None) for url in urls)
+        if urls:
+            print(f"{added}개 카테고리 추가 (중복 {len(urls) - added}개 무시)")
+        if args.failures_file:
+            with open(args.failures_file, encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            requeued = queue.add_failures(entries)
+            print(f"실패 항목 {requeued}개 다시 추가 (전체 {len(entries)}개, 중복/진행 중 {len(entries) - requeued}개 무시)")
+        queue.close()
+    elif args.command == "worker":
+        run_workers(
+            max(1, args.processes),
+            db_path=args.db,
+            headless=args.headless,
+            base_delay_ms=args.delay_ms,
+            extract_engine=args.extract_engine,
+            wait_mode=args.wait_mode,
+            list_mode=args.list_mode,
+            lease_seconds=args.lease_seconds,
+            max_attempts=args.max_attempts,
+            poll_seconds=args.poll_seconds,
+            block_resources=args.block_resources,
+            metrics_jsonl=args.metrics_jsonl,
+        )
+    elif args.command == "export":
+        rows = export_csv(args.db, args.output, args.category_url)
+        print(f"완료! {rows}개 행 저장: {args.output}")
+    else:
+        print_status(args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+# 페이지에서 받은 바이트 (문서 + 리소스 transferSize, 캐시 적중은 0)
+PAGE_BYTES_JS = """
+() => performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+    .reduce((total, entry) => total + (entry.transferSize || 0), 0)
+"""
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# 현재 실행의 측정기와 처리 중인 항목. ContextVar 라서 asyncio 워커(태스크)마다 항목이 섞이지 않음
+_metrics: ContextVar[Optional["CrawlMetrics"]] = ContextVar("danawa_metrics", default=None)
+_item: ContextVar[Optional["ItemRecord"]] = ContextVar("danawa_metrics_item", default=None)
+_stage: ContextVar[Optional[str]] = ContextVar("danawa_metrics_stage", default=None)
+
+
+class ItemRecord:
+    def __init__(self, kind: str, key: str) -> None:
+        self.kind = kind
+        self.key = key
+        self.ok = True
+        self.error: Optional[str] = None
+        self.stages: Dict[str, float] = {}
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self.total_ms = 0.0
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "kind": self.kind,
+            "key": self.key,
+            "ok": self.ok,
+            "error": self.error,
+            "total_ms": round(self.total_ms, 1),
+            "stages_ms": {name: round(ms, 1) for name, ms in self.stages.items()},
+            "bytes": self.bytes,
+        }
+
+
+def _quantile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CrawlMetrics:
+    # 단계별 소요 시간(ms), 항목별 기록, 카운터(실패/재시도/선택자 fallback 등)와 전송 바이트
+    # 단계는 바깥쪽만 기록 (slow_scroll 안의 human_delay 는 scroll 로 집계)해서 합이 실제 시간과 맞도록 함
+    def __init__(self, jsonl_path: Optional[str] = None, prom_path: Optional[str] = None) -> None:
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.stage_samples: Dict[str, List[float]] = {}
+        self.item_samples: Dict[str, List[float]] = {}
+        self.items: Dict[str, Dict[str, int]] = {}
+        self.counters: Dict[str, int] = {}
+        self.total_bytes = 0
+        self.started = time.perf_counter()
+        self._jsonl = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+
+    def add_stage(self, name: str, ms: float) -> None:
+        self.stage_samples.setdefault(name, []).append(ms)
+
+    def add_item(self, record: ItemRecord) -> None:
+        bucket = self.items.setdefault(record.kind, {"ok": 0, "failed": 0})
+        bucket["ok" if record.ok else "failed"] += 1
+        self.item_samples.setdefault(record.kind, []).append(record.total_ms)
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps(record.as_dict(), ensure_ascii=False) + "\n")
+            self._jsonl.flush()
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def elapsed_seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    def items_per_minute(self, kind: str = "product") -> float:
+        elapsed = self.elapsed_seconds()
+        ok = self.items.get(kind, {}).get("ok", 0)
+        return ok / elapsed * 60 if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"성능 요약: {self.elapsed_seconds():.1f}s, 상품 {self.items_per_minute():.1f}개/분, "
+            f"수신 {self.total_bytes / (1024 * 1024):.1f} MB"
+        ]
+        for kind, bucket in sorted(self.items.items()):
+            samples = self.item_samples.get(kind, [])
+            lines.append(
+                f"  항목[{kind}] 성공 {bucket['ok']} / 실패 {bucket['failed']}, "
+                f"p50 {_quantile(samples, 0.5):.0f}ms p95 {_quantile(samples, 0.95):.0f}ms p99 {_quantile(samples, 0.99):.0f}ms"
+            )
+        for name, samples in sorted(self.stage_samples.items(), key=lambda item: -sum(item[1])):
+            lines.append(
+                f"  {name:<12} {len(samples):>6}회 합계 {sum(samples) / 1000:>8.1f}s "
+                f"p50 {_quantile(samples, 0.5):>7.0f}ms p95 {_quantile(samples, 0.95):>7.0f}ms "
+                f"p99 {_quantile(samples, 0.99):>7.0f}ms"
+            )
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"  {name}: {value}")
+        return "\n".join(lines)
+
+    def prometheus_text(self) -> str:
+        lines = ["# TYPE danawa_stage_seconds summary"]
+        for name, samples in sorted(self.stage_samples.items()):
+            for q in QUANTILES:
+                lines.append(f'danawa_stage_seconds{{stage="{name}",quantile="{q}"}} {_quantile(samples, q) / 1000:.6f}')
+            lines.append(f'danawa_stage_seconds_sum{{stage="{name}"}} {sum(samples) / 1000:.6f}')
+            lines.append(f'danawa_stage_seconds_count{{stage="{name}"}} {len(samples)}')
+        lines.append("# TYPE danawa_item_seconds summary")
+        for kind, samples in sorted(self.item_samples.items()):
+            for q in QUANTILES:
+                lines.append(f'danawa_item_seconds{{kind="{kind}",quantile="{q}"}} {_quantile(samples, q) / 1000:.6f}')
+            lines.append(f'danawa_item_seconds_sum{{kind="{kind}"}} {sum(samples) / 1000:.6f}')
+            lines.append(f'danawa_item_seconds_count{{kind="{kind}"}} {len(samples)}')
+        lines.append("# TYPE danawa_items_total counter")
+        for kind, bucket in sorted(self.items.items()):
+            for result, value in sorted(bucket.items()):
+                lines.append(f'danawa_items_total{{kind="{kind}",result="{result}"}} {value}')
+        lines.append("# TYPE danawa_events_total counter")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'danawa_events_total{{event="{name}"}} {value}')
+        lines.append("# TYPE danawa_received_bytes_total counter")
+        lines.append(f"danawa_received_bytes_total {self.total_bytes}")
+        lines.append("# TYPE danawa_items_per_minute gauge")
+        lines.append(f"danawa_items_per_minute {self.items_per_minute():.3f}")
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+        if self.prom_path:
+            with open(self.prom_path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(self.prom_path + ".tmp", self.prom_path)
+
+
+@contextmanager
+def activate(metrics: CrawlMetrics) -> Iterator[CrawlMetrics]:
+    token = _metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _metrics.reset(token)
+
+
+def enabled() -> bool:
+    return _metrics.get() is not None
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    # 동기/비동기 함수 모두에서 with 로 사용 (await 를 감싸도 됨). 측정기가 없으면 아무것도 하지 않음
+    metrics = _metrics.get()
+    if metrics is None or _stage.get() is not None:
+        yield
+        return
+    token = _stage.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - started) * 1000
+        _stage.reset(token)
+        metrics.add_stage(name, ms)
+        record = _item.get()
+        if record is not None:
+            record.stages[name] = record.stages.get(name, 0.0) + ms
+
+
+@contextmanager
+def item(kind: str, key: str) -> Iterator[Optional[ItemRecord]]:
+    # 상품/목록 페이지 하나의 처리. 예외로 빠져나가면 실패로 기록
+    metrics = _metrics.get()
+    if metrics is None:
+        yield None
+        return
+    record = ItemRecord(kind, key)
+    token = _item.set(record)
+    try:
+        yield record
+    except BaseException as e:
+        record.ok = False
+        record.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _item.reset(token)
+        record.total_ms = (time.perf_counter() - record.started) * 1000
+        metrics.add_item(record)
+
+
+def fail_item(error: object) -> None:
+    # 예외를 밖으로 던지지 않고 처리한 실패 (크롤링 루프의 except 블록에서 호출)
+    record = _item.get()
+    if record is not None:
+        record.ok = False
+        record.error = str(error)
+
+
+def count(name: str, n: int = 1) -> None:
+    metrics = _metrics.get()
+    if metrics is not None:
+        metrics.count(name, n)
+
+
+def add_bytes(size: int) -> None:
+    metrics = _metrics.get()
+    if metrics is None:
+        return
+    metrics.total_bytes += size
+    record = _item.get()
+    if record is not None:
+        record.bytes += size
@@ -0,0 +1,341 @@
+import csv
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+from danawa_crawler import SPEC_PAIRS, canonical_product_key
+
+FIELDNAMES = ["상품명", "URL", "상세정보"]
+LONG_FIELDNAMES = ["상품명", "URL", "키", "값"]
+
+
+class StreamingCsvWriter:
+    # 행을 완료되는 즉시 파일에 쓰고 flush_every 행마다 디스크로 내보냄 (메모리에 쌓지 않음)
+    def __init__(self, path: str, fieldnames: List[str] = FIELDNAMES, append: bool = False, flush_every: int = 10) -> None:
+        self.path = path
+        self.fieldnames = fieldnames
+        self.flush_every = max(1, flush_every)
+        self.rows_written = 0
+        self._unflushed = 0
+        has_content = append and os.path.exists(path) and os.path.getsize(path) > 0
+        # utf-8-sig 는 파일 중간에 이어 쓸 때 BOM 을 다시 쓰지 않음
+        self._file = open(path, "a" if append else "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames)
+        if not has_content:
+            self._writer.writeheader()
+
+    def _lines(self, row: Dict[str, object]) -> Iterable[Dict[str, object]]:
+        return [{key: row.get(key, "") for key in self.fieldnames}]
+
+    def write_row(self, row: Dict[str, object]) -> bool:
+        # rows_written 은 상품 수 (긴 형식에서 한 상품이 여러 줄이어도 1)
+        self._writer.writerows(self._lines(row))
+        self.rows_written += 1
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+            return True
+        return False
+
+    def flush(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unflushed = 0
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class LongCsvWriter(StreamingCsvWriter):
+    # 긴 형식: 정리된 (키, 값) 한 쌍당 한 줄 (상품명, URL, 키, 값)
+    def __init__(self, path: str, append: bool = False, flush_every: int = 10) -> None:
+        super().__init__(path, LONG_FIELDNAMES, append, flush_every)
+
+    def _lines(self, row: Dict[str, object]) -> Iterable[Dict[str, object]]:
+        return [
+            {"상품명": row.get("상품명", ""), "URL": row.get("URL", ""), "키": key, "값": value}
+            for key, value in row.get(SPEC_PAIRS, [])
+        ]
+
+
+class ParquetWriter:
+    # 열 형식 출력 (pyarrow). layout: detail(상품명, URL, 상세정보) / long(상품명, URL, 키, 값) / wide(스펙 키마다 열)
+    # flush 때마다 모인 행을 완결된 부분 파일(<path>.parts/)로 쓰므로 체크포인트와 어긋나지 않고,
+    # close 에서 부분 파일을 차례로 읽어 row_group_size 행씩 row group 으로 하나의 파일에 합침 (메모리는 row group 몇 개 분량)
+    # 반복이 많은 열(긴 형식의 상품명/URL/키/값, 넓은 형식의 스펙 열)은 dictionary 인코딩 (pandas 에서는 category)
+    def __init__(
+        self,
+        path: str,
+        layout: str = "detail",
+        append: bool = False,
+        flush_every: int = 1000,
+        row_group_size: int = 10000,
+    ) -> None:
+        import pyarrow  # noqa: F401 (없으면 여기서 바로 실패)
+
+        self.path = path
+        self.layout = layout
+        self.flush_every = max(1, flush_every)
+        self.row_group_size = max(1, row_group_size)
+        self.rows_written = 0
+        self.parts_dir = f"{path}.parts"
+        self._buffer: List[Dict[str, object]] = []
+        self._closed = False
+        os.makedirs(self.parts_dir, exist_ok=True)
+        if not append:
+            for name in self._part_names():
+                os.remove(os.path.join(self.parts_dir, name))
+        elif os.path.exists(path):
+            # 재개: 지난 실행에서 합친 파일을 첫 부분 파일로 돌려놓고 그 뒤에 이어서 씀
+            os.replace(path, self._next_part_path())
+
+    def _part_names(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.parts_dir) if name.endswith(".parquet"))
+
+    def _next_part_path(self) -> str:
+        names = self._part_names()
+        index = int(names[-1].split(".")[0]) + 1 if names else 0
+        return os.path.join(self.parts_dir, f"{index:08d}.parquet")
+
+    def _records(self, row: Dict[str, object]) -> List[Dict[str, object]]:
+        base = {"상품명": row.get("상품명", ""), "URL": row.get("URL", "")}
+        pairs = row.get(SPEC_PAIRS, [])
+        if self.layout == "long":
+            return [dict(base, 키=key, 값=value) for key, value in pairs]
+        if self.layout == "wide":
+            record = dict(base)
+            for key, value in pairs:
+                if key in base:
+                    key = f"스펙:{key}"
+                # 체크 표시 카테고리와 일반 키가 겹치면 값을 이어 붙임
+                record[key] = f"{record[key]},{value}" if key in record else value
+            return [record]
+        return [dict(base, 상세정보=row.get("상세정보", ""))]
+
+    def write_row(self, row: Dict[str, object]) -> bool:
+        self._buffer.extend(self._records(row))
+        self.rows_written += 1
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+            return True
+        return False
+
+    def flush(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._buffer:
+            return
+        # 넓은 형식은 행마다 키가 다르므로 버퍼 전체의 열 합집합으로 (from_pylist 는 첫 행의 키만 봄)
+        names: Dict[str, None] = {}
+        for record in self._buffer:
+            names.update(dict.fromkeys(record))
+        table = pa.table({name: pa.array([record.get(name) for record in self._buffer], pa.string()) for name in names})
+        part_path = self._next_part_path()
+        pq.write_table(table, part_path + ".tmp")
+        os.replace(part_path + ".tmp", part_path)
+        self._buffer = []
+
+    def _field(self, name: str):
+        import pyarrow as pa
+
+        if name == "상세정보" or (self.layout == "wide" and name in ("상품명", "URL")):
+            return pa.field(name, pa.string())
+        return pa.field(name, pa.dictionary(pa.int32(), pa.string()))
+
+    def _conform(self, table, schema):
+        # 부분 파일마다 열이 다를 수 있으므로(넓은 형식) 전체 스키마에 맞춰 없는 열은 null 로 채움
+        import pyarrow as pa
+
+        columns = []
+        for field in schema:
+            if field.name in table.column_names:
+                column = table.column(field.name).cast(pa.string())
+                columns.append(column.dictionary_encode() if pa.types.is_dictionary(field.type) else column)
+            else:
+                columns.append(pa.nulls(table.num_rows, field.type))
+        return pa.Table.from_arrays(columns, schema=schema)
+
+    def close(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        parts = [os.path.join(self.parts_dir, name) for name in self._part_names()]
+        names = {"long": list(LONG_FIELDNAMES), "wide": ["상품명", "URL"]}.get(self.layout, list(FIELDNAMES))
+        for part in parts:
+            names.extend(name for name in pq.read_schema(part).names if name not in names)
+        schema = pa.schema([self._field(name) for name in names])
+        with pq.ParquetWriter(self.path + ".tmp", schema) as writer:
+            pending = []
+            pending_rows = 0
+            for part in parts:
+                table = self._conform(pq.read_table(part), schema)
+                pending.append(table)
+                pending_rows += table.num_rows
+                if pending_rows >= self.row_group_size:
+                    combined = pa.concat_tables(pending)
+                    cut = pending_rows // self.row_group_size * self.row_group_size
+                    writer.write_table(combined.slice(0, cut), row_group_size=self.row_group_size)
+                    pending = [combined.slice(cut)]
+                    pending_rows -= cut
+            if pending_rows:
+                writer.write_table(pa.concat_tables(pending), row_group_size=self.row_group_size)
+        os.replace(self.path + ".tmp", self.path)
+        for part in parts:
+            os.remove(part)
+        os.rmdir(self.parts_dir)
+
+
+def open_row_writer(
+    path: str,
+    layout: str = "detail",
+    output_format: str = "csv",
+    append: bool = False,
+    flush_every: int = 10,
+    row_group_size: int = 10000,
+):
+    # layout: detail(상세정보 문자열) / long / wide(parquet 만), output_format: csv / parquet
+    if output_format == "parquet":
+        return ParquetWriter(path, layout, append, max(flush_every, 1000), row_group_size)
+    if layout == "wide":
+        raise ValueError("넓은 형식은 parquet 출력에서만 지원합니다")
+    if layout == "long":
+        return LongCsvWriter(path, append=append, flush_every=flush_every)
+    return StreamingCsvWriter(path, append=append, flush_every=flush_every)
+
+
+class Checkpoint:
+    # 현재 목록 페이지 번호와 그 페이지에서 끝난 상품 키만 기록하므로 크롤링 규모와 무관하게 작음
+    # (이전 페이지는 전부 끝난 것이므로 페이지를 넘길 때 완료 목록을 비움)
+    def __init__(self, path: str, category_url: str) -> None:
+        self.path = path
+        self.category_url = category_url
+        self.page_index = 0
+        self.completed: Set[str] = set()
+        self.rows_written = 0
+        self.finished = False
+
+    @classmethod
+    def load(cls, path: str, category_url: str) -> "Checkpoint":
+        checkpoint = cls(path, category_url)
+        if not os.path.exists(path):
+            return checkpoint
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("category_url") != category_url:
+            raise ValueError(f"체크포인트의 카테고리가 다릅니다: {state.get('category_url')}")
+        checkpoint.page_index = int(state.get("page_index", 0))
+        checkpoint.completed = set(state.get("completed", []))
+        checkpoint.rows_written = int(state.get("rows_written", 0))
+        checkpoint.finished = bool(state.get("finished", False))
+        return checkpoint
+
+    def is_done(self, url: str) -> bool:
+        return canonical_product_key(url) in self.completed
+
+    def mark_done(self, url: str) -> None:
+        self.completed.add(canonical_product_key(url))
+        self.rows_written += 1
+
+    def set_page(self, page_index: int, keep: Iterable[str] = ()) -> None:
+        # keep: 새 페이지 이후에 나온 링크 (파이프라인에서 이미 끝난 뒤쪽 페이지 상품은 완료 목록에 남김)
+        if page_index != self.page_index:
+            self.page_index = page_index
+            keep_keys = {canonical_product_key(url) for url in keep}
+            self.completed = {key for key in self.completed if key in keep_keys}
+
+    def save(self) -> None:
+        state = {
+            "category_url": self.category_url,
+            "page_index": self.page_index,
+            "completed": sorted(self.completed),
+            "rows_written": self.rows_written,
+            "finished": self.finished,
+        }
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(self.path + ".tmp", self.path)
+
+
+class CrawlOutput:
+    # CSV 를 먼저 flush 한 뒤 체크포인트를 저장해서, 재개 시 행이 빠지는 일은 없도록 함
+    # (최악의 경우 마지막 flush 이후 몇 행이 중복될 수 있음)
+    def __init__(self, writer: StreamingCsvWriter, checkpoint: Optional[Checkpoint] = None) -> None:
+        self.writer = writer
+        self.checkpoint = checkpoint
+        # 이번 실행에서 처리한 상품 키 (체크포인트는 페이지를 넘기면 비우므로 여러 페이지에 나온 상품 중복 방지용)
+        self._seen: Set[str] = set()
+        self._closed = False
+
+    @property
+    def start_page(self) -> int:
+        return self.checkpoint.page_index if self.checkpoint is not None else 0
+
+    @property
+    def finished(self) -> bool:
+        return self.checkpoint is not None and self.checkpoint.finished
+
+    @property
+    def rows_written(self) -> int:
+        if self.checkpoint is not None:
+            return self.checkpoint.rows_written
+        return self.writer.rows_written
+
+    def is_done(self, url: str) -> bool:
+        if canonical_product_key(url) in self._seen:
+            return True
+        return self.checkpoint is not None and self.checkpoint.is_done(url)
+
+    def mark_seen(self, url: str) -> None:
+        self._seen.add(canonical_product_key(url))
+
+    def add(self, row: Dict[str, object]) -> None:
+        self.mark_seen(row["URL"])
+        flushed = self.writer.write_row(row)
+        if self.checkpoint is not None:
+            self.checkpoint.mark_done(row["URL"])
+            if flushed:
+                self.checkpoint.save()
+
+    def set_page(self, page_index: int, keep: Iterable[str] = ()) -> None:
+        self.writer.flush()
+        if self.checkpoint is not None:
+            self.checkpoint.set_page(page_index, keep)
+            self.checkpoint.save()
+
+    def close(self, finished: Optional[bool] = None) -> None:
+        # finished 를 주지 않으면 체크포인트의 기존 값을 유지 (이미 끝난 크롤링을 --resume 해도 미완료로 바뀌지 않음)
+        if self._closed:
+            return
+        self._closed = True
+        self.writer.close()
+        if self.checkpoint is not None:
+            if finished is not None:
+                self.checkpoint.finished = finished
+            self.checkpoint.save()
+
+
+def open_crawl_output(
+    output_csv: str,
+    category_url: str,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = False,
+    flush_every: int = 10,
+    layout: str = "detail",
+    output_format: str = "csv",
+    row_group_size: int = 10000,
+) -> CrawlOutput:
+    checkpoint = None
+    if checkpoint_path:
+        if resume:
+            checkpoint = Checkpoint.load(checkpoint_path, category_url)
+        else:
+            checkpoint = Checkpoint(checkpoint_path, category_url)
+    writer = open_row_writer(output_csv, layout, output_format, resume, flush_every, row_group_size)
+    return CrawlOutput(writer, checkpoint)
@@ -0,0 +1,282 @@
+import asyncio
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import danawa_async
+import danawa_metrics
+from danawa_crawler import (
+    HASMOVE_PAGE_JS,
+    MOVE_PAGE_JS,
+    collect_product_links_from_category,
+    move_to_list_page,
+    paginate_category,
+    slow_scroll,
+)
+from danawa_parse import parse_product_links_from_html
+from danawa_selectors import SelectorMemo
+
+# 템플릿으로 다시 보낼 때 빼는 헤더 (쿠키와 길이는 요청 컨텍스트가 채움)
+_DROP_HEADERS = {"cookie", "content-length", "host"}
+_PAGE_PARAM = re.compile(r"page", re.I)
+
+
+class ListPageError(RuntimeError):
+    # XHR 요청과 DOM 이동이 모두 실패해서 목록 페이지에 가지 못함 (빈 페이지 = 카테고리 끝과 구분, 호출한 쪽에서 재시도)
+    def __init__(self, page_num: int) -> None:
+        super().__init__(f"목록 페이지 {page_num} 이동 실패")
+        self.page_num = page_num
+
+
+class ListRequestTemplate:
+    # movePage(N) 가 보내는 목록 XHR 요청을 한 번 잡아서, 페이지 파라미터만 바꿔 다시 보냄
+    def __init__(self, url: str, method: str, headers: Dict[str, str], post_data: Optional[str], captured_page: int) -> None:
+        self.url = url
+        self.method = method
+        self.headers = {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS}
+        self.post_data = post_data
+        self.in_body, self.page_param = self._find_page_param(captured_page)
+
+    def _find_page_param(self, captured_page: int) -> Tuple[bool, Optional[str]]:
+        # 캡처한 페이지 번호를 값으로 가진 'page' 계열 파라미터를 찾음 (본문 우선, 없으면 쿼리)
+        sources = [(True, self.post_data or ""), (False, urlsplit(self.url).query)]
+        for in_body, query in sources:
+            for key, value in parse_qsl(query, keep_blank_values=True):
+                if _PAGE_PARAM.search(key) and value == str(captured_page):
+                    return in_body, key
+        return True, None
+
+    @property
+    def usable(self) -> bool:
+        return self.page_param is not None
+
+    def _replace(self, query: str, page_num: int) -> str:
+        pairs = [
+            (key, str(page_num) if key == self.page_param else value)
+            for key, value in parse_qsl(query, keep_blank_values=True)
+        ]
+        return urlencode(pairs)
+
+    def render(self, page_num: int) -> Tuple[str, Optional[str]]:
+        if self.in_body:
+            return self.url, self._replace(self.post_data or "", page_num)
+        parts = urlsplit(self.url)
+        return urlunsplit(parts._replace(query=self._replace(parts.query, page_num))), self.post_data
+
+
+def _is_list_request(request, page_num: int) -> bool:
+    if request.resource_type not in ("xhr", "fetch"):
+        return False
+    query = request.post_data or ""
+    if not query:
+        query = urlsplit(request.url).query
+    return any(_PAGE_PARAM.search(k) and v == str(page_num) for k, v in parse_qsl(query))
+
+
+def capture_list_request(page, page_num: int = 2) -> Tuple[Optional[ListRequestTemplate], bool]:
+    # movePage(page_num) 을 실행하면서 나가는 목록 XHR 을 잡음. (템플릿, DOM 이 이동했는지) 반환
+    try:
+        if not page.evaluate(HASMOVE_PAGE_JS):
+            return None, False
+    except Exception:
+        return None, False
+    try:
+        with page.expect_request(lambda r: _is_list_request(r, page_num), timeout=5000) as info:
+            page.evaluate(MOVE_PAGE_JS, page_num)
+        request = info.value
+        response = request.response()
+        body = response.text() if response is not None else ""
+    except Exception as e:
+        print(f"  목록 요청 캡처 실패 - {e}")
+        return None, True
+    template = ListRequestTemplate(request.url, request.method, request.headers, request.post_data, page_num)
+    # 응답에서 상품 링크가 나와야 재사용 가능한 요청으로 판단
+    if not template.usable or not parse_product_links_from_html(body):
+        return None, True
+    return template, True
+
+
+class ListPager:
+    # 목록 페이지 번호 → 상품 링크. 캡처한 XHR 템플릿으로 원하는 페이지를 바로 요청하고,
+    # 실패하면 movePage / 버튼 클릭으로 DOM 을 이동해서 수집
+    def __init__(
+        self,
+        page,
+        category_url: str,
+        max_per_page: Optional[int],
+        mode: str = "xhr",
+        memo: Optional[SelectorMemo] = None,
+    ) -> None:
+        self.page = page
+        self.category_url = category_url
+        self.max_per_page = max_per_page
+        self.mode = mode
+        self.memo = memo
+        self.template: Optional[ListRequestTemplate] = None
+        self._capture_tried = False
+        self._dom_page = 1
+
+    def _ensure_template(self) -> Optional[ListRequestTemplate]:
+        if not self._capture_tried:
+            self._capture_tried = True
+            self.template, moved = capture_list_request(self.page)
+            if moved:
+                self._dom_page = 2
+            if self.template is not None:
+                print(f"  목록 XHR 캡처: {self.template.method} {self.template.url}")
+        return self.template
+
+    def _fetch(self, page_num: int) -> List[str]:
+        url, body = self.template.render(page_num)
+        request = self.page.context.request
+        with danawa_metrics.stage("list_xhr"):
+            if self.template.method.upper() == "POST":
+                response = request.post(url, data=body, headers=self.template.headers)
+            else:
+                response = request.get(url, headers=self.template.headers)
+        if not response.ok:
+            raise RuntimeError(f"HTTP {response.status}")
+        links = parse_product_links_from_html(response.text(), self.max_per_page)
+        return [urljoin(url, link) for link in links]
+
+    def _move_dom(self, page_num: int) -> bool:
+        if page_num == self._dom_page:
+            return True
+        if move_to_list_page(self.page, page_num):
+            self._dom_page = page_num
+            return True
+        # 임의 이동이 안 되면 한 페이지씩 넘김
+        while self._dom_page < page_num:
+            if not paginate_category(self.page, self.category_url, self._dom_page + 1, self.memo):
+                return False
+            self._dom_page += 1
+        return self._dom_page == page_num
+
+    def links_for_page(self, page_num: int) -> List[str]:
+        # 빈 목록은 페이지를 불러왔는데 상품이 없을 때만 (카테고리 끝), 가지 못한 페이지는 ListPageError
+        if self.mode == "xhr" and page_num > 1 and self._ensure_template() is not None:
+            try:
+                return self._fetch(page_num)
+            except Exception as e:
+                print(f"  목록 XHR 요청 실패, DOM 이동으로 전환 - {e}")
+                danawa_metrics.count("fallback.list_dom")
+        if not self._move_dom(page_num):
+            raise ListPageError(page_num)
+        if page_num > 1:
+            slow_scroll(self.page)
+        return collect_product_links_from_category(self.page, self.max_per_page, self.memo)
+
+
+async def capture_list_request_async(page, page_num: int = 2) -> Tuple[Optional[ListRequestTemplate], bool]:
+    try:
+        if not await page.evaluate(HASMOVE_PAGE_JS):
+            return None, False
+    except Exception:
+        return None, False
+    try:
+        async with page.expect_request(lambda r: _is_list_request(r, page_num), timeout=5000) as info:
+            await page.evaluate(MOVE_PAGE_JS, page_num)
+        request = await info.value
+        response = await request.response()
+        body = (await response.text()) if response is not None else ""
+    except Exception as e:
+        print(f"  목록 요청 캡처 실패 - {e}")
+        return None, True
+    template = ListRequestTemplate(request.url, request.method, request.headers, request.post_data, page_num)
+    if not template.usable or not parse_product_links_from_html(body):
+        return None, True
+    return template, True
+
+
+class AsyncListPager:
+    # ListPager 의 비동기 버전. 요청한 페이지부터 prefetch 개 페이지를 병렬로 받아 캐시해 둠
+    def __init__(
+        self,
+        page,
+        category_url: str,
+        max_per_page: Optional[int],
+        mode: str = "xhr",
+        prefetch: int = 4,
+        memo: Optional[SelectorMemo] = None,
+        max_pages: Optional[int] = None,
+    ) -> None:
+        self.page = page
+        self.category_url = category_url
+        self.max_per_page = max_per_page
+        self.mode = mode
+        self.memo = memo
+        self.prefetch = max(1, prefetch)
+        # 미리 받기는 마지막 페이지(max_pages)를 넘지 않음
+        self.max_pages = max_pages
+        self.template: Optional[ListRequestTemplate] = None
+        self._capture_tried = False
+        self._dom_page = 1
+        self._fetched: Dict[int, "asyncio.Task[List[str]]"] = {}
+
+    async def _ensure_template(self) -> Optional[ListRequestTemplate]:
+        if not self._capture_tried:
+            self._capture_tried = True
+            self.template, moved = await capture_list_request_async(self.page)
+            if moved:
+                self._dom_page = 2
+            if self.template is not None:
+                print(f"  목록 XHR 캡처: {self.template.method} {self.template.url}")
+        return self.template
+
+    async def _fetch(self, page_num: int) -> List[str]:
+        url, body = self.template.render(page_num)
+        request = self.page.context.request
+        with danawa_metrics.stage("list_xhr"):
+            if self.template.method.upper() == "POST":
+                response = await request.post(url, data=body, headers=self.template.headers)
+            else:
+                response = await request.get(url, headers=self.template.headers)
+        if not response.ok:
+            raise RuntimeError(f"HTTP {response.status}")
+        links = parse_product_links_from_html(await response.text(), self.max_per_page)
+        return [urljoin(url, link) for link in links]
+
+    async def fetch_pages(self, page_nums: List[int]) -> Dict[int, List[str]]:
+        # 여러 목록 페이지를 동시에 요청
+        for page_num in page_nums:
+            if page_num not in self._fetched:
+                self._fetched[page_num] = asyncio.ensure_future(self._fetch(page_num))
+        results = await asyncio.gather(*(self._fetched[n] for n in page_nums), return_exceptions=True)
+        fetched: Dict[int, List[str]] = {}
+        for page_num, result in zip(page_nums, results):
+            if isinstance(result, BaseException):
+                # 실패한 요청은 남겨 두지 않아서 나중에 (재시도 등으로) 다시 요청할 때 새로 받음
+                self._fetched.pop(page_num, None)
+            else:
+                fetched[page_num] = result
+        return fetched
+
+    async def _move_dom(self, page_num: int) -> bool:
+        if page_num == self._dom_page:
+            return True
+        if await danawa_async.move_to_list_page(self.page, page_num):
+            self._dom_page = page_num
+            return True
+        while self._dom_page < page_num:
+            if not await danawa_async.paginate_category(self.page, self.category_url, self._dom_page + 1, self.memo):
+                return False
+            self._dom_page += 1
+        return self._dom_page == page_num
+
+    async def links_for_page(self, page_num: int) -> List[str]:
+        if self.mode == "xhr" and page_num > 1 and await self._ensure_template() is not None:
+            last_page = page_num + self.prefetch - 1
+            if self.max_pages:
+                last_page = min(last_page, self.max_pages)
+            fetched = await self.fetch_pages(list(range(page_num, max(last_page, page_num) + 1)))
+            if page_num in fetched:
+                # 쓴 페이지는 캐시에서 빼서 같은 페이지를 다시 요청하면 새로 받음
+                self._fetched.pop(page_num, None)
+                return fetched[page_num]
+            print(f"  목록 XHR 요청 실패, DOM 이동으로 전환 (페이지 {page_num})")
+            danawa_metrics.count("fallback.list_dom")
+        if not await self._move_dom(page_num):
+            raise ListPageError(page_num)
+        if page_num > 1:
+            await danawa_async.slow_scroll(self.page)
+        return await danawa_async.collect_product_links_from_category(self.page, self.max_per_page, self.memo)
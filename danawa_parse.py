@@ -0,0 +1,205 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from cssselect import HTMLTranslator
+from lxml import etree, html as lxml_html
+
+from danawa_clean import detail_pairs
+from danawa_crawler import (
+    DETAIL_AREA_SELECTOR,
+    PRODUCT_LINK_SELECTORS,
+    SPEC_CONTAINER_SELECTORS,
+    SPEC_FALLBACK_SELECTORS,
+    canonical_product_key,
+    is_product_link,
+    strip_link_text,
+)
+
+
+# innerText 근사: 블록 요소 경계는 줄바꿈, 숨김/스크립트 요소는 제외
+_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "caption", "dd", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5",
+    "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table",
+    "tbody", "tfoot", "thead", "tr", "ul",
+}
+_SKIP_TAGS = {"script", "style", "noscript", "template", "head"}
+_CELL_TAGS = {"td", "th"}
+_SPACES = re.compile(r"[ \t\r\f\v]+")
+_HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.I)
+
+_translator = HTMLTranslator()
+
+
+def _css(selector: str) -> etree.XPath:
+    # Playwright locator 와 같이 자기 자신은 제외하고 자손만 검색
+    return etree.XPath(_translator.css_to_xpath(selector, prefix="descendant::"))
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_CONTAINER_XPATHS = [(selector, _css(selector)) for selector in SPEC_CONTAINER_SELECTORS + SPEC_FALLBACK_SELECTORS]
+_DL = etree.XPath("descendant::dl")
+_DT = etree.XPath("descendant::dt")
+_DD = etree.XPath("descendant::dd")
+_TR = etree.XPath("descendant::tr")
+_TH = etree.XPath("descendant::th")
+_TD = etree.XPath("descendant::td")
+_TABLE = etree.XPath("descendant::table")
+_DETAIL_AREAS = _css(DETAIL_AREA_SELECTOR)
+# div:has(> .key), li:has(> .key), div:has(> .spec_key) — cssselect 는 :has 를 지원하지 않아 직접 작성
+_KV_ROWS = etree.XPath(
+    f"descendant::*[(self::div or self::li) and *[{_has_class('key')}]]"
+    f" | descendant::div[*[{_has_class('spec_key')}]]"
+)
+_KV_KEY = _css(".key, .spec_key")
+_KV_VALUE = _css(".value, .spec_value")
+_PRODUCT_LINKS = [_css(selector) for selector in PRODUCT_LINK_SELECTORS]
+
+
+def _is_hidden(node: etree._Element) -> bool:
+    if node.get("hidden") is not None:
+        return True
+    style = node.get("style")
+    return bool(style and _HIDDEN_STYLE.search(style))
+
+
+def _walk_text(node: etree._Element, parts: List[str]) -> None:
+    for child in node:
+        tag = child.tag.lower() if isinstance(child.tag, str) else ""
+        if tag and tag not in _SKIP_TAGS and not _is_hidden(child):
+            if tag == "br":
+                parts.append("\n")
+            else:
+                block = tag in _BLOCK_TAGS
+                if block:
+                    parts.append("\n")
+                if child.text:
+                    parts.append(child.text)
+                _walk_text(child, parts)
+                if block:
+                    parts.append("\n")
+                elif tag in _CELL_TAGS:
+                    parts.append("\t")
+        if child.tail:
+            parts.append(child.tail)
+
+
+def inner_text(node: Optional[etree._Element]) -> str:
+    if node is None:
+        return ""
+    parts: List[str] = [node.text or ""]
+    _walk_text(node, parts)
+    lines = (_SPACES.sub(" ", line).strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line).strip()
+
+
+def _first(nodes: List[etree._Element]) -> Optional[etree._Element]:
+    return nodes[0] if nodes else None
+
+
+def extract_specs_from_tree(root: etree._Element) -> Tuple[Dict[str, str], Optional[str]]:
+    # extract_specs_from_detail / EXTRACT_SPECS_JS 와 같은 우선순위 규칙
+    specs: Dict[str, str] = {}
+
+    container = None
+    matched = None
+    for selector, xpath in _CONTAINER_XPATHS:
+        found = xpath(root)
+        if found:
+            container = found[0]
+            matched = selector
+            break
+    if container is None:
+        container = _first(root.xpath("//body"))
+    if container is None:
+        container = root
+
+    # dl/dt/dd 패턴 처리
+    for dl in _DL(container):
+        dts = _DT(dl)
+        dds = _DD(dl)
+        for i in range(min(len(dts), len(dds))):
+            key = inner_text(dts[i])
+            value = inner_text(dds[i])
+            if key and key not in specs:
+                specs[key] = value
+
+    # 표 형태 (tr/th/td) 처리
+    for tr in _TR(container):
+        th = _first(_TH(tr))
+        td = _first(_TD(tr))
+        if th is not None and td is not None:
+            key = inner_text(th)
+            value = inner_text(td).split("인증번호 확인")[0].strip()
+            if key and value and key not in specs:
+                specs[key] = value
+
+    # div.key / div.value 패턴
+    for row in _KV_ROWS(container):
+        key_elem = _first(_KV_KEY(row))
+        value_elem = _first(_KV_VALUE(row))
+        if key_elem is not None and value_elem is not None:
+            key = inner_text(key_elem)
+            if key and key not in specs:
+                specs[key] = inner_text(value_elem)
+
+    # 전역 table 과 상세 영역의 tr
+    for group in _TABLE(root) + _DETAIL_AREAS(root):
+        for tr in _TR(group):
+            th = _first(_TH(tr))
+            td = _first(_TD(tr))
+            if th is not None and td is not None:
+                key = inner_text(th)
+                value = strip_link_text(inner_text(td))
+                if key and key not in specs and value:
+                    specs[key] = value
+
+    return specs, matched
+
+
+def parse_specs_from_html(page_html: str) -> Dict[str, str]:
+    if not page_html.strip():
+        return {}
+    specs, _ = extract_specs_from_tree(lxml_html.document_fromstring(page_html))
+    return specs
+
+
+def parse_server_html(page_html: str) -> Tuple[str, Dict[str, str], Optional[str]]:
+    # HTTP 로 받은 (렌더링 전) HTML: (제목, 스펙, 찾은 컨테이너 선택자). 컨테이너가 없으면 None
+    if not page_html.strip():
+        return "", {}, None
+    root = lxml_html.document_fromstring(page_html)
+    title = inner_text(_first(root.xpath("//title")))
+    specs, matched = extract_specs_from_tree(root)
+    return title, specs, matched
+
+
+def parse_detail_pairs(page_html: str) -> List[Tuple[str, str]]:
+    # ProcessPoolExecutor 에서 실행되는 파싱 단계: HTML → 정리된 (키, 값) 목록 (상세정보 문자열과 긴/넓은 형식 출력용)
+    return detail_pairs(parse_specs_from_html(page_html))
+
+
+def parse_product_links_from_html(page_html: str, max_per_page: Optional[int] = None) -> List[str]:
+    # 목록 XHR 응답(상품 목록 HTML 조각)에서 collect_product_links_from_category 와 같은 규칙으로 링크 수집
+    if not page_html.strip():
+        return []
+    root = lxml_html.document_fromstring(page_html)
+    links: List[str] = []
+    seen = set()
+    for xpath in _PRODUCT_LINKS:
+        for anchor in xpath(root):
+            href = anchor.get("href")
+            if not is_product_link(href, inner_text(anchor)):
+                continue
+            # 같은 상품이 다른 URL(쿼리 순서/추가 파라미터)로 여러 번 나와도 pcode 로 한 번만
+            key = canonical_product_key(href)
+            if key in seen:
+                continue
+            seen.add(key)
+            links.append(href)
+            if max_per_page and len(links) >= max_per_page:
+                return links
+    return links
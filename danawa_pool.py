@@ -0,0 +1,298 @@
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional
+
+from danawa_crawler import CONTEXT_OPTIONS
+
+# Chromium 전용 performance.memory (페이지의 JS 힙 사용량 근사치)
+HEAP_USAGE_JS = "() => (performance.memory && performance.memory.usedJSHeapSize) || 0"
+
+
+class BrowserSession:
+    # 한 프로세스에서 여러 카테고리가 같은 Chromium 을 쓰도록 브라우저 수명을 카테고리와 분리
+    def __init__(self, headless: bool) -> None:
+        from playwright.sync_api import sync_playwright
+
+        self._playwright = sync_playwright().start()
+        self.browser = self._playwright.chromium.launch(headless=headless)
+
+    def close(self) -> None:
+        try:
+            self.browser.close()
+        finally:
+            self._playwright.stop()
+
+    def __enter__(self) -> "BrowserSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class AsyncBrowserSession:
+    # 비동기 경로용. 세션이 이벤트 루프를 소유해서 카테고리마다 asyncio.run 으로 브라우저를 다시 띄우지 않음
+    def __init__(self, headless: bool) -> None:
+        from playwright.async_api import async_playwright
+
+        self.loop = asyncio.new_event_loop()
+        self._playwright = self.run(async_playwright().start())
+        self.browser = self.run(self._playwright.chromium.launch(headless=headless))
+
+    def run(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def close(self) -> None:
+        try:
+            self.run(self.browser.close())
+            self.run(self._playwright.stop())
+        finally:
+            self.loop.close()
+
+    def __enter__(self) -> "AsyncBrowserSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _ContextSlot:
+    def __init__(self, context) -> None:
+        self.context = context
+        self.idle: List[object] = []
+        self.in_use = 0
+        self.navigations = 0
+        self.draining = False
+
+
+class _PoolBookkeeping:
+    # 동기/비동기 풀이 공유하는 상태 관리 (브라우저 호출 없음)
+    # 컨텍스트는 recycle_after 번 사용되거나 JS 힙이 max_heap_mb 를 넘으면 새 페이지를 받지 않고,
+    # 사용 중인 페이지가 모두 반납되면 닫힘
+    def __init__(self, browser, recycle_after: int, max_heap_mb: float, router, heap_check_every: int) -> None:
+        self.browser = browser
+        self.recycle_after = recycle_after
+        self.max_heap_bytes = int(max_heap_mb * 1024 * 1024)
+        self.router = router
+        self.heap_check_every = max(1, heap_check_every)
+        self._current: Optional[_ContextSlot] = None
+        self._slots: List[_ContextSlot] = []
+        self._owners: Dict[object, _ContextSlot] = {}
+        self.pages_created = 0
+        self.pages_reused = 0
+        self.contexts_created = 0
+        self.contexts_recycled = 0
+
+    def _usable_slot(self) -> Optional[_ContextSlot]:
+        if self._current is None or self._current.draining:
+            return None
+        return self._current
+
+    def _add_slot(self, context) -> _ContextSlot:
+        slot = _ContextSlot(context)
+        self._slots.append(slot)
+        self._current = slot
+        self.contexts_created += 1
+        return slot
+
+    def _take_idle(self, slot: _ContextSlot):
+        slot.in_use += 1
+        if slot.idle:
+            self.pages_reused += 1
+            page = slot.idle.pop()
+            self._owners[page] = slot
+            return page
+        return None
+
+    def _track_new(self, slot: _ContextSlot, page) -> None:
+        self.pages_created += 1
+        self._owners[page] = slot
+
+    def _should_check_heap(self, slot: _ContextSlot) -> bool:
+        # 이번 반납으로 heap_check_every 번째 사용이 될 때만 확인 (매번 evaluate 하지 않음)
+        return bool(self.max_heap_bytes) and (slot.navigations + 1) % self.heap_check_every == 0
+
+    def _give_back(self, page, healthy: bool, heap_bytes: int = 0):
+        # 반납 처리 후 (닫을 페이지 여부, 닫을 컨텍스트 슬롯) 반환
+        slot = self._owners.pop(page)
+        slot.in_use -= 1
+        slot.navigations += 1
+        if self.recycle_after and slot.navigations >= self.recycle_after:
+            slot.draining = True
+        if self.max_heap_bytes and heap_bytes > self.max_heap_bytes:
+            slot.draining = True
+        close_page = not healthy or slot.draining
+        if not close_page:
+            slot.idle.append(page)
+        if slot.draining and slot.in_use == 0:
+            self._slots.remove(slot)
+            if self._current is slot:
+                self._current = None
+            self.contexts_recycled += 1
+            return close_page, slot
+        return close_page, None
+
+    def summary(self) -> str:
+        return (
+            f"페이지 풀: 새 페이지 {self.pages_created}개, 재사용 {self.pages_reused}회, "
+            f"컨텍스트 생성 {self.contexts_created}개, 재활용 {self.contexts_recycled}회"
+        )
+
+
+class PagePool(_PoolBookkeeping):
+    # 상품 페이지를 닫지 않고 같은 탭에서 다음 상품으로 이동
+    def __init__(
+        self,
+        browser,
+        recycle_after: int = 200,
+        max_heap_mb: float = 0,
+        router=None,
+        heap_check_every: int = 10,
+        page_timeout_ms: int = 15000,
+    ) -> None:
+        super().__init__(browser, recycle_after, max_heap_mb, router, heap_check_every)
+        self.page_timeout_ms = page_timeout_ms
+
+    def _new_slot(self) -> _ContextSlot:
+        context = self.browser.new_context(**CONTEXT_OPTIONS)
+        if self.router is not None:
+            self.router.install(context)
+        return self._add_slot(context)
+
+    def acquire(self):
+        slot = self._usable_slot() or self._new_slot()
+        page = self._take_idle(slot)
+        if page is None:
+            try:
+                page = slot.context.new_page()
+            except Exception:
+                slot.in_use -= 1
+                raise
+            page.set_default_timeout(self.page_timeout_ms)
+            self._track_new(slot, page)
+        if self.router is not None:
+            # 반납된 목록 페이지를 상품용으로 다시 빌려도 이전 라우팅 프로필이 남지 않도록 기본 프로필로 되돌림
+            self.router.assign(page, self.router.default_type)
+        return page
+
+    def release(self, page, healthy: bool = True) -> None:
+        heap_bytes = 0
+        slot = self._owners.get(page)
+        if healthy and slot is not None and self._should_check_heap(slot):
+            try:
+                heap_bytes = page.evaluate(HEAP_USAGE_JS)
+            except Exception:
+                pass
+        close_page, closed_slot = self._give_back(page, healthy, heap_bytes)
+        if close_page:
+            try:
+                page.close()
+            except Exception:
+                pass
+        if closed_slot is not None:
+            self._close_slot(closed_slot)
+
+    def _close_slot(self, slot: _ContextSlot) -> None:
+        try:
+            slot.context.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def page(self):
+        # 오류가 난 페이지는 상태를 믿을 수 없으므로 재사용하지 않고 닫음
+        page = self.acquire()
+        try:
+            yield page
+        except BaseException:
+            self.release(page, healthy=False)
+            raise
+        self.release(page)
+
+    def close(self) -> None:
+        for slot in self._slots:
+            self._close_slot(slot)
+        self._slots.clear()
+        self._current = None
+
+    def __enter__(self) -> "PagePool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class AsyncPagePool(_PoolBookkeeping):
+    def __init__(
+        self,
+        browser,
+        recycle_after: int = 200,
+        max_heap_mb: float = 0,
+        router=None,
+        heap_check_every: int = 10,
+        page_timeout_ms: int = 15000,
+    ) -> None:
+        super().__init__(browser, recycle_after, max_heap_mb, router, heap_check_every)
+        self.page_timeout_ms = page_timeout_ms
+        self._lock = asyncio.Lock()
+
+    async def _new_slot(self) -> _ContextSlot:
+        context = await self.browser.new_context(**CONTEXT_OPTIONS)
+        if self.router is not None:
+            await self.router.install_async(context)
+        return self._add_slot(context)
+
+    async def acquire(self):
+        # 여러 워커가 동시에 컨텍스트를 만들지 않도록 슬롯 선택만 잠금
+        async with self._lock:
+            slot = self._usable_slot() or await self._new_slot()
+            page = self._take_idle(slot)
+        if page is None:
+            try:
+                page = await slot.context.new_page()
+            except Exception:
+                slot.in_use -= 1
+                raise
+            page.set_default_timeout(self.page_timeout_ms)
+            self._track_new(slot, page)
+        if self.router is not None:
+            self.router.assign(page, self.router.default_type)
+        return page
+
+    async def release(self, page, healthy: bool = True) -> None:
+        heap_bytes = 0
+        slot = self._owners.get(page)
+        if healthy and slot is not None and self._should_check_heap(slot):
+            try:
+                heap_bytes = await page.evaluate(HEAP_USAGE_JS)
+            except Exception:
+                pass
+        close_page, closed_slot = self._give_back(page, healthy, heap_bytes)
+        if close_page:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        if closed_slot is not None:
+            await self._close_slot(closed_slot)
+
+    async def _close_slot(self, slot: _ContextSlot) -> None:
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def page(self):
+        page = await self.acquire()
+        try:
+            yield page
+        except BaseException:
+            await self.release(page, healthy=False)
+            raise
+        await self.release(page)
+
+    async def close(self) -> None:
+        for slot in self._slots:
+            await self._close_slot(slot)
+        self._slots.clear()
+        self._current = None
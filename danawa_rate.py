@@ -0,0 +1,185 @@
+import json
+import random
+import time
+from typing import List, Optional
+
+import danawa_metrics
+
+# 차단/속도 제한으로 보는 응답 코드
+BLOCK_STATUSES = (403, 429)
+
+
+class ThrottledError(Exception):
+    # 차단 응답을 받은 상품은 빈 스펙으로 저장하지 않고 실패 처리
+    def __init__(self, status: int) -> None:
+        super().__init__(f"HTTP {status} (요청 제한)")
+        self.status = status
+
+
+class PageStatusError(Exception):
+    # 서버 오류(5xx)나 응답이 없는 이동도 빈 스펙으로 저장하지 않고 실패 처리 (재시도 큐로)
+    def __init__(self, status: int) -> None:
+        super().__init__(f"HTTP {status} (서버 오류)" if status else "응답 없음")
+        self.status = status
+
+
+def check_page_status(status: int) -> None:
+    # 속도 조절 모드와 관계없이 차단/서버 오류 페이지는 파싱하지 않음
+    if status in BLOCK_STATUSES:
+        raise ThrottledError(status)
+    if status == 0 or status >= 500:
+        raise PageStatusError(status)
+
+
+class RateController:
+    # AIMD 방식으로 요청 간격과 동시성을 조절
+    # - window 개 요청마다 판단: 오류/타임아웃 비율이 error_threshold 이하이고 지연이 기준의 latency_factor 배 이하이면
+    #   간격을 step_ms 만큼 줄이고(가산), 간격이 바닥이면 동시성을 1 늘림
+    # - 나쁘면 간격을 backoff 배로 늘리고 동시성을 절반으로 (승산)
+    # - 403/429 는 창을 기다리지 않고 바로 줄이고, pause_ms 동안 새 요청을 멈춤
+    def __init__(
+        self,
+        base_delay_ms: int = 500,
+        min_delay_ms: int = 100,
+        max_delay_ms: int = 10000,
+        concurrency: int = 1,
+        min_concurrency: int = 1,
+        max_concurrency: int = 1,
+        window: int = 20,
+        step_ms: int = 50,
+        backoff: float = 2.0,
+        error_threshold: float = 0.1,
+        latency_factor: float = 2.0,
+        pause_ms: Optional[int] = None,
+        log_path: Optional[str] = None,
+    ) -> None:
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max(max_delay_ms, min_delay_ms)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.delay_ms = float(min(max(base_delay_ms, self.min_delay_ms), self.max_delay_ms))
+        self.concurrency = min(max(concurrency, self.min_concurrency), self.max_concurrency)
+        self.window = max(1, window)
+        self.step_ms = step_ms
+        self.backoff = max(1.0, backoff)
+        self.error_threshold = error_threshold
+        self.latency_factor = latency_factor
+        self.pause_ms = self.max_delay_ms if pause_ms is None else pause_ms
+        self.paused_until = 0.0
+        # 건강한 창들의 지연 중앙값 중 최솟값 (서버가 여유 있을 때의 기준 지연)
+        self.baseline_ms: Optional[float] = None
+        self._latencies: List[float] = []
+        self._errors = 0
+        self._seen = 0
+        self.requests = 0
+        self.blocked = 0
+        self.timeouts = 0
+        self.increases = 0
+        self.decreases = 0
+        self._log = open(log_path, "a", encoding="utf-8") if log_path else None
+
+    def observe(self, status: int, latency_ms: float) -> None:
+        self.requests += 1
+        if status in BLOCK_STATUSES:
+            self.blocked += 1
+            self.paused_until = time.monotonic() + self.pause_ms / 1000.0
+            self._decrease(f"HTTP {status}")
+            self._reset_window()
+            return
+        self._seen += 1
+        if status >= 500:
+            self._errors += 1
+        self._latencies.append(latency_ms)
+        self._maybe_adjust()
+
+    def observe_error(self, timeout: bool = False) -> None:
+        # 응답을 받지 못한 요청 (goto 타임아웃/연결 오류)
+        self.requests += 1
+        self._seen += 1
+        self._errors += 1
+        if timeout:
+            self.timeouts += 1
+        self._maybe_adjust()
+
+    def _reset_window(self) -> None:
+        self._latencies = []
+        self._errors = 0
+        self._seen = 0
+
+    def _maybe_adjust(self) -> None:
+        if self._seen < self.window:
+            return
+        error_rate = self._errors / self._seen
+        latencies = sorted(self._latencies)
+        self._reset_window()
+        if error_rate > self.error_threshold or not latencies:
+            self._decrease(f"오류/타임아웃 {error_rate * 100:.0f}%")
+            return
+        median_ms = latencies[len(latencies) // 2]
+        if self.baseline_ms is not None and median_ms > self.baseline_ms * self.latency_factor:
+            self._decrease(f"지연 {median_ms:.0f}ms (기준 {self.baseline_ms:.0f}ms)")
+            return
+        self.baseline_ms = median_ms if self.baseline_ms is None else min(self.baseline_ms, median_ms)
+        self._increase(f"정상 (지연 {median_ms:.0f}ms)")
+
+    def _increase(self, reason: str) -> None:
+        delay_ms, concurrency = self.delay_ms, self.concurrency
+        if self.delay_ms > self.min_delay_ms:
+            self.delay_ms = max(self.min_delay_ms, self.delay_ms - self.step_ms)
+        elif self.concurrency < self.max_concurrency:
+            self.concurrency += 1
+        if (delay_ms, concurrency) != (self.delay_ms, self.concurrency):
+            self.increases += 1
+            self._record("increase", reason, delay_ms, concurrency)
+
+    def _decrease(self, reason: str) -> None:
+        delay_ms, concurrency = self.delay_ms, self.concurrency
+        # 간격이 0 근처여도 늘어나도록 최소 step_ms 는 더함
+        self.delay_ms = min(self.max_delay_ms, max(self.delay_ms * self.backoff, self.delay_ms + self.step_ms))
+        self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+        if (delay_ms, concurrency) != (self.delay_ms, self.concurrency):
+            self.decreases += 1
+            self._record("decrease", reason, delay_ms, concurrency)
+
+    def _record(self, direction: str, reason: str, delay_ms: float, concurrency: int) -> None:
+        # 모든 조정을 출력하고, log_path 가 있으면 JSONL 로도 남김
+        arrow = "↑" if direction == "increase" else "↓"
+        print(
+            f"  속도 조정{arrow} {reason}: 간격 {delay_ms:.0f}→{self.delay_ms:.0f}ms, "
+            f"동시 {concurrency}→{self.concurrency}"
+        )
+        danawa_metrics.count(f"rate.{direction}")
+        if self._log is not None:
+            entry = {
+                "ts": time.time(),
+                "direction": direction,
+                "reason": reason,
+                "delay_ms": round(self.delay_ms, 1),
+                "concurrency": self.concurrency,
+                "requests": self.requests,
+            }
+            self._log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._log.flush()
+
+    def interval_s(self) -> float:
+        # human_delay 와 같은 분포: 간격 + 0~간격 지터
+        return (self.delay_ms + random.uniform(0, self.delay_ms)) / 1000.0
+
+    def pause_remaining_s(self) -> float:
+        return max(0.0, self.paused_until - time.monotonic())
+
+    def summary(self) -> str:
+        return (
+            f"속도 제어: 요청 {self.requests}건, 차단 {self.blocked}건, 타임아웃 {self.timeouts}건, "
+            f"증가 {self.increases}회 / 감소 {self.decreases}회, 최종 간격 {self.delay_ms:.0f}ms, 동시 {self.concurrency}"
+        )
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def is_timeout(error: BaseException) -> bool:
+    # 동기/비동기 Playwright 의 TimeoutError 는 서로 다른 클래스이므로 이름으로 구분
+    return type(error).__name__ == "TimeoutError"
@@ -0,0 +1,181 @@
+import heapq
+import itertools
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+import danawa_metrics
+from danawa_rate import PageStatusError, ThrottledError, is_timeout
+
+PRODUCT = "product"
+LIST = "list"
+
+
+def classify_error(error: BaseException) -> str:
+    # 오류 종류별 통계용 분류
+    if isinstance(error, ThrottledError):
+        return "throttled"
+    if is_timeout(error):
+        return "timeout"
+    if isinstance(error, PageStatusError):
+        return "server"
+    message = str(error)
+    if "net::" in message or type(error).__name__ in ("ConnectError", "ReadError", "RemoteProtocolError"):
+        return "network"
+    if type(error).__module__.startswith("playwright"):
+        return "browser"
+    return "other"
+
+
+class RetryItem:
+    # 실패한 상품(target=URL) 또는 목록 페이지(target=0부터 시작하는 페이지 번호)
+    # attempts 가 0 이면 재시도 목록 페이지에서 나왔지만 한도 때문에 아직 시도하지 않은 상품
+    def __init__(self, kind: str, target, category_url: str = "") -> None:
+        self.kind = kind
+        self.target = target
+        self.category_url = category_url
+        self.attempts = 0
+        self.error_class = ""
+        self.error = ""
+        self.due = 0.0
+
+
+class RetryQueue:
+    # 실패한 작업을 지수 백오프 + 지터 뒤로 미뤄 두고, 크롤러가 정상 흐름 사이사이(또는 끝난 뒤)에 due() 로 꺼내 다시 시도
+    # - 항목마다 최대 max_retries 번까지 재시도
+    # - 재시도 예산: 전체 시도(record_attempt)의 budget_ratio 배 + min_budget 까지만 재시도 (서버 장애 때 재시도 폭주 방지)
+    # - 재시도가 끝나도 실패한 항목과 종료 시 남은 항목은 failures_path 에 JSONL 로 기록 (나중에 다시 실행)
+    def __init__(
+        self,
+        category_url: str = "",
+        max_retries: int = 2,
+        base_delay_s: float = 5.0,
+        max_delay_s: float = 120.0,
+        budget_ratio: float = 0.2,
+        min_budget: int = 10,
+        failures_path: Optional[str] = None,
+    ) -> None:
+        self.category_url = category_url
+        self.max_retries = max(0, max_retries)
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max(max_delay_s, base_delay_s)
+        self.budget_ratio = budget_ratio
+        self.min_budget = min_budget
+        self.failures_path = failures_path
+        self.attempts = 0
+        self.retries = 0
+        self.gave_up = 0
+        self.dropped = 0
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._heap: List[tuple] = []
+        self._order = itertools.count()
+        self._failures = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def record_attempt(self) -> None:
+        self.attempts += 1
+
+    def budget(self) -> int:
+        return self.min_budget + int(self.attempts * self.budget_ratio)
+
+    def _bucket(self, error_class: str) -> Dict[str, int]:
+        return self.stats.setdefault(error_class, {"failed": 0, "retried": 0, "recovered": 0, "gave_up": 0})
+
+    def backoff_s(self, attempts: int) -> float:
+        # 지수 백오프의 절반은 고정, 절반은 무작위 (동시에 실패한 항목이 같은 순간에 몰리지 않도록)
+        delay = min(self.max_delay_s, self.base_delay_s * 2 ** (attempts - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def defer(self, kind: str, target, error: BaseException, item: Optional[RetryItem] = None) -> bool:
+        # 실패를 기록하고 재시도를 예약. 횟수/예산을 넘으면 실패 파일에 쓰고 False
+        if item is None:
+            item = RetryItem(kind, target, self.category_url)
+        item.attempts += 1
+        item.error_class = classify_error(error)
+        item.error = str(error)[:500]
+        bucket = self._bucket(item.error_class)
+        bucket["failed"] += 1
+        if item.attempts > self.max_retries or self.retries >= self.budget():
+            self._give_up(item, "예산 소진" if item.attempts <= self.max_retries else "재시도 횟수 초과")
+            return False
+        self.retries += 1
+        bucket["retried"] += 1
+        danawa_metrics.count("retry.scheduled")
+        item.due = time.monotonic() + self.backoff_s(item.attempts)
+        heapq.heappush(self._heap, (item.due, next(self._order), item))
+        return True
+
+    def requeue(self, item: RetryItem) -> None:
+        # 실패로 세지 않고 큐에 되돌림 (한도 때문에 이번에 처리하지 못한 항목)
+        heapq.heappush(self._heap, (item.due, next(self._order), item))
+
+    def recovered(self, item: RetryItem) -> None:
+        self._bucket(item.error_class)["recovered"] += 1
+        danawa_metrics.count("retry.recovered")
+
+    def next_delay_s(self) -> Optional[float]:
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def due(self, limit: Optional[int] = None) -> List[RetryItem]:
+        # 백오프가 끝난 항목만 꺼냄 (기다리지 않음)
+        now = time.monotonic()
+        items: List[RetryItem] = []
+        while self._heap and self._heap[0][0] <= now and (limit is None or len(items) < limit):
+            items.append(heapq.heappop(self._heap)[2])
+        return items
+
+    def _give_up(self, item: RetryItem, reason: str) -> None:
+        self.gave_up += 1
+        self._bucket(item.error_class)["gave_up"] += 1
+        danawa_metrics.count("retry.gave_up")
+        print(f"    재시도 포기 ({reason}): {item.kind} {item.target} - {item.error_class}: {item.error[:100]}")
+        if not self.failures_path:
+            return
+        if self._failures is None:
+            self._failures = open(self.failures_path, "a", encoding="utf-8")
+        entry = {
+            "ts": time.time(),
+            "kind": item.kind,
+            "category_url": item.category_url,
+            "url": item.target if item.kind == PRODUCT else f"{item.category_url}#{item.target + 1}",
+            "page_num": item.target + 1 if item.kind == LIST else 0,
+            "attempts": item.attempts,
+            "error_class": item.error_class,
+            "error": item.error,
+            "reason": reason,
+        }
+        self._failures.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._failures.flush()
+
+    def close(self) -> None:
+        # 실패한 뒤 한도 도달/중단으로 다시 시도하지 못한 항목은 실패 파일에 남기고,
+        # 한 번도 시도하지 않은 항목(한도로 잘린 상품)은 실패가 아니므로 정상 흐름처럼 버림
+        while self._heap:
+            item = heapq.heappop(self._heap)[2]
+            if item.attempts:
+                self._give_up(item, "미처리")
+            else:
+                self.dropped += 1
+        if self._failures is not None:
+            self._failures.close()
+            self._failures = None
+
+    def summary(self) -> str:
+        recovered = sum(bucket["recovered"] for bucket in self.stats.values())
+        by_class = ", ".join(
+            f"{name} 실패 {bucket['failed']}/복구 {bucket['recovered']}/포기 {bucket['gave_up']}"
+            for name, bucket in sorted(self.stats.items(), key=lambda item: -item[1]["failed"])
+        )
+        text = (
+            f"재시도: 예약 {self.retries}건 (예산 {self.budget()}), 복구 {recovered}건, 포기 {self.gave_up}건"
+            + (f", 한도로 건너뜀 {self.dropped}건" if self.dropped else "")
+            + (f" - {by_class}" if by_class else "")
+        )
+        if self.gave_up and self.failures_path:
+            text += f"\n  실패 항목 기록: {self.failures_path}"
+        return text
@@ -0,0 +1,155 @@
+import json
+import re
+import weakref
+from typing import Dict, List, Optional
+
+# 페이지 종류별 허용 목록. allow_types 에 없는 리소스 타입은 차단,
+# block_patterns 에 걸리는 URL 은 타입과 관계없이 차단, allow_patterns 는 항상 통과.
+# 카테고리 페이지는 링크 수집과 movePage(N) 에 필요한 스크립트/XHR 만,
+# 상품 페이지는 상세 탭 로딩에 필요한 스크립트/XHR 과 innerText 에 영향을 주는 CSS 까지 허용.
+AD_TRACKER_PATTERNS = [
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"googlesyndication\.com",
+    r"doubleclick\.net",
+    r"adservice\.google",
+    r"facebook\.(net|com)/tr",
+    r"connect\.facebook\.net",
+    r"criteo\.(com|net)",
+    r"analytics\.",
+    r"/beacon",
+    r"/log(ger)?/",
+    r"[?&/]ad[sx]?[/?=._-]",
+    r"adtive|mobon|dable",
+]
+
+DEFAULT_ROUTING_PROFILES: Dict[str, Dict[str, List[str]]] = {
+    "category": {
+        "allow_types": ["document", "script", "xhr", "fetch"],
+        "block_patterns": AD_TRACKER_PATTERNS,
+        "allow_patterns": [],
+    },
+    "product": {
+        "allow_types": ["document", "script", "xhr", "fetch", "stylesheet"],
+        "block_patterns": AD_TRACKER_PATTERNS,
+        "allow_patterns": [],
+    },
+}
+
+
+class RoutingProfile:
+    def __init__(self, allow_types: List[str], block_patterns: List[str], allow_patterns: List[str]) -> None:
+        self.allow_types = set(allow_types)
+        self.block_patterns = [re.compile(p, re.I) for p in block_patterns]
+        self.allow_patterns = [re.compile(p, re.I) for p in allow_patterns]
+
+    def block_reason(self, resource_type: str, url: str) -> Optional[str]:
+        if any(p.search(url) for p in self.allow_patterns):
+            return None
+        if resource_type not in self.allow_types:
+            return f"type:{resource_type}"
+        if any(p.search(url) for p in self.block_patterns):
+            return "pattern"
+        return None
+
+
+class RouteStats:
+    def __init__(self) -> None:
+        self.counts: Dict[str, Dict[str, int]] = {}
+
+    def _bucket(self, page_type: str) -> Dict[str, int]:
+        return self.counts.setdefault(page_type, {"allowed": 0, "blocked": 0, "allowed_bytes": 0})
+
+    def record(self, page_type: str, blocked: bool) -> None:
+        self._bucket(page_type)["blocked" if blocked else "allowed"] += 1
+
+    def add_bytes(self, page_type: str, size: int) -> None:
+        self._bucket(page_type)["allowed_bytes"] += size
+
+    def summary(self) -> str:
+        lines = []
+        for page_type, bucket in sorted(self.counts.items()):
+            lines.append(
+                f"  [{page_type}] 허용 {bucket['allowed']}건 ({bucket['allowed_bytes'] / 1024:.0f} KB), "
+                f"차단 {bucket['blocked']}건"
+            )
+        return "\n".join(lines)
+
+
+def load_routing_profiles(config_path: Optional[str] = None) -> Dict[str, RoutingProfile]:
+    # 설정 파일은 DEFAULT_ROUTING_PROFILES 와 같은 형태이며 지정한 필드만 덮어씀
+    raw = {page_type: dict(profile) for page_type, profile in DEFAULT_ROUTING_PROFILES.items()}
+    if config_path:
+        with open(config_path, encoding="utf-8") as f:
+            for page_type, overrides in json.load(f).items():
+                raw.setdefault(page_type, dict(DEFAULT_ROUTING_PROFILES["product"])).update(overrides)
+    return {
+        page_type: RoutingProfile(
+            profile.get("allow_types", []),
+            profile.get("block_patterns", []),
+            profile.get("allow_patterns", []),
+        )
+        for page_type, profile in raw.items()
+    }
+
+
+class RequestRouter:
+    # context.route 로 모든 요청을 가로채고, 요청을 보낸 페이지의 종류에 맞는 프로필을 적용
+    def __init__(self, profiles: Dict[str, RoutingProfile], default_type: str = "product") -> None:
+        self.profiles = profiles
+        self.default_type = default_type
+        self.stats = RouteStats()
+        self._page_types: "weakref.WeakKeyDictionary[object, str]" = weakref.WeakKeyDictionary()
+
+    def assign(self, page, page_type: str) -> None:
+        self._page_types[page] = page_type
+
+    def page_type_of(self, request) -> str:
+        try:
+            return self._page_types.get(request.frame.page, self.default_type)
+        except Exception:
+            # 서비스 워커 등 프레임이 없는 요청
+            return self.default_type
+
+    def _decide(self, request) -> Optional[str]:
+        page_type = self.page_type_of(request)
+        profile = self.profiles.get(page_type) or self.profiles[self.default_type]
+        reason = profile.block_reason(request.resource_type, request.url)
+        self.stats.record(page_type, blocked=bool(reason))
+        return reason
+
+    def install(self, context) -> None:
+        def handle(route) -> None:
+            if self._decide(route.request):
+                route.abort()
+            else:
+                route.fallback()
+
+        def on_finished(request) -> None:
+            try:
+                sizes = request.sizes()
+                size = sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+                self.stats.add_bytes(self.page_type_of(request), size)
+            except Exception:
+                pass
+
+        context.route("**/*", handle)
+        context.on("requestfinished", on_finished)
+
+    async def install_async(self, context) -> None:
+        async def handle(route) -> None:
+            if self._decide(route.request):
+                await route.abort()
+            else:
+                await route.fallback()
+
+        async def on_finished(request) -> None:
+            try:
+                sizes = await request.sizes()
+                size = sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+                self.stats.add_bytes(self.page_type_of(request), size)
+            except Exception:
+                pass
+
+        await context.route("**/*", handle)
+        context.on("requestfinished", on_finished)
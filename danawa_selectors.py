@@ -0,0 +1,78 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+
+class SelectorMemo:
+    # 후보 선택자/라벨 목록마다 마지막으로 성공한 후보를 기억해서 다음 페이지에서 먼저 시도
+    # 같은 카테고리 안에서는 거의 항상 같은 후보가 맞으므로 count() 왕복을 대부분 건너뜀.
+    # path 를 주면 카테고리 URL 별로 JSON 에 저장해 다음 실행에서도 사용
+    def __init__(self, path: Optional[str] = None, category_url: str = "") -> None:
+        self.path = path
+        self.category_url = category_url
+        self.winners: Dict[str, str] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.winners = dict(json.load(f).get(category_url, {}))
+            except (OSError, ValueError):
+                pass
+
+    def _bucket(self, group: str) -> Dict[str, int]:
+        return self.stats.setdefault(group, {"hits": 0, "misses": 0})
+
+    def winner(self, group: str) -> Optional[str]:
+        return self.winners.get(group)
+
+    def order(self, group: str, candidates: List[str]) -> List[str]:
+        # 기억한 후보를 맨 앞으로, 나머지는 원래 우선순위 그대로
+        best = self.winners.get(group)
+        if best not in candidates:
+            return list(candidates)
+        return [best] + [c for c in candidates if c != best]
+
+    def record(self, group: str, candidate: Optional[str]) -> None:
+        # 첫 시도(기억한 후보)가 맞았으면 적중, 전체 목록을 다시 훑었으면 미스
+        bucket = self._bucket(group)
+        if candidate is not None and candidate == self.winners.get(group):
+            bucket["hits"] += 1
+            return
+        bucket["misses"] += 1
+        if candidate is not None:
+            self.winners[group] = candidate
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        state: Dict[str, Dict[str, str]] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+        state[self.category_url] = self.winners
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(self.path + ".tmp", self.path)
+
+    def summary(self) -> str:
+        lines = []
+        for group, bucket in sorted(self.stats.items()):
+            total = bucket["hits"] + bucket["misses"]
+            rate = bucket["hits"] / total * 100 if total else 0.0
+            lines.append(
+                f"  [{group}] 적중 {bucket['hits']}건, 미스 {bucket['misses']}건 ({rate:.0f}%)"
+                f" - {self.winners.get(group, '-')}"
+            )
+        return "\n".join(lines)
+
+
+def ordered(memo: Optional[SelectorMemo], group: str, candidates: List[str]) -> List[str]:
+    return memo.order(group, candidates) if memo is not None else candidates
+
+
+def remember(memo: Optional[SelectorMemo], group: str, candidate: Optional[str]) -> None:
+    if memo is not None:
+        memo.record(group, candidate)
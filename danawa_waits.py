@@ -0,0 +1,38 @@
+import json
+from typing import List, Optional
+
+
+class WaitStats:
+    # 상품마다 이동 직후부터 스펙을 읽을 수 있을 때까지 기다린 시간(ms)을 기록
+    # log_path 를 주면 상품별로 JSONL 한 줄씩 남김
+    def __init__(self, wait_mode: str, log_path: Optional[str] = None) -> None:
+        self.wait_mode = wait_mode
+        self.samples: List[float] = []
+        self._log = open(log_path, "a", encoding="utf-8") if log_path else None
+
+    def record(self, link: str, wait_ms: float, ready: Optional[bool] = None) -> None:
+        self.samples.append(wait_ms)
+        if self._log is not None:
+            entry = {"url": link, "wait_mode": self.wait_mode, "wait_ms": round(wait_ms, 1), "ready": ready}
+            self._log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._log.flush()
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> str:
+        if not self.samples:
+            return f"대기 시간({self.wait_mode}): 기록 없음"
+        total = sum(self.samples)
+        return (
+            f"대기 시간({self.wait_mode}): {len(self.samples)}개 상품, 평균 {total / len(self.samples):.0f}ms, "
+            f"p50 {self.percentile(0.5):.0f}ms, p95 {self.percentile(0.95):.0f}ms, 합계 {total / 1000:.1f}s"
+        )
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
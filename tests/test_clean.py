@@ -0,0 +1,62 @@
+import random
+
+import pandas as pd
+
+import danawa_clean
+from danawa_bench import FixtureSite
+from danawa_cache import HtmlCache
+from danawa_clean import build_detail_info, export_raw_specs, load_cleaning_rules
+from danawa_parse import parse_specs_from_html
+
+# 정리 단계마다 걸리는 값이 나오도록 고른 원본 스펙 후보
+_KEYS = ["제조회사", "용량", "HACCP인증", "적합성평가인증", "레토르트이유식", "파우치", "6개월~", "상온", "원산지", "특징"]
+_VALUES = [
+    "○", "O", "●", "상세설명", "판매 사이트 문의", "상세설명 / 판매 사이트 문의", "인증번호 확인",
+    "A사 (제조사 웹사이트 바로가기)", "100g (1개", "국산  쌀  100%", "웹사이트", "  있음  ", "", "x",
+]
+
+
+def _random_specs(rng: random.Random):
+    keys = rng.sample(_KEYS, rng.randint(0, len(_KEYS)))
+    return {key: rng.choice(_VALUES) for key in keys}
+
+
+def test_frame_matches_per_row_build_detail_info():
+    rng = random.Random(7)
+    products = [(f"https://prod.danawa.com/info/?pcode={n}", _random_specs(rng)) for n in range(2000)]
+    # 스펙이 하나도 없는 상품은 긴 형식에 행이 없으므로 비교에서 제외
+    products = [(url, specs) for url, specs in products if specs]
+    frame = pd.DataFrame(
+        [(url, key, value) for url, specs in products for key, value in specs.items()], columns=["URL", "키", "값"]
+    )
+    details = load_cleaning_rules().build_detail_info_frame(frame)
+    assert list(details.index) == [url for url, _ in products]
+    for url, specs in products:
+        assert details[url] == build_detail_info(specs), url
+
+
+def test_certifications_are_grouped_from_raw_pairs():
+    specs = {"HACCP인증": "○", "적합성평가인증": "R-R-abc", "용량": "100g (1개)"}
+    frame = pd.DataFrame([("u", k, v) for k, v in specs.items()], columns=["URL", "키", "값"])
+    assert build_detail_info(specs) == "용량:100g/인증:HACCP인증,적합성평가인증"
+    assert load_cleaning_rules().build_detail_info_frame(frame)["u"] == build_detail_info(specs)
+
+
+def test_export_raw_then_clean_matches_crawler(tmp_path, monkeypatch):
+    site = FixtureSite(pages=1, per_page=5)
+    cache = HtmlCache(str(tmp_path / "cache"))
+    expected = {}
+    for index in range(site.per_page):
+        pcode = site.pcode(1, index)
+        url = f"https://prod.danawa.com/info/?pcode={pcode}"
+        page_html = site.product_page(pcode)
+        cache.put(url, page_html, title=f"상품 {pcode}", status=200)
+        expected[url] = build_detail_info(parse_specs_from_html(page_html))
+
+    raw_csv, cleaned_csv = str(tmp_path / "raw.csv"), str(tmp_path / "cleaned.csv")
+    assert export_raw_specs(str(tmp_path / "cache"), raw_csv) == site.per_page
+    monkeypatch.setattr("sys.argv", ["danawa_clean.py", "--input", raw_csv, "--output", cleaned_csv])
+    danawa_clean.main()
+
+    cleaned = pd.read_csv(cleaned_csv, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    assert dict(zip(cleaned["URL"], cleaned["상세정보"])) == expected
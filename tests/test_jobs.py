@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from danawa_jobs import CATEGORY_PAGE, PRODUCT, JobQueue
+
+CATEGORY_URL = "https://prod.danawa.com/list/?cate=16249091"
+LINKS = [f"https://prod.danawa.com/info/?pcode={n}" for n in (1001, 1002)]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+def _state(queue: JobQueue, task_id: int):
+    return queue.conn.execute("SELECT state, attempts, lease_owner, error FROM tasks WHERE id = ?", (task_id,)).fetchone()
+
+
+def test_claim_prefers_products_and_leases_each_task_once(db_path):
+    queue = JobQueue(db_path)
+    assert queue.enqueue_category(CATEGORY_URL, max_pages=2)
+    assert not queue.enqueue_category(CATEGORY_URL, max_pages=2)
+    assert queue.add_products(CATEGORY_URL, LINKS + [LINKS[0] + "&cate=1"]) == 2
+
+    first = queue.claim("w1")
+    second = JobQueue(db_path).claim("w2")
+    assert (first.kind, second.kind) == (PRODUCT, PRODUCT)
+    assert first.id != second.id
+    assert first.attempts == 1
+    assert queue.claim("w1").kind == CATEGORY_PAGE
+    assert queue.claim("w1") is None
+    assert _state(queue, first.id)["state"] == "leased"
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_cannot_complete(db_path):
+    queue = JobQueue(db_path, lease_seconds=0.01)
+    queue.add_products(CATEGORY_URL, LINKS[:1])
+    task = queue.claim("w1")
+    time.sleep(0.02)
+
+    reclaimed = queue.claim("w2")
+    assert reclaimed.id == task.id
+    assert reclaimed.attempts == 2
+    assert not queue.complete(task, "w1", "상품", "스펙")
+    assert queue.complete(reclaimed, "w2", "상품", "스펙")
+    assert _state(queue, task.id)["state"] == "done"
+
+
+def test_extend_keeps_lease_alive(db_path):
+    queue = JobQueue(db_path, lease_seconds=0.05)
+    queue.add_products(CATEGORY_URL, LINKS[:1])
+    task = queue.claim("w1")
+    time.sleep(0.03)
+    queue.extend("w1", [task.id])
+    time.sleep(0.03)
+    assert queue.claim("w2") is None
+
+
+def test_expired_lease_past_max_attempts_is_failed_not_reclaimed(db_path):
+    # 워커가 예외 처리 없이 죽어 fail() 이 불리지 않는 경우
+    queue = JobQueue(db_path, lease_seconds=0.01, max_attempts=2)
+    queue.add_products(CATEGORY_URL, LINKS[:1])
+    task = queue.claim("w1")
+    time.sleep(0.02)
+    assert queue.claim("w2").attempts == 2
+    time.sleep(0.02)
+
+    assert queue.claim("w3") is None
+    row = _state(queue, task.id)
+    assert (row["state"], row["attempts"], row["lease_owner"]) == ("failed", 2, None)
+    assert not queue.has_unfinished()
+
+
+def test_fail_retries_until_max_attempts(db_path):
+    queue = JobQueue(db_path, max_attempts=2)
+    queue.add_products(CATEGORY_URL, LINKS[:1])
+
+    task = queue.claim("w1")
+    queue.fail(task, "w1", "timeout")
+    assert _state(queue, task.id)["state"] == "pending"
+
+    task = queue.claim("w1")
+    queue.fail(task, "w1", "timeout")
+    row = _state(queue, task.id)
+    assert (row["state"], row["error"]) == ("failed", "timeout")
+    assert queue.claim("w1") is None
+    assert queue.counts() == {PRODUCT: {"failed": 1}}
+
+
+def test_complete_records_result_and_next_page(db_path):
+    queue = JobQueue(db_path)
+    queue.enqueue_category(CATEGORY_URL, max_pages=2)
+    task = queue.claim("w1")
+    assert queue.add_next_page(task)
+    assert queue.complete(task, "w1", result="20")
+    assert not queue.add_next_page(queue.claim("w1"))
+
+    queue.add_products(CATEGORY_URL, LINKS[:1])
+    product = queue.claim("w1")
+    assert queue.complete(product, "w1", "상품 1001", "용량:100g")
+    assert [tuple(row) for row in queue.done_products()] == [("상품 1001", LINKS[0], "용량:100g")]
@@ -0,0 +1,102 @@
+import asyncio
+
+import lxml.html
+
+import danawa_async
+import danawa_crawler
+from danawa_selectors import SelectorMemo
+
+# 첫 선택자(li.prod_item ... a.prod_link)로만 잡히는 상품과 두 번째 선택자(.prod_name a)로만 잡히는 상품
+LIST_HTML = """
+<ul class="product_list">
+  <li class="prod_item"><div class="prod_info">
+    <a class="prod_link" href="https://prod.danawa.com/info/?pcode=1001">상품 1001</a>
+  </div></li>
+  <li class="prod_item"><p class="prod_name">
+    <a href="https://prod.danawa.com/info/?pcode=2002">상품 2002</a>
+  </p></li>
+</ul>
+"""
+
+EXPECTED = ["https://prod.danawa.com/info/?pcode=1001", "https://prod.danawa.com/info/?pcode=2002"]
+
+
+class FakeElement:
+    def __init__(self, element) -> None:
+        self.element = element
+
+    def get_attribute(self, name: str):
+        return self.element.get(name)
+
+    def inner_text(self) -> str:
+        return self.element.text_content()
+
+
+class FakeLocator:
+    def __init__(self, root, selector: str) -> None:
+        self.elements = [FakeElement(element) for element in root.cssselect(selector)]
+
+    def count(self) -> int:
+        return len(self.elements)
+
+    def all(self):
+        return self.elements
+
+
+class FakePage:
+    # Playwright Page 의 locator().count()/all() 만 lxml 로 흉내
+    def __init__(self, page_html: str) -> None:
+        self.root = lxml.html.fromstring(page_html)
+
+    def locator(self, selector: str) -> FakeLocator:
+        return FakeLocator(self.root, selector)
+
+
+class AsyncFakeElement(FakeElement):
+    async def get_attribute(self, name: str):
+        return super().get_attribute(name)
+
+    async def inner_text(self) -> str:
+        return super().inner_text()
+
+
+class AsyncFakeLocator(FakeLocator):
+    def __init__(self, root, selector: str) -> None:
+        self.elements = [AsyncFakeElement(element) for element in root.cssselect(selector)]
+
+    async def count(self) -> int:
+        return len(self.elements)
+
+    async def all(self):
+        return self.elements
+
+
+class AsyncFakePage(FakePage):
+    def locator(self, selector: str) -> AsyncFakeLocator:
+        return AsyncFakeLocator(self.root, selector)
+
+
+def test_links_from_every_selector_are_combined():
+    page = FakePage(LIST_HTML)
+    assert danawa_crawler.collect_product_links_from_category(page, None) == EXPECTED
+
+
+def test_memo_does_not_drop_links_from_other_selectors():
+    page = FakePage(LIST_HTML)
+    memo = SelectorMemo()
+    # 첫 페이지에서 첫 선택자가 기억된 뒤에도 두 번째 선택자의 상품이 빠지지 않아야 함
+    for _ in range(3):
+        assert danawa_crawler.collect_product_links_from_category(page, None, memo) == EXPECTED
+    assert memo.winner("product_links") == danawa_crawler.PRODUCT_LINK_SELECTORS[0]
+
+
+def test_async_memo_does_not_drop_links_from_other_selectors():
+    page = AsyncFakePage(LIST_HTML)
+    memo = SelectorMemo()
+
+    async def collect_twice():
+        first = await danawa_async.collect_product_links_from_category(page, None, memo)
+        second = await danawa_async.collect_product_links_from_category(page, None, memo)
+        return first, second
+
+    assert asyncio.run(collect_twice()) == (EXPECTED, EXPECTED)
@@ -0,0 +1,40 @@
+import json
+
+from danawa_crawler import crawl_category
+from danawa_output import Checkpoint, open_crawl_output
+
+CATEGORY_URL = "https://prod.danawa.com/list/?cate=16249091"
+
+
+def _write_finished_checkpoint(path: str) -> None:
+    checkpoint = Checkpoint(path, CATEGORY_URL)
+    checkpoint.page_index = 3
+    checkpoint.rows_written = 42
+    checkpoint.finished = True
+    checkpoint.save()
+
+
+def test_close_without_flag_keeps_finished_checkpoint(tmp_path):
+    checkpoint_path = str(tmp_path / "out.csv.checkpoint.json")
+    _write_finished_checkpoint(checkpoint_path)
+
+    output = open_crawl_output(str(tmp_path / "out.csv"), CATEGORY_URL, checkpoint_path, resume=True)
+    assert output.finished
+    output.close()
+
+    with open(checkpoint_path, encoding="utf-8") as f:
+        assert json.load(f)["finished"] is True
+
+
+def test_resume_of_finished_crawl_stays_finished(tmp_path):
+    output_csv = str(tmp_path / "out.csv")
+    checkpoint_path = f"{output_csv}.checkpoint.json"
+    _write_finished_checkpoint(checkpoint_path)
+
+    # 이미 끝난 체크포인트면 브라우저를 띄우기 전에 돌아옴
+    crawl_category(CATEGORY_URL, output_csv, max_pages=5, max_items_per_page=None, headless=True, resume=True)
+
+    state = Checkpoint.load(checkpoint_path, CATEGORY_URL)
+    assert state.finished
+    assert state.page_index == 3
+    assert state.rows_written == 42